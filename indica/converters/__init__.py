@@ -11,6 +11,7 @@ from .lines_of_sight import LinesOfSightTransform
 from .magnetic import MagneticCoordinates
 from .time import bin_to_time_labels
 from .time import convert_in_time
+from .time import convert_in_time_chunks
 from .transect import TransectCoordinates
 from .trivial import TrivialTransform
 
@@ -27,4 +28,5 @@ __all__ = [
     "TrivialTransform",
     "bin_to_time_labels",
     "convert_in_time",
+    "convert_in_time_chunks",
 ]
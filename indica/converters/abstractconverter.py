@@ -3,21 +3,44 @@
 
 from abc import ABC
 from abc import abstractmethod
+import base64
+from collections import OrderedDict
+import hashlib
+import heapq
+import json
+from typing import Any
 from typing import Callable
 from typing import cast
 from typing import Dict
+from typing import Hashable
+from typing import List
 from typing import Optional
 from typing import Tuple
+from typing import Type
 
 import numpy as np
 from xarray import DataArray
 from xarray import zeros_like
 
+from .. import profiling
 from ..abstract_equilibrium import AbstractEquilibrium
 from ..numpy_typing import LabeledArray
 
 Coordinates = Tuple[LabeledArray, LabeledArray]
 OptionalCoordinates = Tuple[Optional[LabeledArray], Optional[LabeledArray]]
+Converter = Callable[[LabeledArray, LabeledArray, LabeledArray], Coordinates]
+
+#: Estimated cost of calling a shortcut converter returned by
+#: :py:meth:`CoordinateTransform.get_converter`. This is relative to
+#: the costs of converting to and from R-z coordinates, given by the
+#: ``_TO_RZ_COST`` and ``_FROM_RZ_COST`` attributes of each transform.
+SHORTCUT_COST = 1.0
+
+#: The maximum number of conversion paths to cache.
+MAX_CACHED_PATHS = 128
+
+_CONVERSION_PATHS: "OrderedDict[Tuple[Hashable, Hashable], ConversionPath]"
+_CONVERSION_PATHS = OrderedDict()
 
 
 class EquilibriumException(Exception):
@@ -67,10 +90,18 @@ class CoordinateTransform(ABC):
     x2_name: str
         Name for the second spacial coordinate. May be class- or
         instance-specific.
+    _TO_RZ_COST: float
+        Estimate of the relative cost of calling :py:meth:`convert_to_Rz`.
+        Used when planning conversions between coordinate systems.
+    _FROM_RZ_COST: float
+        Estimate of the relative cost of calling :py:meth:`convert_from_Rz`.
+        Used when planning conversions between coordinate systems.
     """
 
     _CONVERSION_METHODS: Dict[str, str] = {}
     _INVERSE_CONVERSION_METHODS: Dict[str, str] = {}
+    _TO_RZ_COST: float = 1.0
+    _FROM_RZ_COST: float = 1.0
 
     equilibrium: AbstractEquilibrium
     x1_name: str
@@ -131,6 +162,51 @@ class CoordinateTransform(ABC):
             return None
         return other.get_converter(self, True)
 
+    def _shortcut_neighbours(self) -> List["CoordinateTransform"]:
+        """Returns the other transforms which this one is built on top of
+        and for which it may provide shortcut converters. These are used
+        as intermediate steps when planning conversions.
+
+        """
+        return []
+
+    def get_conversion_path(self, other: "CoordinateTransform") -> "ConversionPath":
+        """Returns the cheapest known route for converting coordinates from
+        this system to those used in ``other``. This may chain together
+        several shortcut converters (see :py:meth:`get_converter`) and
+        only go via R-z coordinates when there is no cheaper
+        alternative. The result is cached for future reuse.
+
+        Parameters
+        ----------
+        other
+            The coordinate system to convert to.
+
+        Returns
+        -------
+        :
+            A callable performing the conversion.
+
+        """
+        key = (self._cache_key(), other._cache_key())
+        if key in _CONVERSION_PATHS:
+            _CONVERSION_PATHS.move_to_end(key)
+            return _CONVERSION_PATHS[key]
+        path = find_conversion_path(self, other)
+        _CONVERSION_PATHS[key] = path
+        if len(_CONVERSION_PATHS) > MAX_CACHED_PATHS:
+            _CONVERSION_PATHS.popitem(last=False)
+        return path
+
+    def _cache_key(self) -> Hashable:
+        """Returns a key identifying this transform, for use when caching
+        results. Transforms which are equal will have the same key.
+
+        """
+        # The paths held in the cache keep references to the
+        # equilibrium, so its id can not be reused while cached
+        return self.fingerprint, id(getattr(self, "equilibrium", None))
+
     def convert_to(
         self,
         other: "CoordinateTransform",
@@ -141,11 +217,11 @@ class CoordinateTransform(ABC):
         """General routine to map coordinates from this system to those used
         in ``other``. Array broadcasting will be performed as necessary.
 
-        If this transform class provides a specialised method for
-        doing this (specified in :py:attr:`_CONVERSION_METHODS`) then that is
-        used. Otherwise, the coordinates are converted to R-z using
-        :py:meth:`_convert_to_Rz` and then converted to the other coordinate
-        system using :py:attr:`_convert_from_Rz`.
+        The route taken is chosen by :py:meth:`get_conversion_path`,
+        which will chain together any shortcut converters (see
+        :py:meth:`get_converter`) where these are cheaper than
+        converting to R-z using :py:meth:`convert_to_Rz` and then to
+        the other coordinate system using :py:meth:`convert_from_Rz`.
 
         Parameters
         ----------
@@ -166,13 +242,10 @@ class CoordinateTransform(ABC):
             The second spatial coordinate in the ``other`` system.
 
         """
-        if self == other:
-            return x1, x2
-        converter = self.get_converter(other)
-        if converter:
-            return converter(x1, x2, t)
-        R, z = self.convert_to_Rz(x1, x2, t)
-        return other.convert_from_Rz(R, z, t)
+        with profiling.span(
+            f"{self.__class__.__name__}->{other.__class__.__name__}", "conversion"
+        ):
+            return self.get_conversion_path(other)(x1, x2, t)
 
     @abstractmethod
     def convert_to_Rz(
@@ -238,19 +311,18 @@ class CoordinateTransform(ABC):
         )
 
     def _abstract_equals(self, other: "CoordinateTransform") -> bool:
-        """Checks that default coordinate values and equilibrium objects are
+        """Checks that the content fingerprints and equilibrium objects are
         the same on two transform classes.
 
         """
+        if self.fingerprint != other.fingerprint:
+            return False
         if not hasattr(self, "equilibrium"):
             return not hasattr(other, "equilibrium")
         elif not hasattr(other, "equilibrium"):
             return False
         else:
-            result = self.equilibrium == other.equilibrium
-            result = result and self.x1_name == other.x1_name
-            result = result and self.x2_name == other.x2_name
-            return result
+            return self.equilibrium == other.equilibrium
 
     @abstractmethod
     def __eq__(self, other: object) -> bool:
@@ -300,13 +372,290 @@ class CoordinateTransform(ABC):
         result[{direction: slice(1, None)}] = spacings.cumsum(direction)
         return result
 
+    def _get_state(self) -> Dict[str, Any]:
+        """Returns the information needed to recreate this object (except
+        for the equilibrium), in a form which can be serialised as
+        JSON. Arrays should be encoded with :py:func:`encode_array`
+        and other transforms with :py:meth:`_get_full_state`.
+
+        """
+        raise NotImplementedError(
+            "{} does not implement a '_get_state' "
+            "method.".format(self.__class__.__name__)
+        )
+
+    @classmethod
+    def _from_state(
+        cls, state: Dict[str, Any], equilibrium: Optional[AbstractEquilibrium]
+    ) -> "CoordinateTransform":
+        """Recreates an object from the output of :py:meth:`_get_state`.
+
+        Parameters
+        ----------
+        state
+            The information describing the object.
+        equilibrium
+            The equilibrium to use with the new object, if any.
+
+        """
+        raise NotImplementedError(
+            "{} does not implement a '_from_state' method.".format(cls.__name__)
+        )
+
+    def _get_full_state(self) -> Dict[str, Any]:
+        """Returns the result of :py:meth:`_get_state`, along with the name
+        of the class of this object."""
+        return {"transform": self.__class__.__name__, **self._get_state()}
+
+    @property
+    def fingerprint(self) -> str:
+        """A hash of the contents of this object (excluding the
+        equilibrium). Transforms describing the same coordinate system
+        will have the same fingerprint. It is calculated the first time
+        it is accessed and then cached, so transforms should not be
+        modified after creation.
+
+        """
+        if "_fingerprint" not in self.__dict__:
+            self._fingerprint = hashlib.sha256(
+                self.encode().encode("utf-8")
+            ).hexdigest()
+        return self._fingerprint
+
     def encode(self) -> str:
         """Returns a JSON representation of this object. Should be sufficient
         to recreate it identically from scratch (except for the
         equilibrium)."""
-        return ""
+        return json.dumps(self._get_full_state(), sort_keys=True)
 
     @staticmethod
-    def decode(json: str) -> "CoordinateTransform":
-        """Takes some JSON and decodes it into a CoordinateTransform object."""
-        pass
+    def decode(
+        json_str: str, equilibrium: Optional[AbstractEquilibrium] = None
+    ) -> "CoordinateTransform":
+        """Takes some JSON and decodes it into a CoordinateTransform object.
+
+        Parameters
+        ----------
+        json_str
+            JSON produced by :py:meth:`encode`.
+        equilibrium
+            If present, the equilibrium to set for the new object (and any
+            other transforms from which it is built).
+
+        """
+        return decode_state(json.loads(json_str), equilibrium)
+
+
+def _transform_classes(
+    base: Type[CoordinateTransform],
+) -> Dict[str, Type[CoordinateTransform]]:
+    """Returns all subclasses of ``base``, indexed by name."""
+    result = {}
+    for cls in base.__subclasses__():
+        result[cls.__name__] = cls
+        result.update(_transform_classes(cls))
+    return result
+
+
+def decode_state(
+    state: Dict[str, Any], equilibrium: Optional[AbstractEquilibrium] = None
+) -> CoordinateTransform:
+    """Recreate a transform from the output of
+    :py:meth:`CoordinateTransform._get_full_state`.
+
+    Parameters
+    ----------
+    state
+        The information describing the transform.
+    equilibrium
+        If present, the equilibrium to set for the new object.
+
+    """
+    classes = _transform_classes(CoordinateTransform)
+    if state["transform"] not in classes:
+        raise ValueError(f"Unrecognised transform type '{state['transform']}'.")
+    return classes[state["transform"]]._from_state(state, equilibrium)
+
+
+def encode_array(array: LabeledArray) -> Dict[str, Any]:
+    """Represents an array in a form which can be serialised as JSON. The
+    raw data is stored as base64 text, so values are recovered exactly.
+
+    Parameters
+    ----------
+    array
+        The array to encode. If it is a :py:class:`xarray.DataArray` then
+        its dimensions and coordinates will be included.
+
+    """
+    if isinstance(array, DataArray):
+        return {
+            "dims": [str(d) for d in array.dims],
+            "data": encode_array(array.data),
+            "coords": {
+                str(k): {"dims": [str(d) for d in v.dims], "data": encode_array(v.data)}
+                for k, v in array.coords.items()
+            },
+        }
+    data = np.ascontiguousarray(array)
+    return {
+        "dtype": data.dtype.str,
+        "shape": list(data.shape),
+        "bytes": base64.b64encode(data.tobytes()).decode("ascii"),
+    }
+
+
+def decode_array(state: Dict[str, Any]) -> LabeledArray:
+    """Recreates an array from the output of :py:func:`encode_array`."""
+    if "dims" in state:
+        return DataArray(
+            decode_array(state["data"]),
+            coords={
+                k: (v["dims"], decode_array(v["data"]))
+                for k, v in state["coords"].items()
+            },
+            dims=state["dims"],
+        )
+    return np.frombuffer(
+        base64.b64decode(state["bytes"]), dtype=state["dtype"]
+    ).reshape(state["shape"])
+
+
+class ConversionPath:
+    """A route for converting coordinates from one coordinate system to
+    another. It is made up of a sequence of steps, each of which is
+    either a shortcut converter or a conversion via R-z coordinates.
+
+    Parameters
+    ----------
+    steps
+        The functions to apply, in order, to perform the conversion.
+    cost
+        The estimated cost of performing the conversion.
+    via_Rz
+        Whether any of the steps involve converting via R-z coordinates.
+
+    """
+
+    def __init__(self, steps: List[Converter], cost: float, via_Rz: bool):
+        self.steps = steps
+        self.cost = cost
+        self.via_Rz = via_Rz
+
+    def __call__(self, x1: LabeledArray, x2: LabeledArray, t: LabeledArray):
+        """Convert the coordinates along this path.
+
+        Parameters
+        ----------
+        x1
+            The first spatial coordinate in the starting system.
+        x2
+            The second spatial coordinate in the starting system.
+        t
+            The time coordinate
+
+        Returns
+        -------
+        x1
+            The first spatial coordinate in the final system.
+        x2
+            The second spatial coordinate in the final system.
+
+        """
+        for step in self.steps:
+            x1, x2 = step(x1, x2, t)
+        return x1, x2
+
+
+def _via_Rz(source: CoordinateTransform, target: CoordinateTransform) -> Converter:
+    """Returns a function converting coordinates from ``source`` to
+    ``target`` by going through R-z coordinates."""
+
+    def convert(x1: LabeledArray, x2: LabeledArray, t: LabeledArray) -> Coordinates:
+        R, z = source.convert_to_Rz(x1, x2, t)
+        return target.convert_from_Rz(R, z, t)
+
+    return convert
+
+
+def find_conversion_path(
+    source: CoordinateTransform, target: CoordinateTransform
+) -> ConversionPath:
+    """Finds the cheapest route for converting coordinates from ``source``
+    to ``target``.
+
+    The transforms are treated as nodes of a graph. As well as the
+    source and target, this includes any transforms they are built
+    from (see :py:meth:`CoordinateTransform._shortcut_neighbours`).
+    Shortcut converters between nodes (see
+    :py:meth:`CoordinateTransform.get_converter`) form edges with cost
+    :py:data:`SHORTCUT_COST`. Every pair of nodes is also joined by an
+    edge representing conversion via R-z coordinates, with a cost
+    taken from the transforms. Dijkstra's algorithm is then used to
+    find the cheapest path.
+
+    Parameters
+    ----------
+    source
+        The coordinate system to convert from.
+    target
+        The coordinate system to convert to.
+
+    Returns
+    -------
+    :
+        The cheapest route for the conversion.
+
+    """
+    if source == target:
+        return ConversionPath([], 0.0, False)
+    nodes: List[CoordinateTransform] = []
+
+    def add_node(transform: CoordinateTransform):
+        if any(transform == n for n in nodes):
+            return
+        nodes.append(transform)
+        for neighbour in transform._shortcut_neighbours():
+            add_node(neighbour)
+
+    add_node(source)
+    add_node(target)
+    end = next(i for i, n in enumerate(nodes) if n == target)
+
+    costs = [float("inf")] * len(nodes)
+    previous: List[Optional[Tuple[int, Converter, bool]]] = [None] * len(nodes)
+    costs[0] = 0.0
+    queue = [(0.0, 0)]
+    visited = set()
+    while queue:
+        cost, i = heapq.heappop(queue)
+        if i in visited:
+            continue
+        visited.add(i)
+        if i == end:
+            break
+        for j, node in enumerate(nodes):
+            if j in visited:
+                continue
+            converter = nodes[i].get_converter(node)
+            if converter:
+                step, step_cost, via_Rz = converter, SHORTCUT_COST, False
+            else:
+                step = _via_Rz(nodes[i], node)
+                step_cost = nodes[i]._TO_RZ_COST + node._FROM_RZ_COST
+                via_Rz = True
+            if cost + step_cost < costs[j]:
+                costs[j] = cost + step_cost
+                previous[j] = (i, step, via_Rz)
+                heapq.heappush(queue, (costs[j], j))
+
+    steps: List[Converter] = []
+    uses_Rz = False
+    i = end
+    while i != 0:
+        prev = previous[i]
+        assert prev is not None
+        i, step, via_Rz = prev
+        steps.insert(0, step)
+        uses_Rz = uses_Rz or via_Rz
+    return ConversionPath(steps, costs[end], uses_Rz)
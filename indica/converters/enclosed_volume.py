@@ -1,12 +1,17 @@
 """Coordinate systems based on volume enclosed by flux surfaces."""
 
+from typing import Any
 from typing import Callable
 from typing import cast
+from typing import Dict
+from typing import List
 from typing import Optional
 
 from .abstractconverter import Coordinates
 from .abstractconverter import CoordinateTransform
+from .abstractconverter import decode_state
 from .flux_surfaces import FluxSurfaceCoordinates
+from ..abstract_equilibrium import AbstractEquilibrium
 from ..numpy_typing import ArrayLike
 from ..numpy_typing import LabeledArray
 
@@ -24,13 +29,16 @@ class EnclosedVolumeCoordinates(CoordinateTransform):
     """
 
     x2_name = "theta"
+    _TO_RZ_COST = 12.0
+    _FROM_RZ_COST = 4.0
 
     def __init__(
         self,
         flux_surfaces: FluxSurfaceCoordinates,
     ):
         self.flux_transform = flux_surfaces
-        self.equilibrium = flux_surfaces.equilibrium
+        if hasattr(flux_surfaces, "equilibrium"):
+            self.equilibrium = flux_surfaces.equilibrium
         self.x1_name = flux_surfaces.x1_name + "_enclosed_volume"
 
     def get_converter(
@@ -70,6 +78,10 @@ class EnclosedVolumeCoordinates(CoordinateTransform):
         else:
             return other.get_converter(self, True)
 
+    def _shortcut_neighbours(self) -> List[CoordinateTransform]:
+        """Returns the flux surface transform on which this one is based."""
+        return [self.flux_transform]
+
     def _convert_to_rho(
         self, volume: ArrayLike, theta: ArrayLike, t: ArrayLike
     ) -> Coordinates:
@@ -144,6 +156,16 @@ class EnclosedVolumeCoordinates(CoordinateTransform):
         rho, theta = self.flux_transform.convert_from_Rz(R, z, t)
         return self.flux_transform._convert_to_vol(rho, theta, t)
 
+    def _get_state(self) -> Dict[str, Any]:
+        return {"flux_surfaces": self.flux_transform._get_full_state()}
+
+    @classmethod
+    def _from_state(
+        cls, state: Dict[str, Any], equilibrium: Optional[AbstractEquilibrium]
+    ) -> "EnclosedVolumeCoordinates":
+        flux_surfaces = decode_state(state["flux_surfaces"], equilibrium)
+        return cls(cast(FluxSurfaceCoordinates, flux_surfaces))
+
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, self.__class__):
             return False
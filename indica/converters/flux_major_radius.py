@@ -1,8 +1,10 @@
 """Defines a coordinate system for use when estimating emissivity data."""
 
+from typing import Any
 from typing import Callable
 from typing import cast
 from typing import Dict
+from typing import List
 from typing import Optional
 
 import numpy as np
@@ -10,7 +12,9 @@ from xarray import DataArray
 
 from .abstractconverter import Coordinates
 from .abstractconverter import CoordinateTransform
+from .abstractconverter import decode_state
 from .flux_surfaces import FluxSurfaceCoordinates
+from ..abstract_equilibrium import AbstractEquilibrium
 from ..numpy_typing import LabeledArray
 
 
@@ -34,10 +38,13 @@ class FluxMajorRadCoordinates(CoordinateTransform):
     }
 
     x2_name = "R"
+    _TO_RZ_COST = 12.0
+    _FROM_RZ_COST = 2.0
 
     def __init__(self, flux_surfaces: FluxSurfaceCoordinates):
         self.flux_surfaces = flux_surfaces
-        self.equilibrium = flux_surfaces.equilibrium
+        if hasattr(flux_surfaces, "equilibrium"):
+            self.equilibrium = flux_surfaces.equilibrium
         self.flux_kind = flux_surfaces.flux_kind
         self.x1_name = flux_surfaces.x1_name
 
@@ -75,6 +82,10 @@ class FluxMajorRadCoordinates(CoordinateTransform):
                 return None
         return other.get_converter(self, True)
 
+    def _shortcut_neighbours(self) -> List[CoordinateTransform]:
+        """Returns the flux surface transform on which this one is based."""
+        return [self.flux_surfaces]
+
     def _convert_from_flux_coords(
         self, rho: LabeledArray, theta: LabeledArray, t: LabeledArray
     ) -> Coordinates:
@@ -154,6 +165,16 @@ class FluxMajorRadCoordinates(CoordinateTransform):
         rho, theta = self.flux_surfaces.convert_from_Rz(R, z, t)
         return rho, R
 
+    def _get_state(self) -> Dict[str, Any]:
+        return {"flux_surfaces": self.flux_surfaces._get_full_state()}
+
+    @classmethod
+    def _from_state(
+        cls, state: Dict[str, Any], equilibrium: Optional[AbstractEquilibrium]
+    ) -> "FluxMajorRadCoordinates":
+        flux_surfaces = decode_state(state["flux_surfaces"], equilibrium)
+        return cls(cast(FluxSurfaceCoordinates, flux_surfaces))
+
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, self.__class__):
             return False
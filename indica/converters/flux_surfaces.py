@@ -1,11 +1,12 @@
 """Class to handle conversions to and from flux surface coordinates."""
 
+from typing import Any
+from typing import Dict
 from typing import Optional
 
-import numpy as np
-
 from .abstractconverter import Coordinates
 from .abstractconverter import CoordinateTransform
+from ..abstract_equilibrium import AbstractEquilibrium
 from ..numpy_typing import LabeledArray
 
 
@@ -22,6 +23,8 @@ class FluxSurfaceCoordinates(CoordinateTransform):
     """
 
     x2_name = "theta"
+    _TO_RZ_COST = 10.0
+    _FROM_RZ_COST = 2.0
 
     def __init__(
         self,
@@ -104,8 +107,19 @@ class FluxSurfaceCoordinates(CoordinateTransform):
         vol, t = self.equilibrium.enclosed_volume(rho, t, self.flux_kind)
         return vol, theta
 
+    def _get_state(self) -> Dict[str, Any]:
+        return {"kind": self.flux_kind}
+
+    @classmethod
+    def _from_state(
+        cls, state: Dict[str, Any], equilibrium: Optional[AbstractEquilibrium]
+    ) -> "FluxSurfaceCoordinates":
+        result = cls(state["kind"])
+        if equilibrium is not None:
+            result.set_equilibrium(equilibrium)
+        return result
+
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, self.__class__):
             return False
-        result = self._abstract_equals(other)
-        return result and np.all(self.flux_kind == other.flux_kind)
+        return self._abstract_equals(other)
@@ -1,7 +1,10 @@
 """Coordinate systems based on volume enclosed by flux surfaces."""
 
+from typing import Any
 from typing import Callable
 from typing import cast
+from typing import Dict
+from typing import List
 from typing import Optional
 from typing import Tuple
 
@@ -11,8 +14,12 @@ from xarray import where
 
 from .abstractconverter import Coordinates
 from .abstractconverter import CoordinateTransform
+from .abstractconverter import decode_array
+from .abstractconverter import decode_state
+from .abstractconverter import encode_array
 from .flux_surfaces import FluxSurfaceCoordinates
 from .lines_of_sight import LinesOfSightTransform
+from ..abstract_equilibrium import AbstractEquilibrium
 from ..numpy_typing import LabeledArray
 from ..utilities import coord_array
 
@@ -38,6 +45,9 @@ class ImpactParameterCoordinates(CoordinateTransform):
         times at which equilibrium data is available.
     """
 
+    _TO_RZ_COST = 2.0
+    _FROM_RZ_COST = 21.0
+
     def __init__(
         self,
         lines_of_sight: LinesOfSightTransform,
@@ -133,6 +143,11 @@ class ImpactParameterCoordinates(CoordinateTransform):
         else:
             return other.get_converter(self, True)
 
+    def _shortcut_neighbours(self) -> List[CoordinateTransform]:
+        """Returns the line-of-sight and flux surface transforms on which
+        this one is based."""
+        return [self.lines_of_sight, self.flux_surfaces]
+
     def _convert_to_los(
         self, min_rho: LabeledArray, x2: LabeledArray, t: LabeledArray
     ) -> Coordinates:
@@ -278,6 +293,35 @@ class ImpactParameterCoordinates(CoordinateTransform):
         """
         return self.rho_min.mean("t").max()
 
+    def _get_state(self) -> Dict[str, Any]:
+        return {
+            "lines_of_sight": self.lines_of_sight._get_full_state(),
+            "flux_surfaces": self.flux_surfaces._get_full_state(),
+            "rho_min": encode_array(self.rho_min),
+        }
+
+    @classmethod
+    def _from_state(
+        cls, state: Dict[str, Any], equilibrium: Optional[AbstractEquilibrium]
+    ) -> "ImpactParameterCoordinates":
+        # Bypass the constructor, as the impact parameters have already
+        # been calculated and the equilibrium may not be available
+        result = cls.__new__(cls)
+        result.lines_of_sight = cast(
+            LinesOfSightTransform, decode_state(state["lines_of_sight"], equilibrium)
+        )
+        result.flux_surfaces = cast(
+            FluxSurfaceCoordinates, decode_state(state["flux_surfaces"], equilibrium)
+        )
+        if equilibrium is not None:
+            result.set_equilibrium(equilibrium)
+        result.rho_min = cast(DataArray, decode_array(state["rho_min"]))
+        result.x1_name = (
+            result.lines_of_sight.x1_name[:-6] + result.flux_surfaces.x1_name
+        )
+        result.x2_name = result.lines_of_sight.x2_name
+        return result
+
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, self.__class__):
             return False
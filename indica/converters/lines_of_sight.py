@@ -1,7 +1,9 @@
 """Coordinate system representing a collection of lines of sight.
 """
 
+from typing import Any
 from typing import Callable
+from typing import Dict
 from typing import Optional
 from typing import Tuple
 
@@ -12,6 +14,9 @@ from xarray import zeros_like
 
 from .abstractconverter import Coordinates
 from .abstractconverter import CoordinateTransform
+from .abstractconverter import decode_array
+from .abstractconverter import encode_array
+from ..abstract_equilibrium import AbstractEquilibrium
 from ..numpy_typing import LabeledArray
 
 
@@ -56,6 +61,9 @@ class LinesOfSightTransform(CoordinateTransform):
 
     """
 
+    _TO_RZ_COST = 1.0
+    _FROM_RZ_COST = 20.0
+
     def __init__(
         self,
         R_start: np.ndarray,
@@ -97,18 +105,41 @@ class LinesOfSightTransform(CoordinateTransform):
         self.x1_name = name + "_coords"
         self.x2_name = name + "_los_position"
 
+    def _get_state(self) -> Dict[str, Any]:
+        return {
+            "R_start": encode_array(self.R_start.data),
+            "z_start": encode_array(self.z_start.data),
+            "T_start": encode_array(self.T_start.data),
+            "R_end": encode_array(self._original_R_end.data),
+            "z_end": encode_array(self._original_z_end.data),
+            "T_end": encode_array(self._original_T_end.data),
+            "name": self.x1_name[: -len("_coords")],
+            "machine_dimensions": self._machine_dims,
+        }
+
+    @classmethod
+    def _from_state(
+        cls, state: Dict[str, Any], equilibrium: Optional[AbstractEquilibrium]
+    ) -> "LinesOfSightTransform":
+        (Rmin, Rmax), (zmin, zmax) = state["machine_dimensions"]
+        result = cls(
+            decode_array(state["R_start"]),
+            decode_array(state["z_start"]),
+            decode_array(state["T_start"]),
+            decode_array(state["R_end"]),
+            decode_array(state["z_end"]),
+            decode_array(state["T_end"]),
+            state["name"],
+            ((Rmin, Rmax), (zmin, zmax)),
+        )
+        if equilibrium is not None:
+            result.set_equilibrium(equilibrium)
+        return result
+
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, self.__class__):
             return False
-        result = self._abstract_equals(other)
-        result = result and np.all(self.R_start == other.R_start)
-        result = result and np.all(self.z_start == other.z_start)
-        result = result and np.all(self.T_start == other.T_start)
-        result = result and np.all(self.R_end == other.R_end)
-        result = result and np.all(self.z_end == other.z_end)
-        result = result and np.all(self.T_end == other.T_end)
-        result = result and self._machine_dims == other._machine_dims
-        return result
+        return self._abstract_equals(other)
 
     def convert_to_Rz(
         self, x1: LabeledArray, x2: LabeledArray, t: LabeledArray
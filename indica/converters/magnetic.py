@@ -1,14 +1,17 @@
 """Coordinate systems based on strength of magnetic field."""
 
+from typing import Any
 from typing import Callable
+from typing import Dict
+from typing import Optional
 from typing import Tuple
 
-import numpy as np
 from scipy.optimize import root_scalar
 from xarray import apply_ufunc
 
 from .abstractconverter import Coordinates
 from .abstractconverter import CoordinateTransform
+from ..abstract_equilibrium import AbstractEquilibrium
 from ..numpy_typing import LabeledArray
 
 
@@ -38,6 +41,9 @@ class MagneticCoordinates(CoordinateTransform):
 
     """
 
+    _TO_RZ_COST = 20.0
+    _FROM_RZ_COST = 2.0
+
     def __init__(
         self,
         z: float,
@@ -52,6 +58,7 @@ class MagneticCoordinates(CoordinateTransform):
         self.x2_name = self.x1_name + "_z_offset"
         self.left = machine_dimensions[0][0]
         self.right = machine_dimensions[0][1]
+        self._machine_dims = machine_dimensions
 
     def convert_to_Rz(
         self, x1: LabeledArray, x2: LabeledArray, t: LabeledArray
@@ -120,11 +127,27 @@ class MagneticCoordinates(CoordinateTransform):
         B, t2 = self.equilibrium.Btot(R, z, t)
         return B, z - self.z_los
 
+    def _get_state(self) -> Dict[str, Any]:
+        return {
+            "z": float(self.z_los),
+            "name": self.x1_name[: -len("_Btot")],
+            "machine_dimensions": self._machine_dims,
+        }
+
+    @classmethod
+    def _from_state(
+        cls, state: Dict[str, Any], equilibrium: Optional[AbstractEquilibrium]
+    ) -> "MagneticCoordinates":
+        (Rmin, Rmax), (zmin, zmax) = state["machine_dimensions"]
+        result = cls(state["z"], state["name"], ((Rmin, Rmax), (zmin, zmax)))
+        if equilibrium is not None:
+            result.set_equilibrium(equilibrium)
+        return result
+
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, self.__class__):
             return False
-        result = self._abstract_equals(other)
-        return result and np.all(self.z_los == other.z_los)
+        return self._abstract_equals(other)
 
 
 def find_brackets(
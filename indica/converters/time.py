@@ -1,8 +1,21 @@
 """Routines for averaging or interpolate along the time axis."""
 
+from itertools import chain
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
 import numpy as np
+from xarray import concat
 from xarray import DataArray
 
+#: Number of samples either side of an interpolated time which are kept
+#: in memory when interpolating a stream of chunks.
+INTERPOLATION_OVERLAP = 8
+
 
 def convert_in_time(
     tstart: float,
@@ -82,6 +95,12 @@ def interpolate_in_time(
         raise ValueError("End time {} not in range of provided data.".format(tend))
     npoints = round((tend - tstart) * frequency) + 1
     tvals = np.linspace(tstart, tend, npoints)
+    return _interpolate_to_times(tvals, data, method)
+
+
+def _interpolate_to_times(tvals: np.ndarray, data: DataArray, method: str) -> DataArray:
+    """Interpolate the data, its uncertainty and any dropped channels onto
+    the given times, without checking they lie within the data."""
     cleaned_data = data.indica.with_ignored_data
     result = cleaned_data.interp(t=tvals, method=method)
     if "error" in data.attrs:
@@ -97,9 +116,181 @@ def interpolate_in_time(
     return result
 
 
+def _time_bin_edges(tlabels: np.ndarray) -> np.ndarray:
+    """Work out the edges of the bins centred on each of the time labels.
+
+    When the labels are evenly spaced every bin has the same width. Otherwise
+    the edges lie half-way between neighbouring labels, with the outermost
+    bins extending as far beyond the first/last label as they do within it.
+
+    """
+    npoints = len(tlabels)
+    spacing = np.diff(tlabels)
+    edges = np.empty(npoints + 1)
+    if np.allclose(spacing, spacing[0], rtol=1e-9, atol=0.0):
+        half_interval = 0.5 * spacing[0]
+        edges[0] = tlabels[0] - half_interval
+        edges[1:] = tlabels + half_interval
+    else:
+        edges[0] = tlabels[0] - 0.5 * spacing[0]
+        edges[1:-1] = tlabels[:-1] + 0.5 * spacing
+        edges[-1] = tlabels[-1] + 0.5 * spacing[-1]
+    return edges
+
+
+def _sum_in_bins(
+    times: np.ndarray, edges: np.ndarray, values: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Sum an array over time bins.
+
+    Each bin is closed on its upper edge and open on its lower one. Samples
+    with times outside of the edges are ignored.
+
+    Parameters
+    ----------
+    times
+        Times at which the samples in ``values`` were taken, in ascending
+        order.
+    edges
+        Edges of the bins, in ascending order.
+    values
+        Array whose last axis corresponds to ``times``.
+
+    Returns
+    -------
+    counts
+        The number of samples falling in each bin.
+    sums
+        The sum of the samples falling in each bin (zero for empty bins),
+        with the bins along the last axis.
+
+    """
+    bounds = np.searchsorted(times, edges, side="right")
+    counts = np.diff(bounds)
+    sums = np.zeros(values.shape[:-1] + (len(counts),))
+    occupied = counts > 0
+    if np.any(occupied):
+        # Empty bins contain no samples, so each occupied bin runs right up
+        # to the start of the next one and reduceat can skip the empty ones.
+        sums[..., occupied] = np.add.reduceat(
+            values[..., : bounds[-1]], bounds[:-1][occupied], axis=-1
+        )
+    return counts, sums
+
+
+def _flatten_time(array: DataArray) -> np.ndarray:
+    """Return the values of the array as 2-D, with time along the last
+    axis."""
+    axis = array.dims.index("t")
+    return np.moveaxis(array.values, axis, -1).reshape(-1, array.shape[axis])
+
+
+def _unflatten_time(
+    values: np.ndarray, template: DataArray, tlabels: np.ndarray
+) -> DataArray:
+    """Inverse of :py:func:`_flatten_time`, placing the values on the time
+    labels but otherwise on the same coordinates as ``template``."""
+    axis = template.dims.index("t")
+    shape = [n for dim, n in zip(template.dims, template.shape) if dim != "t"]
+    values = np.moveaxis(values.reshape(shape + [len(tlabels)]), -1, axis)
+    coords = {
+        name: coord for name, coord in template.coords.items() if "t" not in coord.dims
+    }
+    coords["t"] = tlabels
+    return DataArray(values, coords, template.dims, name=template.name)
+
+
+def _time_binning_components(data: DataArray) -> List[Tuple[str, DataArray]]:
+    """List the arrays which must be binned alongside the data, keyed by
+    their role."""
+    components = [("data", data)]
+    if "error" in data.attrs:
+        components.append(("error", data.attrs["error"]))
+    if "dropped" in data.attrs:
+        components.append(("dropped", data.attrs["dropped"]))
+        if "error" in data.attrs:
+            components.append(("dropped_error", data.attrs["dropped"].attrs["error"]))
+    return components
+
+
+def _time_binning_nrows(components: List[Tuple[str, DataArray]]) -> int:
+    """The number of rows :py:func:`_time_binning_rows` will produce."""
+    return sum(
+        (1 if role.endswith("error") else 2) * (array.size // array.sizes["t"])
+        for role, array in components
+    )
+
+
+def _time_binning_rows(components: List[Tuple[str, DataArray]]) -> np.ndarray:
+    """Assemble the quantities to be summed in each bin into the rows of a
+    single 2-D array, with time along the columns. Values contribute their
+    NaN-free sum and a count of valid samples; errors contribute the sum of
+    their squares."""
+    rows = np.empty((_time_binning_nrows(components), components[0][1].sizes["t"]))
+    offset = 0
+    for role, array in components:
+        flat = _flatten_time(array)
+        width = len(flat)
+        if role.endswith("error"):
+            np.square(flat, out=rows[offset : offset + width])
+            offset += width
+        else:
+            valid = ~np.isnan(flat)
+            rows[offset : offset + width] = np.where(valid, flat, 0.0)
+            rows[offset + width : offset + 2 * width] = valid
+            offset += 2 * width
+    return rows
+
+
+def _time_binned_arrays(
+    components: List[Tuple[str, DataArray]],
+    counts: np.ndarray,
+    sums: np.ndarray,
+    tlabels: np.ndarray,
+) -> Dict[str, DataArray]:
+    """Turn the bin sums of the rows produced by
+    :py:func:`_time_binning_rows` into averages and uncertainties."""
+    results = {}
+    offset = 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for role, array in components:
+            width = array.size // array.sizes["t"]
+            if role.endswith("error"):
+                values = np.sqrt(sums[offset : offset + width]) / counts
+                offset += width
+            else:
+                total = sums[offset : offset + width]
+                nvalid = sums[offset + width : offset + 2 * width]
+                values = np.where(nvalid > 0, total / nvalid, np.nan)
+                offset += 2 * width
+            results[role] = _unflatten_time(values, array, tlabels)
+    return results
+
+
+def _assemble_binned(data: DataArray, binned: Dict[str, DataArray]) -> DataArray:
+    """Attach the binned uncertainties and dropped channels to the binned
+    data, in the same way as they were attached to the original data."""
+    averaged = binned["data"]
+    averaged.attrs = dict(data.attrs)
+    if "error" in binned:
+        averaged.attrs["error"] = binned["error"]
+    if "dropped" in binned:
+        averaged.attrs["dropped"] = binned["dropped"]
+        if "dropped_error" in binned:
+            averaged.attrs["dropped"].attrs["error"] = binned["dropped_error"]
+    if "provenance" in data.attrs:
+        del averaged.attrs["partial_provenance"]
+        del averaged.attrs["provenance"]
+    return averaged
+
+
 def bin_to_time_labels(tlabels: np.ndarray, data: DataArray) -> DataArray:
     """Bin data to sit on the specified time labels.
 
+    The data, its uncertainty and any dropped channels are all binned in a
+    single pass. The labels need not be evenly spaced; bin edges are placed
+    half-way between neighbouring labels.
+
     Parameters
     ----------
     tlabels
@@ -115,52 +306,20 @@ def bin_to_time_labels(tlabels: np.ndarray, data: DataArray) -> DataArray:
     """
     if data.coords["t"].shape == tlabels.shape and np.all(data.coords["t"] == tlabels):
         return data
-    npoints = len(tlabels)
-    half_interval = 0.5 * (tlabels[1] - tlabels[0])
-    tbins = np.empty(npoints + 1)
-    tbins[0] = tlabels[0] - half_interval
-    tbins[1:] = tlabels + half_interval
-    grouped = data.sel(t=slice(tbins[0], tbins[-1])).groupby_bins(
-        "t", tbins, labels=tlabels
+    tlabels = np.asarray(tlabels, dtype=float)
+    edges = _time_bin_edges(tlabels)
+    times = data.coords["t"].values
+    first, last = np.searchsorted(times, edges[[0, -1]], side="right")
+    components = [
+        (role, array.isel(t=slice(first, last)))
+        for role, array in _time_binning_components(data)
+    ]
+    counts, sums = _sum_in_bins(
+        times[first:last], edges, _time_binning_rows(components)
+    )
+    return _assemble_binned(
+        data, _time_binned_arrays(components, counts, sums, tlabels)
     )
-    averaged = grouped.mean("t", keep_attrs=True)
-    if "error" in data.attrs:
-        grouped = (
-            data.attrs["error"]
-            .sel(t=slice(tbins[0], tbins[-1]))
-            .groupby_bins("t", tbins, labels=tlabels)
-        )
-        uncertainty = np.sqrt(
-            grouped.reduce(
-                lambda x, axis: np.sum(x ** 2, axis) / np.size(x, axis) ** 2, "t"
-            )
-        )
-        averaged.attrs["error"] = uncertainty.rename(t_bins="t")
-    if "dropped" in data.attrs:
-        grouped = (
-            data.attrs["dropped"]
-            .sel(t=slice(tbins[0], tbins[-1]))
-            .groupby_bins("t", tbins, labels=tlabels)
-        )
-        dropped = grouped.mean("t")
-        averaged.attrs["dropped"] = dropped.rename(t_bins="t")
-        if "error" in data.attrs:
-            grouped = (
-                data.attrs["dropped"]
-                .attrs["error"]
-                .sel(t=slice(tbins[0], tbins[-1]))
-                .groupby_bins("t", tbins, labels=tlabels)
-            )
-            uncertainty = np.sqrt(
-                grouped.reduce(
-                    lambda x, axis: np.sum(x ** 2, axis) / np.size(x, axis) ** 2, "t"
-                )
-            )
-            averaged.attrs["dropped"].attrs["error"] = uncertainty.rename(t_bins="t")
-    if "provenance" in data.attrs:
-        del averaged.attrs["partial_provenance"]
-        del averaged.attrs["provenance"]
-    return averaged.rename(t_bins="t")
 
 
 def bin_in_time(
@@ -203,3 +362,269 @@ def bin_in_time(
         )
     tlabels = np.linspace(tstart, tend, npoints)
     return bin_to_time_labels(tlabels, data)
+
+
+def convert_in_time_chunks(
+    tstart: float,
+    tend: float,
+    frequency: float,
+    chunks: Iterable[DataArray],
+    method: str = "linear",
+) -> Iterator[DataArray]:
+    """Interpolate or bin (as appropriate) data which arrives as a sequence
+    of consecutive chunks along the time axis. This gives the same results as
+    :py:func:`convert_in_time` applied to the concatenated chunks, but only
+    ever holds a bounded amount of data in memory.
+
+    Parameters
+    ----------
+    tstart
+        The lower limit in time for determining which data to retain.
+    tend
+        The upper limit in time for determining which data to retain.
+    frequency
+        Frequency of sampling on the time axis.
+    chunks
+        Consecutive pieces of the data to be interpolated/binned, in
+        ascending order of time. The first must contain at least two times.
+    method
+        Interpolation method to use. Must be a value accepted by
+        :py:class:`scipy.interpolate.interp1d`.
+
+    Returns
+    -------
+    :
+        Consecutive pieces of an array like the input, but interpolated or
+        binned along the time axis.
+
+    """
+    chunks = iter(chunks)
+    first_chunk = next(chunks)
+    original_freq = 1 / (first_chunk.coords["t"][1] - first_chunk.coords["t"][0])
+    chunks = chain([first_chunk], chunks)
+    if frequency / original_freq <= 0.2:
+        return bin_in_time_chunks(tstart, tend, frequency, chunks)
+    else:
+        return interpolate_in_time_chunks(tstart, tend, frequency, chunks, method)
+
+
+def _check_chunk_order(chunk: DataArray, previous_time: Optional[float]):
+    """Make sure a chunk starts after the previous one ended."""
+    if previous_time is not None and chunk.coords["t"][0] <= previous_time:
+        raise ValueError(
+            "Chunk starting at time {} does not follow on from previous chunk "
+            "ending at time {}.".format(float(chunk.coords["t"][0]), previous_time)
+        )
+
+
+def _concat_in_time(first: DataArray, second: DataArray) -> DataArray:
+    """Join two consecutive chunks of data along the time axis, along with
+    their uncertainties and dropped channels."""
+    result = concat([first, second], "t")
+    result.attrs = dict(second.attrs)
+    if "error" in second.attrs:
+        result.attrs["error"] = concat(
+            [first.attrs["error"], second.attrs["error"]], "t"
+        )
+    if "dropped" in second.attrs:
+        dropped = concat([first.attrs["dropped"], second.attrs["dropped"]], "t")
+        dropped.attrs = {}
+        if "error" in second.attrs:
+            dropped.attrs["error"] = concat(
+                [
+                    first.attrs["dropped"].attrs["error"],
+                    second.attrs["dropped"].attrs["error"],
+                ],
+                "t",
+            )
+        result.attrs["dropped"] = dropped
+    return result
+
+
+def _slice_in_time(data: DataArray, times: slice) -> DataArray:
+    """Select a range of time indices from the data, its uncertainty and
+    any dropped channels."""
+    result = data.isel(t=times)
+    result.attrs = dict(data.attrs)
+    if "error" in data.attrs:
+        result.attrs["error"] = data.attrs["error"].isel(t=times)
+    if "dropped" in data.attrs:
+        dropped = data.attrs["dropped"].isel(t=times)
+        dropped.attrs = {}
+        if "error" in data.attrs:
+            dropped.attrs["error"] = data.attrs["dropped"].attrs["error"].isel(t=times)
+        result.attrs["dropped"] = dropped
+    return result
+
+
+def interpolate_in_time_chunks(
+    tstart: float,
+    tend: float,
+    frequency: float,
+    chunks: Iterable[DataArray],
+    method: str = "linear",
+) -> Iterator[DataArray]:
+    """Interpolate data arriving as a sequence of consecutive chunks along
+    the time axis, discarding data before or after the limits.
+
+    Only the last :py:data:`INTERPOLATION_OVERLAP` samples either side of a
+    chunk boundary are carried over to the next chunk. This is exact for
+    the local interpolation methods; the spline-based ones ("quadratic",
+    "cubic") may differ negligibly from :py:func:`interpolate_in_time`
+    near chunk boundaries.
+
+    Parameters
+    ----------
+    tstart
+        The lower limit in time for determining which data to retain.
+    tend
+        The upper limit in time for determining which data to retain.
+    frequency
+        Frequency of sampling on the time axis.
+    chunks
+        Consecutive pieces of the data to be interpolated, in ascending order
+        of time.
+    method
+        Interpolation method to use. Must be a value accepted by
+        :py:class:`scipy.interpolate.interp1d`.
+
+    Returns
+    -------
+    :
+        Consecutive pieces of an array like the input, but interpolated along
+        the time axis.
+
+    """
+    npoints = round((tend - tstart) * frequency) + 1
+    tvals = np.linspace(tstart, tend, npoints)
+    next_time = 0
+    window: Optional[DataArray] = None
+    for chunk in chunks:
+        if chunk.sizes["t"] == 0:
+            continue
+        if window is None:
+            if chunk.coords["t"][0] > tstart:
+                raise ValueError(
+                    "Start time {} not in range of provided data.".format(tstart)
+                )
+            window = chunk
+        else:
+            _check_chunk_order(chunk, float(window.coords["t"][-1]))
+            window = _concat_in_time(window, chunk)
+        times = window.coords["t"].values
+        if len(times) <= 2 * INTERPOLATION_OVERLAP:
+            continue
+        stop = np.searchsorted(tvals, times[-INTERPOLATION_OVERLAP - 1], side="right")
+        if stop > next_time:
+            yield _interpolate_to_times(tvals[next_time:stop], window, method)
+            next_time = stop
+        window = _slice_in_time(window, slice(-2 * INTERPOLATION_OVERLAP, None))
+    if window is None or window.coords["t"][-1] < tend:
+        raise ValueError("End time {} not in range of provided data.".format(tend))
+    if next_time < npoints:
+        yield _interpolate_to_times(tvals[next_time:], window, method)
+
+
+def bin_in_time_chunks(
+    tstart: float, tend: float, frequency: float, chunks: Iterable[DataArray]
+) -> Iterator[DataArray]:
+    """Bin data arriving as a sequence of consecutive chunks along the time
+    axis, discarding data before or after the limits.
+
+    Running sums are kept only for bins which have not yet been completed,
+    so bins straddling chunk boundaries are handled exactly and memory use
+    does not grow with the length of the data.
+
+    Parameters
+    ----------
+    tstart
+        The lower limit in time for determining which data to retain.
+    tend
+        The upper limit in time for determining which data to retain.
+    frequency
+        Frequency of sampling on the time axis.
+    chunks
+        Consecutive pieces of the data to be binned, in ascending order of
+        time.
+
+    Returns
+    -------
+    :
+        Consecutive pieces of an array like the input, but binned along the
+        time axis.
+
+    """
+    npoints = round(abs(tend - tstart) * frequency) + 1
+    half_interval = 0.5 * (tend - tstart) / (npoints - 1)
+    tlabels = np.linspace(tstart, tend, npoints)
+    edges = _time_bin_edges(tlabels)
+    # Index of the first bin not yet returned, and the counts and sums for
+    # it and the bins after it which have received data
+    next_bin = 0
+    counts = np.zeros(0, dtype=int)
+    sums = np.zeros((0, 0))
+    template: Optional[DataArray] = None
+
+    def pad_bins(nbins: int):
+        nonlocal counts, sums
+        extra = nbins - len(counts)
+        if extra > 0:
+            counts = np.concatenate([counts, np.zeros(extra, dtype=int)])
+            sums = np.concatenate([sums, np.zeros((len(sums), extra))], axis=1)
+
+    def complete_bins(stop: int) -> DataArray:
+        nonlocal next_bin, counts, sums
+        assert template is not None
+        nbins = stop - next_bin
+        components = _time_binning_components(template)
+        binned = _time_binned_arrays(
+            components, counts[:nbins], sums[:, :nbins], tlabels[next_bin:stop]
+        )
+        next_bin = stop
+        counts = counts[nbins:]
+        sums = sums[:, nbins:]
+        return _assemble_binned(template, binned)
+
+    for chunk in chunks:
+        if chunk.sizes["t"] == 0:
+            continue
+        times = chunk.coords["t"].values
+        if template is None:
+            if times[0] > tstart + half_interval:
+                raise ValueError(
+                    "No data falls within first bin {}.".format(
+                        (tstart - half_interval, tstart + half_interval)
+                    )
+                )
+            sums = np.zeros((_time_binning_nrows(_time_binning_components(chunk)), 0))
+        else:
+            _check_chunk_order(chunk, float(template.coords["t"][-1]))
+        template = chunk
+        stop = min(np.searchsorted(edges, times[-1], side="left"), npoints)
+        if stop > next_bin:
+            first, last = np.searchsorted(times, edges[[next_bin, stop]], side="right")
+            components = [
+                (role, array.isel(t=slice(first, last)))
+                for role, array in _time_binning_components(chunk)
+            ]
+            new_counts, new_sums = _sum_in_bins(
+                times[first:last],
+                edges[next_bin : stop + 1],
+                _time_binning_rows(components),
+            )
+            nbins = stop - next_bin
+            pad_bins(nbins)
+            counts[:nbins] += new_counts
+            sums[:, :nbins] += new_sums
+        done = min(np.searchsorted(edges[1:], times[-1], side="right"), npoints)
+        if done > next_bin:
+            yield complete_bins(done)
+    if template is None or template.coords["t"][-1] < tend - half_interval:
+        raise ValueError(
+            "No data falls within last bin {}.".format(
+                (tend - half_interval, tend + half_interval)
+            )
+        )
+    if next_bin < npoints:
+        pad_bins(npoints - next_bin)
+        yield complete_bins(npoints)
@@ -1,5 +1,9 @@
 """Coordinate system for data collected on a 1-D along through the Tokamak"""
 
+from typing import Any
+from typing import Dict
+from typing import Optional
+
 import numpy as np
 from scipy.interpolate import interp1d
 from xarray import DataArray
@@ -8,6 +12,9 @@ from xarray import Variable
 
 from .abstractconverter import Coordinates
 from .abstractconverter import CoordinateTransform
+from .abstractconverter import decode_array
+from .abstractconverter import encode_array
+from ..abstract_equilibrium import AbstractEquilibrium
 from ..numpy_typing import LabeledArray
 
 
@@ -45,6 +52,8 @@ class TransectCoordinates(CoordinateTransform):
 
     def __init__(self, R_positions: LabeledArray, z_positions: LabeledArray):
         assert isinstance(R_positions, (DataArray, Dataset, Variable))
+        self.R_positions = R_positions
+        self.z_positions = z_positions
         indices = DataArray(np.arange(len(R_positions)))
         self.R_vals = interp1d(
             indices, R_positions, copy=False, fill_value="extrapolate"
@@ -121,6 +130,23 @@ class TransectCoordinates(CoordinateTransform):
         x2 = z - tmp  # type: ignore
         return x1, x2
 
+    def _get_state(self) -> Dict[str, Any]:
+        return {
+            "R_positions": encode_array(self.R_positions),
+            "z_positions": encode_array(self.z_positions),
+        }
+
+    @classmethod
+    def _from_state(
+        cls, state: Dict[str, Any], equilibrium: Optional[AbstractEquilibrium]
+    ) -> "TransectCoordinates":
+        result = cls(
+            decode_array(state["R_positions"]), decode_array(state["z_positions"])
+        )
+        if equilibrium is not None:
+            result.set_equilibrium(equilibrium)
+        return result
+
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, self.__class__):
             return False
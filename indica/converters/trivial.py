@@ -1,8 +1,13 @@
 """Trivial class for transforming to and from R-z coordinate systems.
 """
 
+from typing import Any
+from typing import Dict
+from typing import Optional
+
 from .abstractconverter import Coordinates
 from .abstractconverter import CoordinateTransform
+from ..abstract_equilibrium import AbstractEquilibrium
 from ..numpy_typing import LabeledArray
 
 
@@ -15,6 +20,8 @@ class TrivialTransform(CoordinateTransform):
 
     x1_name = "R"
     x2_name = "z"
+    _TO_RZ_COST = 0.0
+    _FROM_RZ_COST = 0.0
 
     def convert_to_Rz(
         self, x1: LabeledArray, x2: LabeledArray, t: LabeledArray
@@ -64,6 +71,18 @@ class TrivialTransform(CoordinateTransform):
         """
         return R, z
 
+    def _get_state(self) -> Dict[str, Any]:
+        return {}
+
+    @classmethod
+    def _from_state(
+        cls, state: Dict[str, Any], equilibrium: Optional[AbstractEquilibrium]
+    ) -> "TrivialTransform":
+        result = cls()
+        if equilibrium is not None:
+            result.set_equilibrium(equilibrium)
+        return result
+
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, self.__class__):
             return False
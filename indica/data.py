@@ -69,8 +69,8 @@ def _convert_coords(
     """
     if transform.x1_name not in array.coords or transform.x2_name not in array.coords:
         self_trans: CoordinateTransform = array.attrs["transform"]
-        converter = self_trans.get_converter(transform)
-        if converter:
+        converter = self_trans.get_conversion_path(transform)
+        if not converter.via_Rz:
             x1, x2 = converter(
                 array.coords[self_trans.x1_name],
                 array.coords[self_trans.x2_name],
@@ -30,6 +30,10 @@ GENERAL_DATATYPES: Dict[GeneralDataType, Tuple[str, str]] = {
         "Portion of nuclei which are the given type of ion",
         "%",
     ),
+    "cx_emissions": (
+        "Emissions from charge exchange recombination with neutral hydrogen",
+        "W m^3",
+    ),
     "effective_charge": (
         "Ratio of positive ion charge to electron charge in plasma",
         "",
@@ -39,6 +43,10 @@ GENERAL_DATATYPES: Dict[GeneralDataType, Tuple[str, str]] = {
         "Product of toroidal magnetic field strength and major radius",
         "Wb m",
     ),
+    "fractional_abundance": (
+        "Fraction of the ions of an element which are in each charge state",
+        "",
+    ),
     "ion_coeffs": ("Effective ionisation coefficients", "m^3 s^{-1}"),
     "line_emissions": ("Line emissions from excitation", "W m^3"),
     "luminous_flux": (
@@ -63,6 +71,7 @@ GENERAL_DATATYPES: Dict[GeneralDataType, Tuple[str, str]] = {
     "temperature": ("Thermal temperature of some particals", "eV"),
     "time": ("Time into the pulse", "s"),
     "toroidal_flux": ("Unnormalised toroidal component of magnetic flux", "Wb"),
+    "radiated_power": ("Total power radiated from a volume of plasma", "W"),
     "recomb_coeffs": ("Effective recombination coefficients", "m^3 s^{-1}"),
     "recomb_emissions": ("Emissions from recombination and bremsstrahlung", "W m^3"),
     "sxr_line_emissions": ("SXR-filtered line emissions from excitation", "W m^3"),
@@ -70,6 +79,10 @@ GENERAL_DATATYPES: Dict[GeneralDataType, Tuple[str, str]] = {
         "SXR-filtered emissions from recombination and bremsstrahlung",
         "W m^3",
     ),
+    "total_radiation_coeffs": (
+        "Power radiated by an element, per ion and per electron",
+        "W m^3",
+    ),
     "vol_jacobian": (
         "Derivative of enclosed volume with respect to normalised poloidal flux",
         "m^3",
@@ -100,11 +113,12 @@ SPECIFIC_DATATYPES: Dict[SpecificDataType, str] = {
 #: A mapping between ADAS datatypes for ADF11 data and the general
 # datatype used by indica.
 ADF11_GENERAL_DATATYPES: Dict[str, GeneralDataType] = {
-    "scd": "ion_coeff",
+    "scd": "ion_coeffs",
     "acd": "recomb_coeffs",
     "plt": "line_emissions",
     "plsx": "sxr_line_emissions",
     "prb": "recomb_emissions",
+    "prc": "cx_emissions",
     "prsx": "sxr_recomb_emissions",
 }
 
@@ -1,7 +1,27 @@
 from .abstractoperator import Operator
 from .abstractoperator import OperatorError
+from .atomic_rates import RateInterpolator
+from .fractional_abundance import FractionalAbundance
 from .invert_radiation import InvertRadiation
+from .ionisation_balance import IonisationBalance
+from .line_integral import LineIntegral
+from .radiated_power import RadiatedPower
+from .result_cache import ResultCache
 from .spline_fit import SplineFit
+from .tomography import PixelTomography
 from .zeff import CalcZeff
 
-__all__ = ["Operator", "OperatorError", "CalcZeff", "InvertRadiation", "SplineFit"]
+__all__ = [
+    "Operator",
+    "OperatorError",
+    "CalcZeff",
+    "FractionalAbundance",
+    "InvertRadiation",
+    "IonisationBalance",
+    "LineIntegral",
+    "PixelTomography",
+    "RadiatedPower",
+    "RateInterpolator",
+    "ResultCache",
+    "SplineFit",
+]
@@ -4,10 +4,13 @@
 from abc import ABC
 from abc import abstractmethod
 import datetime
+from functools import wraps
 from itertools import zip_longest
 from typing import Any
+from typing import Callable
 from typing import cast
 from typing import List
+from typing import Optional
 from typing import Tuple
 from typing import TYPE_CHECKING
 from typing import Union
@@ -17,6 +20,7 @@ import prov.model as prov
 from xarray import DataArray
 from xarray import Dataset
 
+from .. import profiling
 from .. import session
 from ..datatypes import DatasetType
 from ..datatypes import DataType
@@ -28,6 +32,8 @@ Data = Union[DataArray, Dataset]
 
 if TYPE_CHECKING:
     from builtins import ellipsis as EllipsisType
+
+    from .result_cache import ResultCache
 else:
     EllipsisType = type(Ellipsis)
 
@@ -39,6 +45,29 @@ class OperatorError(Exception):
     """
 
 
+def _memoise(call: Callable[..., Any]) -> Callable[..., Any]:
+    """Wraps the ``__call__`` method of an operator class so that, if the
+    operator has a cache, results are looked up there before being
+    calculated. Calls are also timed by any active
+    :py:class:`indica.profiling.Profiler`. Only the most derived
+    implementation of ``__call__`` does this, so subclasses may still call
+    ``super().__call__``.
+
+    """
+
+    @wraps(call)
+    def memoised_call(self, *args):
+        if type(self).__call__ is not memoised_call:
+            return call(self, *args)
+        cache = getattr(self, "cache", None)
+        with profiling.span(self.__class__.__name__, "operator"):
+            if cache is None:
+                return call(self, *args)
+            return cache.call(self, lambda *a: call(self, *a), args)
+
+    return memoised_call
+
+
 class Operator(ABC):
 
     """Abstract base class for performing calculations with data.
@@ -66,6 +95,10 @@ class Operator(ABC):
         Ordered list of the types of data returned by the operator.
     prov_id: str
         The hash used to identify this object in provenance documents.
+    cache: Optional[ResultCache]
+        If set, results are stored here and reused when the operator is
+        called again with the same arguments. Defaults to the
+        ``operator_cache`` of the session.
     agent: prov.model.ProvAgent
         An agent representing this object in provenance documents.
         DataArray objects can be attributed to it.
@@ -77,6 +110,12 @@ class Operator(ABC):
 
     ARGUMENT_TYPES: List[Union[DataType, EllipsisType]] = []
 
+    def __init_subclass__(cls, **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        call = cls.__dict__.get("__call__")
+        if call is not None and not getattr(call, "__isabstractmethod__", False):
+            cls.__call__ = _memoise(call)  # type: ignore
+
     def __init__(self, sess: session.Session = session.global_session, **kwargs: Any):
         """Creates a provenance entity/agent for the operator object. Also
         checks arguments and results are of valid datatypes. Should be
@@ -84,6 +123,7 @@ class Operator(ABC):
 
         """
         self._session = sess
+        self.cache: Optional["ResultCache"] = sess.operator_cache
         # TODO: also include library version and, ideally, version of
         # relevent dependency in the hash
         self.prov_id = session.hash_vals(
@@ -292,6 +332,15 @@ class Operator(ABC):
             self.activity.wasInformedBy(self._session.session)
             for arg in self._input_provenance:
                 self.activity.used(arg)
+            profiler = profiling.active_profiler
+            span = profiler.current_span() if profiler else None
+            if profiler and profiler.attach_provenance and span:
+                attributes = {
+                    "profile_" + key: value for key, value in span.counters.items()
+                }
+                if span.peak_memory is not None:
+                    attributes["profile_peak_memory"] = span.peak_memory
+                self.activity.add_attributes(attributes)
         entity_id = session.hash_vals(
             creator=self.prov_id,
             date=self.end_time,
@@ -335,6 +384,20 @@ class Operator(ABC):
             else:
                 data.attrs["provenance"] = entity
 
+    def _restore_from_cache(self, *results: Data):
+        """Recreate any attributes of results loaded from a
+        :py:class:`indica.operators.ResultCache` which could not be stored
+        there, along with any state the operator keeps from its last
+        call. This is done before provenance is assigned. By default
+        nothing is done.
+
+        Parameters
+        ----------
+        results
+            The results of the operator, as they would have been returned.
+
+        """
+
     @abstractmethod
     def __call__(self, *args: DataArray) -> Union[DataArray, Dataset]:
         """The invocation of the operator.
@@ -0,0 +1,211 @@
+"""Interpolation of ADAS rate coefficients onto plasma profiles."""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Literal
+from typing import Tuple
+
+import numpy as np
+from scipy.interpolate import CubicSpline
+from xarray import broadcast
+from xarray import DataArray
+
+from .result_cache import data_fingerprint
+
+Extrapolation = Literal["nan", "clip", "extrapolate", "raise"]
+
+#: Names of the temperature and density coordinates of ADF11 data, which
+#: hold log10 values, and of ADF15 data, which hold the values themselves.
+LOG_COORDS = ("log10_electron_temperature", "log10_electron_density")
+LINEAR_COORDS = ("electron_temperature", "electron_density")
+
+#: The number of points to evaluate at once, limiting the memory used to
+#: gather coefficients.
+CHUNK_SIZE = 2 ** 14
+
+#: The maximum number of interpolators to keep in :py:func:`rate_interpolator`.
+MAX_CACHED_INTERPOLATORS = 64
+
+
+class RateInterpolator:
+    """Bicubic interpolation of atomic data in log10 temperature and log10
+    density, for all charge states (or transitions) at once.
+
+    Tensor-product cubic spline coefficients are calculated once, on
+    construction, for every cell of the table. Evaluation then gathers
+    the coefficients of the cell containing each point and sums the
+    polynomial terms in a single vectorised operation.
+
+    Parameters
+    ----------
+    table
+        ADF11 data as returned by
+        :py:meth:`indica.readers.ADASReader.get_adf11`, whose values are
+        log10 rate coefficients, or ADF15 data as returned by
+        :py:meth:`indica.readers.ADASReader.get_adf15`, whose values are
+        the coefficients themselves. Either way, interpolation is
+        performed on the logarithm of the values.
+    extrapolation
+        What to do at points outside the temperature and density range of
+        the table: "nan" gives NaN, "clip" uses the value at the nearest
+        edge of the table, "extrapolate" extends the polynomials of the
+        edge cells and "raise" raises a ValueError.
+
+    """
+
+    def __init__(self, table: DataArray, extrapolation: Extrapolation = "nan"):
+        if all(c in table.dims for c in LOG_COORDS):
+            self.log_values = True
+            temp_dim, dens_dim = LOG_COORDS
+        elif all(c in table.dims for c in LINEAR_COORDS):
+            self.log_values = False
+            temp_dim, dens_dim = LINEAR_COORDS
+        else:
+            raise ValueError(
+                "Atomic data must have electron temperature and density dimensions."
+            )
+        if extrapolation not in ("nan", "clip", "extrapolate", "raise"):
+            raise ValueError(f"Unrecognised extrapolation policy '{extrapolation}'.")
+        self.extrapolation = extrapolation
+        others = [d for d in table.dims if d not in (temp_dim, dens_dim)]
+        if len(others) != 1:
+            raise ValueError(
+                "Atomic data must have exactly one dimension other than "
+                "temperature and density."
+            )
+        self.dim = others[0]
+        self.coords = {
+            k: v
+            for k, v in table.coords.items()
+            if temp_dim not in v.dims and dens_dim not in v.dims
+        }
+        table = table.transpose(self.dim, temp_dim, dens_dim)
+        self.log10_Te = np.asarray(table.coords[temp_dim], dtype=float)
+        self.log10_ne = np.asarray(table.coords[dens_dim], dtype=float)
+        values = np.asarray(table, dtype=float)
+        if not self.log_values:
+            self.log10_Te = np.log10(self.log10_Te)
+            self.log10_ne = np.log10(self.log10_ne)
+            values = np.log10(np.maximum(values, np.finfo(float).tiny))
+        # Spline along temperature, then spline each temperature
+        # coefficient along density, giving the tensor-product spline.
+        te_coeffs = CubicSpline(self.log10_Te, values, axis=1).c
+        # te_coeffs has shape (4, nt - 1, nz, nd)
+        coeffs = CubicSpline(self.log10_ne, te_coeffs, axis=3).c
+        # coeffs has shape (4, nd - 1, 4, nt - 1, nz)
+        self.coefficients = np.ascontiguousarray(coeffs.transpose(4, 3, 1, 2, 0))
+
+    def _cells(
+        self, x: np.ndarray, knots: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Find the cell containing each point, its offset from the start
+        of that cell and whether it lies outside the table."""
+        outside = (x < knots[0]) | (x > knots[-1])
+        if self.extrapolation == "raise" and np.any(outside):
+            raise ValueError("Atomic data requested outside the range of the table.")
+        if self.extrapolation == "clip":
+            x = np.clip(x, knots[0], knots[-1])
+        cell = np.clip(np.searchsorted(knots, x, "right") - 1, 0, len(knots) - 2)
+        return cell, x - knots[cell], outside
+
+    def interpolate(self, log10_Te: np.ndarray, log10_ne: np.ndarray) -> np.ndarray:
+        """Interpolate the logarithm of the data at the given points.
+
+        Parameters
+        ----------
+        log10_Te
+            Logarithm of the electron temperature at each point.
+        log10_ne
+            Logarithm of the electron density at each point, with the same
+            shape as ``log10_Te``.
+
+        Returns
+        -------
+        :
+            Logarithm of the data, with the charge state (or transition) as
+            the first axis followed by the shape of the points.
+
+        """
+        shape = np.shape(log10_Te)
+        te = np.ravel(log10_Te)
+        ne = np.ravel(log10_ne)
+        result = np.empty((self.coefficients.shape[0], te.size))
+        for start in range(0, te.size, CHUNK_SIZE):
+            chunk = slice(start, start + CHUNK_SIZE)
+            te_cell, dte, te_outside = self._cells(te[chunk], self.log10_Te)
+            ne_cell, dne, ne_outside = self._cells(ne[chunk], self.log10_ne)
+            te_powers = dte[:, np.newaxis] ** np.arange(3, -1, -1)
+            ne_powers = dne[:, np.newaxis] ** np.arange(3, -1, -1)
+            result[:, chunk] = np.einsum(
+                "zpab,pa,pb->zp",
+                self.coefficients[:, te_cell, ne_cell],
+                te_powers,
+                ne_powers,
+            )
+            invalid = ~(np.isfinite(te[chunk]) & np.isfinite(ne[chunk]))
+            if self.extrapolation == "nan":
+                invalid |= te_outside | ne_outside
+            result[:, chunk][:, invalid] = np.nan
+        return result.reshape((-1,) + shape)
+
+    def __call__(self, Te: DataArray, ne: DataArray) -> DataArray:
+        """Evaluate the data for profiles of electron temperature and
+        density.
+
+        Parameters
+        ----------
+        Te
+            Electron temperature.
+        ne
+            Electron density. Will be broadcast against ``Te``.
+
+        Returns
+        -------
+        :
+            The interpolated data, in the same form as the table (i.e.,
+            log10 values for ADF11 data). The first dimension is the charge
+            state (or transition), followed by the dimensions of ``Te``
+            and ``ne``.
+
+        """
+        Te, ne = broadcast(Te, ne)
+        log10_result = self.interpolate(np.log10(Te.values), np.log10(ne.values))
+        return DataArray(
+            log10_result if self.log_values else 10 ** log10_result,
+            dims=(self.dim,) + Te.dims,
+            coords={**self.coords, **Te.coords},
+        )
+
+
+_interpolators: "OrderedDict[Tuple[str, str], RateInterpolator]" = OrderedDict()
+_interpolators_lock = Lock()
+
+
+def rate_interpolator(
+    table: DataArray, extrapolation: Extrapolation = "nan"
+) -> RateInterpolator:
+    """Get a :py:class:`RateInterpolator` for some atomic data. The
+    interpolators for recently used tables are cached, keyed on the
+    contents of the table, so the spline coefficients are only calculated
+    once per file.
+
+    Parameters
+    ----------
+    table
+        ADF11 or ADF15 data, as returned by
+        :py:class:`indica.readers.ADASReader`.
+    extrapolation
+        The policy for points outside the range of the table.
+
+    """
+    key = (data_fingerprint(table), extrapolation)
+    with _interpolators_lock:
+        if key in _interpolators:
+            _interpolators.move_to_end(key)
+            return _interpolators[key]
+    interpolator = RateInterpolator(table, extrapolation)
+    with _interpolators_lock:
+        _interpolators[key] = interpolator
+        while len(_interpolators) > MAX_CACHED_INTERPOLATORS:
+            _interpolators.popitem(last=False)
+    return interpolator
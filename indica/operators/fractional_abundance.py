@@ -0,0 +1,134 @@
+"""Calculates the fraction of the ions of an impurity which are in each
+charge state, using atomic data from ADAS."""
+
+from typing import List
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+from xarray import DataArray
+
+from .abstractoperator import EllipsisType
+from .abstractoperator import Operator
+from .atomic_rates import Extrapolation
+from .atomic_rates import rate_interpolator
+from .. import session
+from ..datatypes import DataType
+
+
+class FractionalAbundance(Operator):
+    """Calculate the fractional abundance of each charge state of an
+    element in ionisation equilibrium.
+
+    With effective ionisation and recombination coefficients :math:`S_i`
+    (for charge :math:`i` to :math:`i+1`) and :math:`\\alpha_i` (for
+    :math:`i+1` to :math:`i`), the densities satisfy :math:`n_{i+1}/n_i
+    = S_i/\\alpha_i`. The logarithms of these ratios are accumulated over
+    charge states and normalised, for every point of the plasma at once.
+
+    Parameters
+    ----------
+    extrapolation : str
+        How to treat temperatures and densities outside the range of the
+        atomic data. See :py:class:`indica.operators.RateInterpolator`.
+    sess : session.Session
+        An object representing the session being run. Contains information
+        such as provenance data.
+
+    """
+
+    ARGUMENT_TYPES: List[Union[DataType, EllipsisType]] = [
+        ("ion_coeffs", None),
+        ("recomb_coeffs", None),
+        ("temperature", "electrons"),
+        ("number_density", "electrons"),
+    ]
+
+    def __init__(
+        self,
+        extrapolation: Extrapolation = "nan",
+        sess: session.Session = session.global_session,
+    ):
+        self.extrapolation = extrapolation
+        super().__init__(sess, extrapolation=extrapolation)
+
+    def return_types(self, *args: DataType) -> Tuple[DataType, ...]:
+        """Indicates the datatypes of the results when calling the operator
+        with arguments of the given types. It is assumed that the
+        argument types are valid.
+
+        Parameters
+        ----------
+        args
+            The datatypes of the parameters which the operator is to be called with.
+
+        Returns
+        -------
+        :
+            The datatype of each result that will be returned if the operator is
+            called with these arguments.
+
+        """
+        return (("fractional_abundance", args[0][1]),)
+
+    def __call__(  # type: ignore[override]
+        self, scd: DataArray, acd: DataArray, Te: DataArray, ne: DataArray
+    ) -> DataArray:
+        """Calculate the fractional abundances.
+
+        Parameters
+        ----------
+        scd
+            Logarithm of the effective ionisation coefficients, as
+            returned by :py:meth:`indica.readers.ADASReader.get_adf11`.
+        acd
+            Logarithm of the effective recombination coefficients, as
+            returned by :py:meth:`indica.readers.ADASReader.get_adf11`.
+        Te
+            Electron temperature.
+        ne
+            Electron density. Will be broadcast against ``Te``.
+
+        Returns
+        -------
+        :
+            The fraction of ions in each charge state, with dimension
+            ``ion_charges`` followed by the dimensions of ``Te`` and ``ne``.
+
+        """
+        self.validate_arguments(scd, acd, Te, ne)
+        if not np.array_equal(scd.coords["ion_charges"], acd.coords["ion_charges"]):
+            raise ValueError(
+                "Ionisation and recombination data must be for the same charge states."
+            )
+        log10_scd = rate_interpolator(scd, self.extrapolation)(Te, ne)
+        log10_acd = rate_interpolator(acd, self.extrapolation)(Te, ne)
+        log10_ratio = log10_scd - log10_acd
+        log10_abundance = np.concatenate(
+            (
+                np.zeros((1,) + log10_ratio.shape[1:]),
+                np.cumsum(log10_ratio.values, axis=0),
+            )
+        )
+        abundance = 10 ** (log10_abundance - np.max(log10_abundance, axis=0))
+        abundance /= np.sum(abundance, axis=0)
+        charges = scd.coords["ion_charges"].values
+        element = scd.attrs["datatype"][1]
+        result = DataArray(
+            abundance,
+            dims=log10_ratio.dims,
+            coords={
+                "ion_charges": np.arange(charges[0], charges[-1] + 2),
+                **{
+                    k: v
+                    for k, v in log10_ratio.coords.items()
+                    if "ion_charges" not in v.dims
+                },
+            },
+            name=f"{element}_fractional_abundance",
+            attrs={"datatype": ("fractional_abundance", element)},
+        )
+        if "transform" in Te.attrs:
+            result.attrs["transform"] = Te.attrs["transform"]
+        self.assign_provenance(result)
+        return result
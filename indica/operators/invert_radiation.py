@@ -1,7 +1,12 @@
 """Inverts soft X-ray data to estimate the emissivity of the plasma."""
 
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from itertools import repeat
 from typing import cast
 from typing import List
+from typing import Literal
 from typing import Optional
 from typing import Tuple
 from typing import Union
@@ -11,6 +16,8 @@ import numpy as np
 from scipy.integrate import romb
 from scipy.interpolate import CubicSpline
 from scipy.optimize import least_squares
+from scipy.optimize import lsq_linear
+from xarray import broadcast
 from xarray import concat
 from xarray import DataArray
 from xarray import Dataset
@@ -18,6 +25,7 @@ from xarray import where
 
 from .abstractoperator import EllipsisType
 from .abstractoperator import Operator
+from .. import profiling
 from .. import session
 from ..converters import bin_to_time_labels
 from ..converters import CoordinateTransform
@@ -27,9 +35,11 @@ from ..converters import ImpactParameterCoordinates
 from ..converters import TrivialTransform
 from ..datatypes import DataType
 from ..datatypes import SpecificDataType
-from ..utilities import broadcast_spline
+from ..utilities import PiecewisePolynomial
 
 DataArrayCoords = Tuple[DataArray, DataArray]
+Method = Literal["least_squares", "tikhonov", "phillips"]
+FitResult = Tuple[np.ndarray, Optional[int], List[np.ndarray], int, int]
 
 
 class EmissivityProfile:
@@ -72,15 +82,20 @@ class EmissivityProfile:
             if k != self._dim
         }
         transpose_order = (self._dim,) + self.sym_dims
-        self.symmetric_emissivity = CubicSpline(
-            symmetric_emissivity.coords[self._dim],
-            symmetric_emissivity.transpose(*transpose_order),
-            0,
-            (
-                (1, np.zeros_like(symmetric_emissivity.isel({self._dim: 0}))),
-                (2, np.zeros_like(symmetric_emissivity.isel({self._dim: -1}))),
+        self.symmetric_emissivity = PiecewisePolynomial.from_spline(
+            CubicSpline(
+                symmetric_emissivity.coords[self._dim],
+                symmetric_emissivity.transpose(*transpose_order),
+                0,
+                (
+                    (1, np.zeros_like(symmetric_emissivity.isel({self._dim: 0}))),
+                    (2, np.zeros_like(symmetric_emissivity.isel({self._dim: -1}))),
+                ),
+                False,
             ),
-            False,
+            self._dim,
+            self.sym_dims,
+            self.sym_coords,
         )
         self.asym_dims = tuple(d for d in asymmetry_parameter.dims if d != self._dim)
         self.asym_coords = {
@@ -89,14 +104,19 @@ class EmissivityProfile:
             if k != self._dim
         }
         transpose_order = (self._dim,) + self.sym_dims
-        self.asymmetry_parameter = CubicSpline(
-            asymmetry_parameter.coords[self._dim],
-            asymmetry_parameter.transpose(*transpose_order),
-            0,
-            (
-                (2, np.zeros_like(asymmetry_parameter.isel({self._dim: 0}))),
-                (2, np.zeros_like(asymmetry_parameter.isel({self._dim: -1}))),
+        self.asymmetry_parameter = PiecewisePolynomial.from_spline(
+            CubicSpline(
+                asymmetry_parameter.coords[self._dim],
+                asymmetry_parameter.transpose(*transpose_order),
+                0,
+                (
+                    (2, np.zeros_like(asymmetry_parameter.isel({self._dim: 0}))),
+                    (2, np.zeros_like(asymmetry_parameter.isel({self._dim: -1}))),
+                ),
             ),
+            self._dim,
+            self.asym_dims,
+            self.asym_coords,
         )
         self.transform = FluxMajorRadCoordinates(coord_transform)
         time_sym = symmetric_emissivity.coords.get("t", None)
@@ -146,12 +166,8 @@ class EmissivityProfile:
         R_0: Optional[DataArray] = None,
     ) -> DataArray:
         """Evaluate the function at a location defined using (R, z) coordinates"""
-        symmetric = broadcast_spline(
-            self.symmetric_emissivity, self.sym_dims, self.sym_coords, rho
-        )
-        asymmetric = broadcast_spline(
-            self.asymmetry_parameter, self.asym_dims, self.asym_coords, rho
-        )
+        symmetric = self.symmetric_emissivity(rho)
+        asymmetric = self.asymmetry_parameter(rho)
         if t is None:
             if "t" in rho.coords:
                 t = rho.coords["t"]
@@ -164,6 +180,377 @@ class EmissivityProfile:
         return where(result < 0.0, 0.0, result).fillna(0.0)
 
 
+class _ChordGeometry:
+    """The locations along the lines of sight of a camera at which emissivity
+    is sampled, along with the data measured by that camera, at a single
+    time. Everything is held as plain arrays so that the residuals of the
+    fit can be evaluated without any coordinate conversions.
+
+    Parameters
+    ----------
+    rho
+        Flux surface on which each sample lies, with the line of sight as the
+        first dimension and position along it as the second.
+    R
+        Major radius of each sample.
+    R_0
+        Major radius of the high flux side of the flux surface of each sample.
+    weights
+        Weight given to each position along a line of sight when integrating.
+    camera
+        Radiation measured along each line of sight.
+    sigma
+        Uncertainty assigned to the measurement on each line of sight.
+    has_data
+        Whether each line of sight contains valid data.
+
+    """
+
+    def __init__(
+        self,
+        rho: np.ndarray,
+        R: np.ndarray,
+        R_0: np.ndarray,
+        weights: np.ndarray,
+        camera: np.ndarray,
+        sigma: np.ndarray,
+        has_data: np.ndarray,
+    ):
+        self.rho = rho
+        self.R = R
+        self.R_0 = R_0
+        self.weights = weights
+        self.camera = camera
+        self.sigma = sigma
+        self.has_data = has_data
+
+
+def _chord_geometries(
+    camera: Dataset, rho_maj_rad: FluxMajorRadCoordinates
+) -> List[_ChordGeometry]:
+    """Precompute the geometry of the lines of sight of a camera at each of
+    its times."""
+    trans = camera.attrs["transform"]
+    dims = ("t", trans.x1_name, trans.x2_name)
+    rho, R = camera.indica.convert_coords(rho_maj_rad)
+    rho, R, R_0, _ = broadcast(rho, R, camera.coords["R_0"], camera.camera)
+    rho, R, R_0 = (np.asarray(x.transpose(*dims)) for x in (rho, R, R_0))
+    weights = romb(np.eye(camera.sizes[trans.x2_name]), float(camera.attrs["dl"]), 0)
+    data = np.asarray(camera.camera.transpose("t", trans.x1_name))
+    sigma = np.asarray(camera.weights.transpose("t", trans.x1_name))
+    has_data = np.asarray(camera.has_data)
+    return [
+        _ChordGeometry(rho[i], R[i], R_0[i], weights, data[i], sigma[i], has_data)
+        for i in range(camera.sizes["t"])
+    ]
+
+
+class _EmissivityFit:
+    """The problem of fitting an :py:class:`EmissivityProfile` to radiation
+    data at a single time, as solved by :py:class:`InvertRadiation`. This is
+    kept separate from the operator so that it can be sent to worker
+    processes.
+
+    The symmetric emissivity and asymmetry parameter on the knots are both
+    linear in the values being fit, as are the splines through them. They are
+    therefore evaluated at every sample along the lines of sight using basis
+    matrices computed once per time.
+
+    Parameters
+    ----------
+    knots
+        Locations of the spline knots in :math:`\\rho`.
+    dim_name
+        Name of the flux-surface dimension.
+    last_knot_zero
+        Whether the symmetric emissivity is fixed at zero on the last knot.
+    bounds
+        Lower and upper bounds on the knot values being fit.
+    verbose
+        Level of output to be printed by the solver.
+
+    """
+
+    def __init__(
+        self,
+        knots: np.ndarray,
+        dim_name: str,
+        last_knot_zero: bool,
+        bounds: Tuple[np.ndarray, np.ndarray],
+        verbose: int = 0,
+    ):
+        self.knots = knots
+        self.dim_name = dim_name
+        self.n = n = len(knots)
+        self.m = m = n - 1 if last_knot_zero else n
+        self.bounds = bounds
+        self.verbose = verbose
+        self.sym_map = np.zeros((n, m + n - 2))
+        self.sym_map[:m, :m] = np.eye(m)
+        self.asym_map = np.zeros((n, m + n - 2))
+        self.asym_map[0, m] = 0.5
+        self.asym_map[1:-1, m:] = np.eye(n - 2)
+        self.asym_map[-1, -1] = 0.5
+        zeros = np.zeros(n)
+        self.sym_spline = CubicSpline(
+            knots, np.eye(n), 0, ((1, zeros), (2, zeros)), False
+        )
+        self.asym_spline = CubicSpline(knots, np.eye(n), 0, ((2, zeros), (2, zeros)))
+
+    def knotvals_to_xarray(self, knotvals: np.ndarray) -> Tuple[DataArray, DataArray]:
+        """Convert the vector of values being fit into the symmetric
+        emissivity and asymmetry parameter on each knot."""
+        symmetric_emissivity = DataArray(
+            self.sym_map @ knotvals, coords=[(self.dim_name, self.knots)]
+        )
+        asymmetry_parameter = DataArray(
+            self.asym_map @ knotvals, coords=[(self.dim_name, self.knots)]
+        )
+        return symmetric_emissivity, asymmetry_parameter
+
+    def sample_bases(
+        self, geometry: _ChordGeometry
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Matrices giving the symmetric emissivity and asymmetry parameter at
+        each sample along the lines of sight as linear functions of the
+        values being fit, along with :math:`R^2 - R_0^2` at each sample.
+        Emissivity is zero for samples outside of the outermost knot."""
+        rho = geometry.rho.ravel()
+        inside = np.isfinite(rho) & (rho >= self.knots[0]) & (rho <= self.knots[-1])
+        sym_basis = np.zeros((len(rho), self.n))
+        sym_basis[inside] = self.sym_spline(rho[inside])
+        asym_basis = np.zeros((len(rho), self.n))
+        asym_basis[inside] = self.asym_spline(rho[inside])
+        return (
+            sym_basis @ self.sym_map,
+            asym_basis @ self.asym_map,
+            (geometry.R ** 2 - geometry.R_0 ** 2).ravel(),
+        )
+
+    def back_integrals(
+        self,
+        knotvals: np.ndarray,
+        bases: List[Tuple[np.ndarray, np.ndarray, np.ndarray]],
+        geometries: List[_ChordGeometry],
+    ) -> List[np.ndarray]:
+        """Integrate the emissivity described by the knot values along the
+        lines of sight of each camera."""
+        integrals = []
+        for (sym_basis, asym_basis, dR2), g in zip(bases, geometries):
+            emissivity = (sym_basis @ knotvals) * np.exp((asym_basis @ knotvals) * dR2)
+            # Ensure round-off error doesn't result in any values below 0
+            emissivity = np.where(emissivity > 0.0, emissivity, 0.0)
+            integrals.append(emissivity.reshape(g.rho.shape) @ g.weights)
+        return integrals
+
+    def residuals(
+        self,
+        knotvals: np.ndarray,
+        bases: List[Tuple[np.ndarray, np.ndarray, np.ndarray]],
+        geometries: List[_ChordGeometry],
+    ) -> np.ndarray:
+        """Weighted differences between the camera data and the integrals of
+        the emissivity described by the knot values."""
+        resid = np.concatenate(
+            [
+                ((g.camera - integral) / g.sigma)[g.has_data]
+                for g, integral in zip(
+                    geometries, self.back_integrals(knotvals, bases, geometries)
+                )
+            ]
+        )
+        assert np.all(np.isfinite(resid))
+        return resid
+
+    def jacobian(
+        self,
+        knotvals: np.ndarray,
+        bases: List[Tuple[np.ndarray, np.ndarray, np.ndarray]],
+        geometries: List[_ChordGeometry],
+    ) -> np.ndarray:
+        """Derivatives of :py:meth:`residuals` with respect to each of the
+        knot values.
+
+        The emissivity :math:`S\\exp(A(R^2 - R_0^2))` is linear in the
+        symmetric knots, so its derivative with respect to them is just the
+        exponential factor times the spline basis, while its derivative with
+        respect to the asymmetry knots is the emissivity times
+        :math:`R^2 - R_0^2` times the spline basis.
+
+        """
+        jac = []
+        for (sym_basis, asym_basis, dR2), g in zip(bases, geometries):
+            growth = np.exp((asym_basis @ knotvals) * dR2)
+            emissivity = (sym_basis @ knotvals) * growth
+            derivative = (
+                growth[:, np.newaxis] * sym_basis
+                + (emissivity * dR2)[:, np.newaxis] * asym_basis
+            )
+            derivative[emissivity <= 0.0] = 0.0
+            integral_derivative = np.einsum(
+                "ijk,j->ik", derivative.reshape(g.rho.shape + (-1,)), g.weights
+            )
+            jac.append(-(integral_derivative / g.sigma[:, np.newaxis])[g.has_data])
+        return np.concatenate(jac)
+
+    def solve(
+        self,
+        times: np.ndarray,
+        geometries: List[List[_ChordGeometry]],
+        guess: np.ndarray,
+    ) -> List[FitResult]:
+        """Fit the emissivity at each of a contiguous block of times in turn,
+        using the result at each time as the initial guess for the next.
+
+        Parameters
+        ----------
+        times
+            The times to fit.
+        geometries
+            The geometry and data of each camera, at each time.
+        guess
+            Initial guess for the knot values at the first time. If
+            two-dimensional, this instead gives a separate initial guess for
+            each time.
+
+        Returns
+        -------
+        :
+            For each time, the fit knot values, the status reported by
+            :py:func:`scipy.optimize.least_squares`, the back-integrals
+            along each camera's lines of sight, and the number of residual
+            and Jacobian evaluations.
+
+        """
+        results: List[FitResult] = []
+        guesses = guess if guess.ndim == 2 else repeat(None)
+        for cameras, initial in zip(geometries, guesses):
+            if initial is not None:
+                guess = initial
+            bases = [self.sample_bases(g) for g in cameras]
+            fit = least_squares(
+                self.residuals,
+                guess,
+                self.jacobian,
+                bounds=self.bounds,
+                args=(bases, cameras),
+                verbose=self.verbose,
+            )
+            if fit.status == -1:
+                raise RuntimeError(
+                    "Improper input to `least_squares` function when trying to "
+                    "fit emissivity to radiation data."
+                )
+            integrals = self.back_integrals(fit.x, bases, cameras)
+            results.append((fit.x, fit.status, integrals, fit.nfev, fit.njev))
+            guess = fit.x
+        return results
+
+    def solve_linear(
+        self,
+        geometries: List[List[_ChordGeometry]],
+        regularisation: float,
+        smoothing: Literal["tikhonov", "phillips"],
+    ) -> List[FitResult]:
+        """Fit a symmetric emissivity at every time at once.
+
+        Without asymmetry the back-integrals are linear in the symmetric
+        knot values, :math:`b = Ax`, where the response matrix :math:`A`
+        holds the integral of each spline basis function along each line of
+        sight. The regularised normal equations
+
+        .. math::
+
+            (A^TA + \\lambda L^TL)x = A^Tb
+
+        are then solved for all times with a single batched call. For
+        Tikhonov regularisation :math:`L` is the identity, while for Phillips
+        regularisation it is the second difference of the knot values. The
+        strength :math:`\\lambda` is ``regularisation`` scaled by the ratio of
+        the traces of :math:`A^TA` and :math:`L^TL`, so it does not depend on
+        the magnitude of the data. At any time where this solution lies
+        outside the bounds on the knot values, the same objective is instead
+        minimised subject to the bounds, using
+        :py:func:`scipy.optimize.lsq_linear`.
+
+        Parameters
+        ----------
+        geometries
+            The geometry and data of each camera, at each time.
+        regularisation
+            The relative strength of the regularisation.
+        smoothing
+            The regularisation to apply, "tikhonov" or "phillips".
+
+        Returns
+        -------
+        :
+            For each time, the knot values (with an asymmetry of zero), no
+            status, the back-integrals along each camera's lines of sight,
+            and no residual or Jacobian evaluations.
+
+        """
+        bases = []
+        response = []
+        data = []
+        for cameras in zip(*geometries):
+            rho = np.stack([g.rho for g in cameras]).ravel()
+            inside = np.isfinite(rho) & (rho >= self.knots[0]) & (rho <= self.knots[-1])
+            basis = np.zeros((len(rho), self.n))
+            basis[inside] = self.sym_spline(rho[inside])
+            basis = (basis @ self.sym_map[:, : self.m]).reshape(
+                (len(cameras),) + cameras[0].rho.shape + (self.m,)
+            )
+            weights = cameras[0].weights
+            has_data = cameras[0].has_data
+            sigma = np.stack([g.sigma for g in cameras])
+            bases.append(basis)
+            response.append(
+                (np.einsum("tijk,j->tik", basis, weights) / sigma[..., np.newaxis])[
+                    :, has_data
+                ]
+            )
+            data.append((np.stack([g.camera for g in cameras]) / sigma)[:, has_data])
+        A = np.concatenate(response, axis=1)
+        b = np.concatenate(data, axis=1)
+        if smoothing == "tikhonov":
+            L = np.eye(self.m)
+        else:
+            L = np.diff(np.eye(self.m), 2, axis=0)
+        LtL = L.T @ L
+        AtA = np.einsum("tij,tik->tjk", A, A)
+        strength = regularisation * np.trace(AtA, axis1=1, axis2=2) / np.trace(LtL)
+        symmetric = np.linalg.solve(
+            AtA + strength[:, np.newaxis, np.newaxis] * LtL,
+            np.einsum("tij,ti->tj", A, b)[..., np.newaxis],
+        )[..., 0]
+        lower = self.bounds[0][: self.m]
+        upper = self.bounds[1][: self.m]
+        outside = np.any((symmetric < lower) | (symmetric > upper), axis=1)
+        for i in np.nonzero(outside)[0]:
+            fit = lsq_linear(
+                np.concatenate((A[i], np.sqrt(strength[i]) * L)),
+                np.concatenate((b[i], np.zeros(len(L)))),
+                (lower, upper),
+                "bvls",
+            )
+            # The solver can leave values outside the bounds by rounding errors
+            symmetric[i] = np.clip(fit.x, lower, upper)
+        integrals = []
+        for basis, cameras in zip(bases, zip(*geometries)):
+            emissivity = np.einsum("tijk,tk->tij", basis, symmetric)
+            # Ensure round-off error doesn't result in any values below 0
+            emissivity = np.where(emissivity > 0.0, emissivity, 0.0)
+            integrals.append(emissivity @ cameras[0].weights)
+        knotvals = np.concatenate(
+            (symmetric, np.zeros((len(symmetric), self.n - 2))), axis=1
+        )
+        return [
+            (x, None, [integral[i] for integral in integrals], 0, 0)
+            for i, x in enumerate(knotvals)
+        ]
+
+
 class InvertRadiation(Operator):
     """Estimates the emissivity distribution of the plasma using radiation
     data.
@@ -181,6 +568,31 @@ class InvertRadiation(Operator):
     n_intervals : int
         The number of intervals over which to integrate th eemissivity. Should
         be :math:`2^m + 1`, where m is an integer.
+    n_workers : int
+        The number of workers over which to divide the time slices when
+        fitting. Each worker fits a contiguous block of times, using the
+        result at each time as the initial guess for the next.
+    use_processes : bool
+        Whether the workers should be separate processes, rather than threads.
+    method : str
+        How to fit the emissivity. "least_squares" fits both the symmetric
+        emissivity and the asymmetry at each time with a bounded nonlinear
+        least-squares fit. "tikhonov" and "phillips" neglect the asymmetry,
+        making the problem linear, and solve it for all times at once with
+        Tikhonov (minimum norm) or Phillips (minimum curvature)
+        regularisation respectively. This is much faster and suited to
+        plasmas with little asymmetry.
+    regularisation : float
+        The relative strength of the regularisation used by the linear
+        methods.
+    refine : bool
+        Whether to follow a linear fit with a nonlinear least-squares fit
+        (including the asymmetry) at each time, starting from the linear
+        solution.
+    verbose : int
+        Level of output to be printed by
+        :py:func:`scipy.optimize.least_squares` when fitting each time. Zero
+        (the default) prints nothing.
     sess : session.Session
         An object representing the session being run. Contains information
         such as provenance data.
@@ -193,13 +605,26 @@ class InvertRadiation(Operator):
         datatype: SpecificDataType = "sxr",
         n_knots: int = 6,
         n_intervals: int = 65,
+        n_workers: int = 1,
+        use_processes: bool = False,
+        method: Method = "least_squares",
+        regularisation: float = 1e-3,
+        refine: bool = False,
+        verbose: int = 0,
         sess: session.Session = session.global_session,
     ):
+        if method not in ("least_squares", "tikhonov", "phillips"):
+            raise ValueError(f"Unrecognised fitting method '{method}'.")
         self.n_knots = n_knots
         self.n_intervals = n_intervals
         self.datatype = datatype
         self.num_cameras = num_cameras
-        self.integral: List[DataArray]
+        self.n_workers = n_workers
+        self.use_processes = use_processes
+        self.method = method
+        self.regularisation = regularisation
+        self.refine = refine
+        self.verbose = verbose
         self.last_knot_zero = datatype == "sxr"
         # TODO: Update RETURN_TYPES
         # TODO: Revise to include R, z, t
@@ -216,6 +641,9 @@ class InvertRadiation(Operator):
             datatype=datatype,
             n_knots=n_knots,
             n_intervals=n_intervals,
+            method=method,
+            regularisation=regularisation,
+            refine=refine,
         )
 
     def return_types(self, *args: DataType) -> Tuple[DataType, ...]:
@@ -267,6 +695,15 @@ class InvertRadiation(Operator):
         )
         return result
 
+    def _restore_from_cache(self, *results: Union[DataArray, Dataset]):
+        """Recreate the emissivity model for results loaded from a cache."""
+        emissivity, fit = cast(Tuple[DataArray, Dataset], results[:2])
+        emissivity.attrs["emissivity_model"] = EmissivityProfile(
+            fit["symmetric_emissivity"],
+            fit["asymmetry_parameter"],
+            fit["symmetric_emissivity"].attrs["transform"],
+        )
+
     def __call__(  # type: ignore[override]
         self,
         R: DataArray,
@@ -321,46 +758,6 @@ class InvertRadiation(Operator):
         n = self.n_knots
         binned_cameras = [bin_to_time_labels(times.data, c) for c in cameras]
 
-        def knotvals_to_xarray(knotvals):
-            symmetric_emissivity = DataArray(np.empty(n), coords=[(dim_name, knots)])
-            symmetric_emissivity[0:m] = knotvals[0:m]
-            if self.last_knot_zero:
-                symmetric_emissivity[-1] = 0.0
-            asymmetry_parameter = DataArray(np.empty(n), coords=[(dim_name, knots)])
-            asymmetry_parameter[0] = 0.5 * knotvals[m]
-            asymmetry_parameter[1:-1] = knotvals[m:]
-            asymmetry_parameter[-1] = 0.5 * knotvals[-1]
-            return symmetric_emissivity, asymmetry_parameter
-
-        def residuals(
-            knotvals: np.ndarray,
-            unfolded_cameras: List[Dataset],
-        ) -> np.ndarray:
-            symmetric_emissivity, asymmetry_parameter = knotvals_to_xarray(knotvals)
-            estimate = EmissivityProfile(
-                symmetric_emissivity, asymmetry_parameter, flux_coords
-            )
-            start = 0
-            resid = np.empty(sum(c.attrs["nlos"] for c in unfolded_cameras))
-            self.integral = []
-            for c in unfolded_cameras:
-                end = start + c.attrs["nlos"]
-                rho, R = c.indica.convert_coords(rho_maj_rad)
-                rho_min, x2 = c.indica.convert_coords(c.attrs["impact_parameters"])
-                emissivity_vals = estimate.evaluate(rho, R, R_0=c.coords["R_0"])
-                axis = emissivity_vals.dims.index(c.attrs["transform"].x2_name)
-                integral = romb(emissivity_vals, c.attrs["dl"], axis)
-                resid[start:end] = ((c.camera - integral) / c.weights)[
-                    c["has_data"]
-                ].data
-                start = end
-                x1_name = c.attrs["transform"].x1_name
-                self.integral.append(
-                    DataArray(integral, coords=[(x1_name, c.coords[x1_name])])
-                )
-            assert np.all(np.isfinite(resid))
-            return resid
-
         x2 = np.linspace(0.0, 1.0, self.n_intervals)
         # TODO: Use aggregate
         unfolded_cameras = [
@@ -374,7 +771,6 @@ class InvertRadiation(Operator):
 
         rho_maj_rad = FluxMajorRadCoordinates(flux_coords)
         rho_max = 0.0
-        print("Calculating coordinate conversions")
         for c in unfolded_cameras:
             c["has_data"] = np.logical_not(np.isnan(c.camera.isel(t=0)))
             trans = c.attrs["transform"]
@@ -416,32 +812,71 @@ class InvertRadiation(Operator):
             np.concatenate((1e12 * np.ones(m), np.ones(n - 2))),
         )
 
-        for t in np.asarray(times):
-            print(f"\nSolving for t={t}")
-            print("------------------\n")
-            fit = least_squares(
-                residuals,
-                guess,
-                bounds=bounds,
-                args=([c.sel(t=t) for c in unfolded_cameras],),
-                verbose=2,
+        fit_problem = _EmissivityFit(
+            knots,
+            dim_name,
+            self.last_knot_zero,
+            bounds,
+            self.verbose,
+        )
+        geometries = list(
+            zip(*(_chord_geometries(c, rho_maj_rad) for c in unfolded_cameras))
+        )
+        if self.method != "least_squares":
+            linear = fit_problem.solve_linear(
+                geometries,
+                self.regularisation,
+                cast(Literal["tikhonov", "phillips"], self.method),
             )
-            if fit.status == -1:
-                raise RuntimeError(
-                    "Improper input to `least_squares` function when trying to "
-                    "fit emissivity to radiation data."
+            profiling.record(linear_fits=len(linear))
+        if self.method == "least_squares" or self.refine:
+            time_blocks = np.array_split(
+                np.arange(len(times)), max(1, min(self.n_workers, len(times)))
+            )
+            block_args = (
+                [np.asarray(times)[block] for block in time_blocks],
+                [geometries[block[0] : block[-1] + 1] for block in time_blocks],
+                repeat(guess)
+                if self.method == "least_squares"
+                else [np.stack([linear[i][0] for i in block]) for block in time_blocks],
+            )
+            if len(time_blocks) > 1:
+                executor_type = (
+                    ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+                )
+                with executor_type(len(time_blocks)) as executor:
+                    solutions = list(executor.map(fit_problem.solve, *block_args))
+            else:
+                solutions = list(map(fit_problem.solve, *block_args))
+        else:
+            solutions = [linear]
+
+        x1_names = [c.attrs["transform"].x1_name for c in unfolded_cameras]
+        for t, (knotvals, status, back_integrals, nfev, njev) in zip(
+            np.asarray(times), chain.from_iterable(solutions)
+        ):
+            if status is not None:
+                profiling.record(
+                    least_squares_fits=1,
+                    nfev=nfev,
+                    njev=njev,
+                    **{f"status_{status}": 1},
                 )
-            elif fit.status == 0:
+            if status == 0:
                 warnings.warn(
                     f"Attempt to fit emissivity to radiation data at time t={t} "
                     "reached maximum number of function evaluations.",
                     RuntimeWarning,
                 )
-            sym, asym = knotvals_to_xarray(fit.x)
+            sym, asym = fit_problem.knotvals_to_xarray(knotvals)
             symmetric_emissivities.append(sym)
             asymmetry_parameters.append(asym)
-            integrals.append(self.integral)
-            guess = fit.x
+            integrals.append(
+                [
+                    DataArray(i, coords=[(x1_name, c.coords[x1_name].values)])
+                    for i, c, x1_name in zip(back_integrals, unfolded_cameras, x1_names)
+                ]
+            )
 
         symmetric_emissivity = concat(symmetric_emissivities, dim=times)
         symmetric_emissivity.attrs["transform"] = flux_coords
@@ -449,13 +884,13 @@ class InvertRadiation(Operator):
         asymmetry_parameter = concat(asymmetry_parameters, dim=times)
         asymmetry_parameter.attrs["transform"] = flux_coords
         asymmetry_parameter.attrs["datatype"] = ("asymmetry", self.datatype)
-        integral: List[DataArray] = []
-        for data in zip(*integrals):
-            integral.append(concat(data, dim=times))
-            del integral[-1].coords[None]  # type: ignore
-        # For some reason concat adds a `None` coordinate
-        del symmetric_emissivity.coords[None]
-        del asymmetry_parameter.coords[None]
+        integral: List[DataArray] = [
+            concat(data, dim=times) for data in zip(*integrals)
+        ]
+        # Some versions of xarray add a `None` coordinate when concatenating
+        for array in (symmetric_emissivity, asymmetry_parameter, *integral):
+            if None in array.coords:
+                del array.coords[None]  # type: ignore
         estimate = EmissivityProfile(
             symmetric_emissivity, asymmetry_parameter, flux_coords
         )
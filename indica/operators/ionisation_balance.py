@@ -0,0 +1,227 @@
+"""Evolves the charge state distribution of an impurity in time, using
+atomic data from ADAS."""
+
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+from xarray import DataArray
+
+from .abstractoperator import EllipsisType
+from .abstractoperator import Operator
+from .atomic_rates import Extrapolation
+from .atomic_rates import rate_interpolator
+from .. import profiling
+from .. import session
+from ..datatypes import DataType
+
+
+def _solve_tridiagonal(
+    lower: np.ndarray, diagonal: np.ndarray, upper: np.ndarray, rhs: np.ndarray
+) -> np.ndarray:
+    """Solve many tridiagonal systems at once using the Thomas
+    algorithm. The first axis of each argument indexes the rows of the
+    systems and the remaining axes index the systems. ``lower[0]`` and
+    ``upper[-1]`` are ignored."""
+    n = diagonal.shape[0]
+    c = np.empty_like(diagonal)
+    d = np.empty_like(rhs)
+    c[0] = upper[0] / diagonal[0]
+    d[0] = rhs[0] / diagonal[0]
+    for i in range(1, n):
+        denominator = diagonal[i] - lower[i] * c[i - 1]
+        c[i] = upper[i] / denominator
+        d[i] = (rhs[i] - lower[i] * d[i - 1]) / denominator
+    x = np.empty_like(rhs)
+    x[-1] = d[-1]
+    for i in range(n - 2, -1, -1):
+        x[i] = d[i] - c[i] * x[i + 1]
+    return x
+
+
+class IonisationBalance(Operator):
+    """Calculate the fractional abundance of each charge state of an
+    element as it evolves in time, without assuming ionisation
+    equilibrium.
+
+    The abundances obey the coupled rate equations
+
+    .. math::
+
+        \\frac{df_k}{dt} = n_e\\left(S_{k-1}f_{k-1} - (S_k + \\alpha_{k-1})f_k
+            + \\alpha_k f_{k+1}\\right),
+
+    where :math:`S_k` is the effective ionisation coefficient from charge
+    :math:`k` to :math:`k+1` and :math:`\\alpha_k` the effective
+    recombination coefficient from :math:`k+1` to :math:`k`. These are
+    stiff, so they are integrated with backward Euler steps, taking the
+    rates to be constant over each step. The tridiagonal system for each
+    step is solved for every point of the plasma at once.
+
+    Parameters
+    ----------
+    max_step
+        The longest step (in seconds) to take. Intervals between the times
+        of the electron temperature and density which are longer than this
+        are split into equal sub-steps. If None, one step is taken per
+        interval.
+    extrapolation : str
+        How to treat temperatures and densities outside the range of the
+        atomic data. See :py:class:`indica.operators.RateInterpolator`.
+    sess : session.Session
+        An object representing the session being run. Contains information
+        such as provenance data.
+
+    """
+
+    ARGUMENT_TYPES: List[Union[DataType, EllipsisType]] = [
+        ("ion_coeffs", None),
+        ("recomb_coeffs", None),
+        ("temperature", "electrons"),
+        ("number_density", "electrons"),
+        ("fractional_abundance", None),
+    ]
+
+    def __init__(
+        self,
+        max_step: Optional[float] = None,
+        extrapolation: Extrapolation = "nan",
+        sess: session.Session = session.global_session,
+    ):
+        self.max_step = max_step
+        self.extrapolation = extrapolation
+        super().__init__(sess, max_step=max_step, extrapolation=extrapolation)
+
+    def return_types(self, *args: DataType) -> Tuple[DataType, ...]:
+        """Indicates the datatypes of the results when calling the operator
+        with arguments of the given types. It is assumed that the
+        argument types are valid.
+
+        Parameters
+        ----------
+        args
+            The datatypes of the parameters which the operator is to be called with.
+
+        Returns
+        -------
+        :
+            The datatype of each result that will be returned if the operator is
+            called with these arguments.
+
+        """
+        return (("fractional_abundance", args[0][1]),)
+
+    def __call__(  # type: ignore[override]
+        self,
+        scd: DataArray,
+        acd: DataArray,
+        Te: DataArray,
+        ne: DataArray,
+        initial: DataArray,
+    ) -> DataArray:
+        """Evolve the fractional abundances over the times at which the
+        electron temperature and density are given.
+
+        Parameters
+        ----------
+        scd
+            Logarithm of the effective ionisation coefficients, as
+            returned by :py:meth:`indica.readers.ADASReader.get_adf11`.
+        acd
+            Logarithm of the effective recombination coefficients, as
+            returned by :py:meth:`indica.readers.ADASReader.get_adf11`.
+        Te
+            Electron temperature. Must have a time dimension, ``t``.
+        ne
+            Electron density. Will be broadcast against ``Te``.
+        initial
+            Fractional abundances at the first time, e.g., from
+            :py:class:`indica.operators.FractionalAbundance`. If it has a
+            time dimension then the first time is used. Must be given on
+            the same points as ``Te`` and ``ne``.
+
+        Returns
+        -------
+        :
+            The fraction of ions in each charge state, with dimensions
+            ``ion_charges`` and ``t`` followed by the other dimensions of
+            ``Te`` and ``ne``.
+
+        """
+        self.validate_arguments(scd, acd, Te, ne, initial)
+        if not np.array_equal(scd.coords["ion_charges"], acd.coords["ion_charges"]):
+            raise ValueError(
+                "Ionisation and recombination data must be for the same charge states."
+            )
+        if "t" not in Te.dims and "t" not in ne.dims:
+            raise ValueError("Electron temperature or density must depend on time.")
+        ionisation = 10 ** rate_interpolator(scd, self.extrapolation)(Te, ne)
+        recombination = 10 ** rate_interpolator(acd, self.extrapolation)(Te, ne)
+        dims = ("ion_charges", "t") + tuple(
+            d for d in ionisation.dims if d not in ("ion_charges", "t")
+        )
+        ionisation = ionisation.transpose(*dims)
+        recombination = recombination.transpose(*dims)
+        density = ne.broadcast_like(ionisation.isel(ion_charges=0)).transpose(*dims[1:])
+        if "t" in initial.dims:
+            initial = initial.isel(t=0)
+        initial = initial.broadcast_like(ionisation.isel(ion_charges=0, t=0))
+        if initial.sizes["ion_charges"] != ionisation.sizes["ion_charges"] + 1:
+            raise ValueError(
+                "Atomic data and initial abundances are for different charge states."
+            )
+        times = ionisation.coords["t"].values
+        shape = ionisation.shape[2:]
+        n_points = int(np.prod(shape))
+        nz = ionisation.shape[0]
+        S = ionisation.values.reshape(nz, len(times), n_points)
+        alpha = recombination.values.reshape(nz, len(times), n_points)
+        n_e = density.values.reshape(len(times), n_points)
+        abundance = np.empty((nz + 1, len(times), n_points))
+        abundance[:, 0] = initial.transpose("ion_charges", *dims[2:]).values.reshape(
+            nz + 1, n_points
+        )
+        n_steps = 0
+        for i in range(1, len(times)):
+            interval = times[i] - times[i - 1]
+            n_sub = (
+                1
+                if self.max_step is None
+                else max(1, int(np.ceil(interval / self.max_step)))
+            )
+            h = n_e[i] * interval / n_sub
+            lower = np.zeros((nz + 1, n_points))
+            upper = np.zeros((nz + 1, n_points))
+            diagonal = np.ones((nz + 1, n_points))
+            lower[1:] = -h * S[:, i]
+            upper[:-1] = -h * alpha[:, i]
+            diagonal[:-1] += h * S[:, i]
+            diagonal[1:] += h * alpha[:, i]
+            f = abundance[:, i - 1]
+            for _ in range(n_sub):
+                f = _solve_tridiagonal(lower, diagonal, upper, f)
+            abundance[:, i] = f
+            n_steps += n_sub
+        profiling.record(time_steps=n_steps)
+        element = scd.attrs["datatype"][1]
+        charges = scd.coords["ion_charges"].values
+        result = DataArray(
+            abundance.reshape((nz + 1, len(times)) + shape),
+            dims=dims,
+            coords={
+                "ion_charges": np.arange(charges[0], charges[-1] + 2),
+                **{
+                    k: v
+                    for k, v in ionisation.coords.items()
+                    if "ion_charges" not in v.dims
+                },
+            },
+            name=f"{element}_fractional_abundance",
+            attrs={"datatype": ("fractional_abundance", element)},
+        )
+        if "transform" in Te.attrs:
+            result.attrs["transform"] = Te.attrs["transform"]
+        self.assign_provenance(result)
+        return result
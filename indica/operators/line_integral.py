@@ -0,0 +1,247 @@
+"""Integrates emissivity along the lines of sight of radiation cameras,
+giving synthetic measurements."""
+
+from collections import OrderedDict
+from typing import cast
+from typing import Dict
+from typing import Hashable
+from typing import List
+from typing import Literal
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+from scipy.integrate import romb
+from scipy.integrate import simpson
+from xarray import DataArray
+
+from .abstractoperator import EllipsisType
+from .abstractoperator import Operator
+from .. import session
+from ..converters import CoordinateTransform
+from ..datatypes import DataType
+
+Quadrature = Literal["romberg", "simpson", "trapezoid"]
+# The transforms of a camera and of the emissivity, with the locations of the
+# samples along each line of sight
+_Geometry = Tuple[CoordinateTransform, CoordinateTransform, DataArray, DataArray]
+
+#: The maximum number of sets of sample locations to keep for reuse.
+MAX_CACHED_GEOMETRIES = 16
+
+
+class LineIntegral(Operator):
+    """Calculate the radiation which cameras would measure from an emissivity
+    profile, by integrating it along each of their lines of sight.
+
+    The emissivity is sampled at evenly spaced positions along every line of
+    sight of a camera, at all times at once. The locations of these samples
+    in the coordinate system of the emissivity are kept and reused by later
+    calls with the same camera geometry, times and equilibrium, so the
+    (often expensive) coordinate conversions are only performed once.
+
+    Parameters
+    ----------
+    n_samples
+        The number of positions along each line of sight at which to sample
+        the emissivity. Must be :math:`2^m + 1`, where m is an integer, for
+        Romberg integration.
+    quadrature
+        The rule used to integrate the samples: "romberg", "simpson" or
+        "trapezoid".
+    sess : session.Session
+        An object representing the session being run. Contains information
+        such as provenance data.
+
+    """
+
+    ARGUMENT_TYPES: List[Union[DataType, EllipsisType]] = [
+        ("emissivity", None),
+        ("luminous_flux", None),
+        ...,
+    ]
+
+    def __init__(
+        self,
+        n_samples: int = 65,
+        quadrature: Quadrature = "romberg",
+        sess: session.Session = session.global_session,
+    ):
+        if quadrature == "romberg":
+            if n_samples < 2 or (n_samples - 1) & (n_samples - 2):
+                raise ValueError(
+                    "Romberg integration requires 2^m + 1 samples along each "
+                    "line of sight."
+                )
+            weights = romb(np.eye(n_samples), axis=0)
+        elif quadrature == "simpson":
+            weights = simpson(np.eye(n_samples), axis=0)
+        elif quadrature == "trapezoid":
+            weights = np.trapz(np.eye(n_samples), axis=0)
+        else:
+            raise ValueError(f"Unrecognised quadrature rule '{quadrature}'.")
+        self.n_samples = n_samples
+        self.quadrature = quadrature
+        self.weights = weights
+        self._geometries: "OrderedDict[Hashable, _Geometry]" = OrderedDict()
+        super().__init__(sess, n_samples=n_samples, quadrature=quadrature)
+
+    def return_types(self, *args: DataType) -> Tuple[DataType, ...]:
+        """Indicates the datatypes of the results when calling the operator
+        with arguments of the given types. It is assumed that the
+        argument types are valid.
+
+        Parameters
+        ----------
+        args
+            The datatypes of the parameters which the operator is to be called with.
+
+        Returns
+        -------
+        :
+            The datatype of each result that will be returned if the operator is
+            called with these arguments.
+
+        """
+        return (("luminous_flux", args[0][1]),) * (len(args) - 1)
+
+    def _sample_geometry(
+        self,
+        camera: CoordinateTransform,
+        channels: DataArray,
+        target: CoordinateTransform,
+        t: Optional[DataArray],
+    ) -> Tuple[DataArray, DataArray]:
+        """The locations, in the coordinate system ``target``, of the
+        samples along each line of sight. These are cached for reuse."""
+        key = (
+            camera._cache_key(),
+            target._cache_key(),
+            self.n_samples,
+            channels.values.tobytes(),
+            None if t is None else np.asarray(t).tobytes(),
+        )
+        if key in self._geometries:
+            self._geometries.move_to_end(key)
+            return self._geometries[key][2:]
+        x2 = DataArray(np.linspace(0.0, 1.0, self.n_samples), dims=camera.x2_name)
+        x1, x2 = cast(
+            Tuple[DataArray, DataArray],
+            camera.convert_to(target, channels, x2, t),
+        )
+        # Keep the transforms (and so their equilibria) alive while cached,
+        # so that the ids in the key can not be reused by other objects
+        self._geometries[key] = (camera, target, x1, x2)
+        if len(self._geometries) > MAX_CACHED_GEOMETRIES:
+            self._geometries.popitem(last=False)
+        return x1, x2
+
+    def _spacing(
+        self,
+        camera: CoordinateTransform,
+        channels: DataArray,
+        t: Optional[DataArray],
+    ) -> DataArray:
+        """The distance between neighbouring samples on each line of
+        sight."""
+        length = camera.distance(
+            camera.x2_name, channels, DataArray([0.0, 1.0], dims=camera.x2_name), t
+        ).isel({camera.x2_name: -1})
+        return length / (self.n_samples - 1)
+
+    def _sample(
+        self,
+        emissivity: DataArray,
+        camera: CoordinateTransform,
+        channels: DataArray,
+        t: Optional[DataArray],
+    ) -> DataArray:
+        """Evaluate the emissivity at evenly spaced positions along each
+        line of sight."""
+        model = emissivity.attrs.get("emissivity_model")
+        if model is not None and hasattr(model, "evaluate"):
+            rho, R = self._sample_geometry(camera, channels, model.transform, t)
+            return model.evaluate(rho, R, t)
+        elif model is not None:
+            x2 = DataArray(np.linspace(0.0, 1.0, self.n_samples), dims=camera.x2_name)
+            return model(camera, channels, x2, t)
+        target = emissivity.attrs["transform"]
+        x1, x2 = self._sample_geometry(camera, channels, target, t)
+        indexers: Dict[Hashable, DataArray] = {
+            name: coord
+            for name, coord in ((target.x1_name, x1), (target.x2_name, x2))
+            if name in emissivity.dims
+        }
+        if t is not None and "t" in emissivity.dims:
+            indexers["t"] = t
+        return emissivity.interp(indexers)
+
+    def __call__(  # type: ignore[override]
+        self, emissivity: DataArray, *cameras: DataArray
+    ) -> Tuple[DataArray, ...]:
+        """Integrate the emissivity along the lines of sight of each camera.
+
+        Parameters
+        ----------
+        emissivity
+            The emissivity to integrate. If it has an ``emissivity_model``
+            attribute (e.g., the result of
+            :py:class:`indica.operators.InvertRadiation`) then that is
+            evaluated along the lines of sight. Otherwise the emissivity is
+            interpolated from the coordinate system given by its
+            ``transform`` attribute (e.g., the power density from
+            :py:class:`indica.operators.RadiatedPower`). It is taken to be
+            zero outside of the region where it is defined.
+        cameras
+            Data from each camera, whose ``transform`` attribute describes
+            its lines of sight. Only the geometry (and the times, if the
+            emissivity does not depend on time) are used.
+
+        Returns
+        -------
+        :
+            For each camera, the integral of the emissivity along each line
+            of sight, at each time of the emissivity.
+
+        """
+        self.validate_arguments(emissivity, *cameras)
+        model = emissivity.attrs.get("emissivity_model")
+        results = []
+        for camera in cameras:
+            transform = camera.attrs["transform"]
+            if "t" in emissivity.dims:
+                t: Optional[DataArray] = emissivity.coords["t"]
+            elif getattr(model, "time", None) is not None:
+                t = model.time
+            elif "t" in camera.dims:
+                t = camera.coords["t"]
+            else:
+                t = None
+            channels = camera.coords[transform.x1_name]
+            samples = self._sample(emissivity, transform, channels, t).fillna(0.0)
+            dl = self._spacing(transform, channels, t)
+            other_dims = [d for d in samples.dims if d != transform.x2_name]
+            values = samples.transpose(*other_dims, transform.x2_name).values
+            result = (
+                DataArray(
+                    values @ self.weights,
+                    coords={
+                        k: v
+                        for k, v in samples.coords.items()
+                        if transform.x2_name not in v.dims
+                    },
+                    dims=other_dims,
+                )
+                * dl
+            )
+            result = result.transpose(transform.x1_name, ...)
+            result.name = f"{camera.name}_back_integral" if camera.name else None
+            result.attrs["datatype"] = (
+                "luminous_flux",
+                emissivity.attrs["datatype"][1],
+            )
+            result.attrs["transform"] = transform
+            self.assign_provenance(result)
+            results.append(result)
+        return tuple(results)
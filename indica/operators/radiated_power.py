@@ -0,0 +1,241 @@
+"""Calculates the power radiated by an impurity, using atomic data from
+ADAS."""
+
+from typing import List
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+from xarray import DataArray
+
+from .abstractoperator import EllipsisType
+from .abstractoperator import Operator
+from .atomic_rates import Extrapolation
+from .atomic_rates import rate_interpolator
+from .. import session
+from ..converters import FluxSurfaceCoordinates
+from ..datatypes import DataType
+
+
+class RadiatedPower(Operator):
+    """Calculate the power radiated by an element from its fractional
+    abundances.
+
+    The total radiation coefficient is
+
+    .. math::
+
+        L_z = \\sum_k f_k \\left(P^{LT}_k + P^{RB}_{k-1}
+              + \\frac{n_0}{n_e}P^{RC}_{k-1}\\right),
+
+    where :math:`f_k` is the fractional abundance of charge state
+    :math:`k`, :math:`P^{LT}_k` is the line power of that charge state
+    and :math:`P^{RB}_{k-1}` and :math:`P^{RC}_{k-1}` are the
+    recombination/bremsstrahlung and charge-exchange recombination power
+    of ions recombining into charge state :math:`k-1`. The sum is
+    performed over all charge states at once. The radiated power density
+    is then :math:`n_e n_z L_z`.
+
+    Parameters
+    ----------
+    charge_exchange : bool
+        Whether to include charge-exchange recombination, in which case the
+        operator takes PRC data and the density of neutral hydrogen as
+        additional arguments.
+    integrate : bool
+        Whether to also calculate the total power radiated, by integrating
+        the power density over the volume enclosed by each flux surface. If
+        so, the electron density must be given on flux surface coordinates
+        with an equilibrium, otherwise a ValueError is raised.
+    extrapolation : str
+        How to treat temperatures and densities outside the range of the
+        atomic data. See :py:class:`indica.operators.RateInterpolator`.
+    sess : session.Session
+        An object representing the session being run. Contains information
+        such as provenance data.
+
+    """
+
+    ARGUMENT_TYPES: List[Union[DataType, EllipsisType]] = [
+        ("line_emissions", None),
+        ("recomb_emissions", None),
+        ("fractional_abundance", None),
+        ("temperature", "electrons"),
+        ("number_density", "electrons"),
+        ("number_density", None),
+    ]
+
+    def __init__(
+        self,
+        charge_exchange: bool = False,
+        integrate: bool = False,
+        extrapolation: Extrapolation = "nan",
+        sess: session.Session = session.global_session,
+    ):
+        self.charge_exchange = charge_exchange
+        self.integrate = integrate
+        self.extrapolation = extrapolation
+        if charge_exchange:
+            self.ARGUMENT_TYPES = self.ARGUMENT_TYPES + [
+                ("cx_emissions", None),
+                ("number_density", None),
+            ]
+        super().__init__(
+            sess,
+            charge_exchange=charge_exchange,
+            integrate=integrate,
+            extrapolation=extrapolation,
+        )
+
+    def return_types(self, *args: DataType) -> Tuple[DataType, ...]:
+        """Indicates the datatypes of the results when calling the operator
+        with arguments of the given types. It is assumed that the
+        argument types are valid.
+
+        Parameters
+        ----------
+        args
+            The datatypes of the parameters which the operator is to be called with.
+
+        Returns
+        -------
+        :
+            The datatype of each result that will be returned if the operator is
+            called with these arguments.
+
+        """
+        element = args[2][1]
+        result: Tuple[DataType, ...] = (
+            ("total_radiation_coeffs", element),
+            ("emissivity", element),
+        )
+        if self.integrate:
+            result += (("radiated_power", element),)
+        return result
+
+    def __call__(  # type: ignore[override]
+        self,
+        plt: DataArray,
+        prb: DataArray,
+        fz: DataArray,
+        Te: DataArray,
+        ne: DataArray,
+        n_impurity: DataArray,
+        *charge_exchange: DataArray,
+    ) -> Tuple[DataArray, ...]:
+        """Calculate the radiated power.
+
+        Parameters
+        ----------
+        plt
+            Logarithm of the line power coefficients, as returned by
+            :py:meth:`indica.readers.ADASReader.get_adf11`.
+        prb
+            Logarithm of the recombination and bremsstrahlung power
+            coefficients.
+        fz
+            Fractional abundance of each charge state, as calculated by
+            :py:class:`indica.operators.FractionalAbundance` on the same
+            ``Te`` and ``ne``. The atomic data must be for all but the last
+            of its ``ion_charges``, with each recombination rate labelled by
+            the charge state recombined into.
+        Te
+            Electron temperature.
+        ne
+            Electron density.
+        n_impurity
+            Density of the element.
+        charge_exchange
+            If the operator was created with ``charge_exchange=True``, the
+            logarithm of the charge exchange recombination power
+            coefficients and the density of neutral hydrogen.
+
+        Returns
+        -------
+        coefficient
+            The total radiation coefficient, :math:`L_z`.
+        power_density
+            The power radiated per unit volume.
+        total_power
+            The power radiated from within each flux surface. Only
+            returned if the operator was created with ``integrate=True``.
+
+        """
+        self.validate_arguments(plt, prb, fz, Te, ne, n_impurity, *charge_exchange)
+        element = fz.attrs["datatype"][1]
+        dims = fz.dims
+        fz_values = fz.values
+        charges = fz.coords["ion_charges"].values[:-1]
+        for table in (plt, prb, *charge_exchange[:1]):
+            if not np.array_equal(table.coords["ion_charges"], charges):
+                raise ValueError(
+                    "Atomic data and fractional abundance are for different "
+                    "charge states."
+                )
+        line = 10 ** rate_interpolator(plt, self.extrapolation)(Te, ne).transpose(*dims)
+        recomb = 10 ** rate_interpolator(prb, self.extrapolation)(Te, ne).transpose(
+            *dims
+        )
+        coeff_values = np.sum(fz_values[:-1] * line.values, axis=0) + np.sum(
+            fz_values[1:] * recomb.values, axis=0
+        )
+        if self.charge_exchange:
+            prc, n_neutral = charge_exchange
+            cx = 10 ** rate_interpolator(prc, self.extrapolation)(Te, ne).transpose(
+                *dims
+            )
+            ratio = (n_neutral / ne).broadcast_like(fz.isel(ion_charges=0))
+            coeff_values += ratio.transpose(*dims[1:]).values * np.sum(
+                fz_values[1:] * cx.values, axis=0
+            )
+        coefficient = DataArray(
+            coeff_values,
+            dims=dims[1:],
+            coords={k: v for k, v in fz.coords.items() if "ion_charges" not in v.dims},
+            name=f"{element}_total_radiation_coeffs",
+            attrs={"datatype": ("total_radiation_coeffs", element)},
+        )
+        power_density = ne * n_impurity * coefficient
+        power_density.name = f"{element}_emissivity"
+        power_density.attrs["datatype"] = ("emissivity", element)
+        for result in (coefficient, power_density):
+            if "transform" in ne.attrs:
+                result.attrs["transform"] = ne.attrs["transform"]
+        results = [coefficient, power_density]
+        if self.integrate:
+            results.append(self._integrate(power_density, ne))
+        for result in results:
+            self.assign_provenance(result)
+        return tuple(results)
+
+    def _integrate(self, power_density: DataArray, ne: DataArray) -> DataArray:
+        """Integrate the power density over the volume enclosed by each
+        flux surface."""
+        transform = ne.attrs.get("transform")
+        if not isinstance(transform, FluxSurfaceCoordinates) or not hasattr(
+            transform, "equilibrium"
+        ):
+            raise ValueError(
+                "Electron density must be on flux surface coordinates with an "
+                "equilibrium to integrate the radiated power."
+            )
+        rho_dim = transform.x1_name
+        rho = power_density.coords[rho_dim]
+        t = power_density.coords["t"] if "t" in power_density.dims else None
+        volume = transform.equilibrium.enclosed_volume(rho, t, transform.flux_kind)[0]
+        volume = volume.broadcast_like(power_density)
+        other_dims = [d for d in power_density.dims if d != rho_dim]
+        density = power_density.transpose(rho_dim, *other_dims).values
+        vol = volume.transpose(rho_dim, *other_dims).values
+        segments = 0.5 * (density[1:] + density[:-1]) * np.diff(vol, axis=0)
+        cumulative = np.concatenate(
+            (np.zeros((1,) + density.shape[1:]), np.cumsum(segments, axis=0))
+        )
+        element = power_density.attrs["datatype"][1]
+        return DataArray(
+            cumulative,
+            dims=(rho_dim, *other_dims),
+            coords=power_density.coords,
+            name=f"{element}_radiated_power",
+            attrs={"datatype": ("radiated_power", element), "transform": transform},
+        ).transpose(*power_density.dims)
@@ -0,0 +1,396 @@
+"""Stores the results of operators on disk, so that repeating a
+calculation on the same inputs can reuse them.
+
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+import threading
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import TYPE_CHECKING
+from typing import Union
+import warnings
+
+import numpy as np
+from xarray import DataArray
+from xarray import Dataset
+from xarray import open_dataset
+
+from .. import session
+from ..abstract_equilibrium import AbstractEquilibrium
+from ..converters import CoordinateTransform
+
+if TYPE_CHECKING:
+    from .abstractoperator import Operator
+
+Data = Union[DataArray, Dataset]
+
+CACHE_DIR = ".indica"
+
+#: Attributes which are recreated, rather than restored, when loading
+#: results from the cache.
+PROVENANCE_ATTRS = ("provenance", "partial_provenance")
+
+
+class ResultCacheWarning(UserWarning):
+    """A warning raised when cached results can not be read or written."""
+
+
+def _json_default(value: Any) -> Any:
+    """Converts numpy values into types which can be serialised as JSON."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not serialisable")
+
+
+def _encode_attrs(
+    attrs: Dict[str, Any]
+) -> Tuple[Dict[str, str], Dict[str, str], List[str]]:
+    """Sorts attributes into those which can be stored as JSON, coordinate
+    transforms and arrays. Provenance and any attributes which can not be
+    serialised are left out.
+
+    Returns
+    -------
+    plain
+        The JSON representation of each simple attribute.
+    transforms
+        The encoding of each attribute which is a coordinate transform.
+    arrays
+        The names of attributes which are themselves DataArrays.
+
+    """
+    plain = {}
+    transforms = {}
+    arrays = []
+    for key, value in attrs.items():
+        if key in PROVENANCE_ATTRS:
+            continue
+        if isinstance(value, CoordinateTransform):
+            transforms[key] = value.encode()
+        elif isinstance(value, DataArray):
+            arrays.append(key)
+        else:
+            try:
+                plain[key] = json.dumps(value, default=_json_default, sort_keys=True)
+            except (TypeError, ValueError):
+                continue
+    return plain, transforms, arrays
+
+
+def _update_hash(hash_result: "hashlib._Hash", data: Any):
+    """Add the contents of an argument to an operator to a hash."""
+    if isinstance(data, Dataset):
+        hash_result.update(b"Dataset:")
+        for name in sorted(map(str, data.data_vars)):
+            hash_result.update(bytes(name, encoding="utf-8"))
+            _update_hash(hash_result, data[name])
+        for name in sorted(set(map(str, data.coords)) - set(map(str, data.dims))):
+            hash_result.update(bytes(name, encoding="utf-8"))
+            _update_hash(hash_result, data.coords[name].variable)
+        _update_attrs_hash(hash_result, data.attrs)
+    elif isinstance(data, DataArray):
+        hash_result.update(b"DataArray:")
+        _update_hash(hash_result, data.variable)
+        for name in sorted(map(str, data.coords)):
+            hash_result.update(bytes(name, encoding="utf-8"))
+            _update_hash(hash_result, data.coords[name].variable)
+        _update_attrs_hash(hash_result, data.attrs)
+    elif hasattr(data, "dims") and hasattr(data, "values"):
+        values = np.asarray(data.values)
+        hash_result.update(
+            bytes(f"{data.dims}{values.dtype.str}{values.shape}", encoding="utf-8")
+        )
+        if values.dtype.kind == "O":
+            hash_result.update(bytes(repr(values.tolist()), encoding="utf-8"))
+        else:
+            hash_result.update(np.ascontiguousarray(values).tobytes())
+    else:
+        hash_result.update(bytes(repr(data), encoding="utf-8"))
+    hash_result.update(b",")
+
+
+def _update_attrs_hash(hash_result: "hashlib._Hash", attrs: Dict[str, Any]):
+    """Add the attributes of some data to a hash. Transforms are represented
+    by their fingerprint and the identity of their equilibrium."""
+    plain, transforms, arrays = _encode_attrs(attrs)
+    hash_result.update(
+        bytes(json.dumps([plain, transforms], sort_keys=True), encoding="utf-8")
+    )
+    for key in sorted(transforms):
+        equilibrium = getattr(attrs[key], "equilibrium", None)
+        hash_result.update(
+            bytes(
+                f"{key}:{getattr(equilibrium, 'prov_id', None)}",
+                encoding="utf-8",
+            )
+        )
+    for key in sorted(arrays):
+        hash_result.update(bytes(key, encoding="utf-8"))
+        _update_hash(hash_result, attrs[key])
+
+
+def data_fingerprint(data: Any) -> str:
+    """Produces an SHA256 hash of the contents of some data: its values,
+    coordinates and attributes. Provenance is not included, so the same
+    data read or calculated in different sessions will have the same
+    fingerprint.
+
+    Parameters
+    ----------
+    data
+        The data to hash. Normally a DataArray or Dataset.
+
+    Returns
+    -------
+    :
+        A hexadecimal representation of the hash.
+
+    """
+    hash_result = hashlib.sha256()
+    _update_hash(hash_result, data)
+    return hash_result.hexdigest()
+
+
+def _gather_transforms(
+    data: Any, transforms: Dict[str, CoordinateTransform]
+) -> Optional[AbstractEquilibrium]:
+    """Collects all of the transforms used by some data, indexed by
+    fingerprint. Returns the first equilibrium they use, if any."""
+    equilibrium = None
+    if isinstance(data, Dataset):
+        for array in data.data_vars.values():
+            equilibrium = _gather_transforms(array, transforms) or equilibrium
+    if isinstance(data, (DataArray, Dataset)):
+        for value in data.attrs.values():
+            if isinstance(value, CoordinateTransform):
+                transforms.setdefault(value.fingerprint, value)
+                equilibrium = equilibrium or getattr(value, "equilibrium", None)
+    return equilibrium
+
+
+class ResultCache:
+    """Stores the results of calling operators in netCDF files, indexed
+    by the type and parameters of the operator and the contents of its
+    arguments. When the cache grows beyond its maximum size, the least
+    recently used results are removed.
+
+    Results are restored with their datatype and transform
+    attributes. Transforms equal to those of the arguments are replaced
+    by the objects from the arguments; others are given the same
+    equilibrium as the arguments. Provenance is then assigned by the
+    operator as though it had performed the calculation.
+
+    Parameters
+    ----------
+    directory
+        Where to store the cached results. Defaults to
+        ``~/.indica/Operator``.
+    max_size
+        The maximum total size of the cached results, in bytes.
+
+    """
+
+    def __init__(
+        self, directory: Optional[Union[str, Path]] = None, max_size: int = 2 ** 30
+    ):
+        self.directory = (
+            Path(directory)
+            if directory is not None
+            else Path.home() / CACHE_DIR / "Operator"
+        )
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+
+    def key(self, operator: "Operator", args: Tuple[Any, ...]) -> str:
+        """The key used to identify the results of calling ``operator``
+        with ``args``."""
+        return session.hash_vals(
+            operator_type=operator.__class__.__name__,
+            prov_id=operator.prov_id,
+            **{"arg" + str(i): data_fingerprint(arg) for i, arg in enumerate(args)},
+        )
+
+    def call(
+        self,
+        operator: "Operator",
+        func: Callable[..., Any],
+        args: Tuple[Any, ...],
+    ) -> Any:
+        """Returns the cached results of calling ``operator`` with ``args``
+        if they exist. Otherwise uses ``func`` to calculate the results
+        and caches them.
+
+        Parameters
+        ----------
+        operator
+            The operator being called.
+        func
+            The function performing the operator's calculation.
+        args
+            The arguments to the operator.
+
+        """
+        key = self.key(operator, args)
+        path = self.directory / (key + ".nc")
+        results = self._read(path, args)
+        if results is None:
+            results = func(*args)
+            self._write(path, results)
+            return results
+        operator.validate_arguments(*args)
+        new_activity = operator._prov_count == 0
+        results_tuple = results if isinstance(results, tuple) else (results,)
+        operator._restore_from_cache(*results_tuple)
+        for result in results_tuple:
+            operator.assign_provenance(result)
+        if new_activity:
+            operator.activity.add_attributes({"cached_result": key})
+        return results
+
+    def clear(self):
+        """Remove all results from the cache."""
+        for path in self.directory.glob("*.nc"):
+            path.unlink()
+
+    @property
+    def size(self) -> int:
+        """The total size of the cached results, in bytes."""
+        return sum(path.stat().st_size for path in self.directory.glob("*.nc"))
+
+    def _read(self, path: Path, args: Tuple[Any, ...]) -> Any:
+        """Load results from the cache, returning None if they are not
+        present or can not be read."""
+        if not path.exists():
+            return None
+        transforms: Dict[str, CoordinateTransform] = {}
+        equilibrium = None
+        for arg in args:
+            equilibrium = _gather_transforms(arg, transforms) or equilibrium
+        try:
+            with open_dataset(path) as manifest:
+                n_results = int(manifest.attrs["n_results"])
+                is_tuple = bool(manifest.attrs["is_tuple"])
+            results = tuple(
+                _read_data(path, f"result{i}", transforms, equilibrium)
+                for i in range(n_results)
+            )
+        except Exception as e:
+            warnings.warn(
+                f"Error reading cached results {path}: {e}", ResultCacheWarning
+            )
+            return None
+        os.utime(path)
+        return results if is_tuple else results[0]
+
+    def _write(self, path: Path, results: Any):
+        """Store results in the cache, then remove the least recently used
+        results if the cache is too large."""
+        results_tuple = results if isinstance(results, tuple) else (results,)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            Dataset(
+                attrs={
+                    "n_results": len(results_tuple),
+                    "is_tuple": int(isinstance(results, tuple)),
+                }
+            ).to_netcdf(tmp_path)
+            for i, result in enumerate(results_tuple):
+                _write_data(tmp_path, f"result{i}", result)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            warnings.warn(f"Could not cache results in {path}: {e}", ResultCacheWarning)
+            if tmp_path.exists():
+                tmp_path.unlink()
+            return
+        self._evict()
+
+    def _evict(self):
+        """Remove the least recently used results until the cache is no
+        larger than its maximum size."""
+        entries = sorted(
+            (path.stat().st_mtime, path.stat().st_size, path)
+            for path in self.directory.glob("*.nc")
+        )
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+def _write_data(path: Path, group: str, data: Data):
+    """Append a DataArray or Dataset to a netCDF file, in the given group,
+    along with the attributes needed to recreate it."""
+    plain, transforms, arrays = _encode_attrs(data.attrs)
+    if isinstance(data, Dataset):
+        names = list(data.data_vars)
+        contents = Dataset(coords=data.coords)
+        kind = "Dataset"
+    else:
+        names = []
+        array = data.copy(deep=False)
+        array.attrs = {}
+        contents = array.to_dataset(name="values")
+        kind = "DataArray"
+    for variable in contents.variables.values():
+        variable.attrs = {}
+    contents.attrs = {
+        "kind": kind,
+        "name": json.dumps(data.name if isinstance(data, DataArray) else None),
+        "attrs": json.dumps(plain),
+        "transforms": json.dumps(transforms),
+        "array_attrs": json.dumps(arrays),
+        "variables": json.dumps([str(name) for name in names]),
+    }
+    contents.to_netcdf(path, mode="a", group=group)
+    for key in arrays:
+        _write_data(path, f"{group}/attr_{key}", data.attrs[key])
+    for i, name in enumerate(names):
+        _write_data(path, f"{group}/var{i}", data[name])
+
+
+def _read_data(
+    path: Path,
+    group: str,
+    transforms: Dict[str, CoordinateTransform],
+    equilibrium: Optional[AbstractEquilibrium],
+) -> Data:
+    """Recreate a DataArray or Dataset written with :py:func:`_write_data`."""
+    with open_dataset(path, group=group) as contents:
+        contents.load()
+    meta = contents.attrs
+    attrs: Dict[str, Any] = {
+        key: json.loads(value) for key, value in json.loads(meta["attrs"]).items()
+    }
+    if "datatype" in attrs:
+        attrs["datatype"] = tuple(attrs["datatype"])
+    for key, encoded in json.loads(meta["transforms"]).items():
+        fingerprint = hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+        if fingerprint not in transforms:
+            transforms[fingerprint] = CoordinateTransform.decode(encoded, equilibrium)
+        attrs[key] = transforms[fingerprint]
+    for key in json.loads(meta["array_attrs"]):
+        attrs[key] = _read_data(path, f"{group}/attr_{key}", transforms, equilibrium)
+    if meta["kind"] == "Dataset":
+        result: Data = Dataset(coords=contents.coords)
+        for i, name in enumerate(json.loads(meta["variables"])):
+            result[name] = _read_data(path, f"{group}/var{i}", transforms, equilibrium)
+    else:
+        result = contents["values"]
+        result.name = json.loads(meta["name"])
+    result.attrs = attrs
+    return result
@@ -1,32 +1,33 @@
 """Fit 1-D splines to data."""
 
-from itertools import accumulate
-from itertools import chain
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
 from itertools import repeat
-from itertools import tee
 from typing import cast
 from typing import Hashable
 from typing import List
+from typing import Optional
 from typing import Tuple
 from typing import Union
 import warnings
 
 import numpy as np
 from scipy.interpolate import CubicSpline
-from scipy.optimize import least_squares
-from scipy.sparse import lil_matrix
+from scipy.optimize import lsq_linear
+from xarray import broadcast
 from xarray import DataArray
 
 from .abstractoperator import EllipsisType
 from .abstractoperator import Operator
+from .. import profiling
 from .. import session
 from ..converters import bin_to_time_labels
 from ..converters import CoordinateTransform
 from ..converters import FluxSurfaceCoordinates
 from ..datatypes import DataType
 from ..numpy_typing import ArrayLike
-from ..utilities import broadcast_spline
 from ..utilities import coord_array
+from ..utilities import PiecewisePolynomial
 
 
 SingleBoundaryType = Union[str, Tuple[int, ArrayLike]]
@@ -35,7 +36,9 @@ BoundaryType = Union[str, Tuple[SingleBoundaryType, SingleBoundaryType]]
 
 class Spline:
     """Callable class wrapping a `:class:scipy.interpolate.CubicSpline`
-    object so it will work with DataArrays.
+    object so it will work with DataArrays. The spline is held as a
+    :py:class:`indica.utilities.PiecewisePolynomial`, in the
+    :py:attr:`spline` attribute.
 
     Parameters
     ----------
@@ -63,8 +66,13 @@ class Spline:
             k: np.asarray(v) for k, v in values.coords.items() if k != self.dim
         }
         transpose_order = (self.dim,) + self.spline_dims
-        self.spline = CubicSpline(
-            values.coords[dim], values.transpose(*transpose_order), 0, bounds, False
+        self.spline = PiecewisePolynomial.from_spline(
+            CubicSpline(
+                values.coords[dim], values.transpose(*transpose_order), 0, bounds, False
+            ),
+            dim,
+            self.spline_dims,
+            self.spline_coords,
         )
         self.transform = coord_transform
 
@@ -94,13 +102,44 @@ class Spline:
             coord_system.convert_to(self.transform, x1, x2, t),
         )
         coord = self_x1 if self.dim == self.transform.x1_name else self_x2
-        result = broadcast_spline(
-            self.spline, self.spline_dims, self.spline_coords, coord
-        )
+        result = self.spline(coord)
         result.attrs["transform"] = coord_system
         return result
 
 
+def _fit_knot_values(
+    design: np.ndarray,
+    target: np.ndarray,
+    bounds: Tuple[np.ndarray, np.ndarray],
+) -> Tuple[np.ndarray, Optional[int]]:
+    """Find the bounded least-squares knot values of a spline fit to data at
+    a single time.
+
+    Parameters
+    ----------
+    design
+        The value of each spline basis function at the location of each datum.
+    target
+        The data to be fit. Non-finite values are ignored.
+    bounds
+        Lower and upper bounds on the knot values.
+
+    Returns
+    -------
+    :
+        The knot values and the status reported by
+        :py:func:`scipy.optimize.lsq_linear`. If there is no data then the
+        knot values are NaN and the status is None.
+
+    """
+    has_data = np.isfinite(target)
+    if not np.any(has_data):
+        return np.full(design.shape[1], np.nan), None
+    fit = lsq_linear(design[has_data], target[has_data], bounds, "bvls")
+    # The solver can leave values outside the bounds by rounding errors
+    return np.clip(fit.x, *bounds), fit.status
+
+
 class SplineFit(Operator):
     """Fit a 1-D spline to data. The spline will be given on poloidal flux
     surface coordinates, as specified by the user. It can derive a
@@ -117,6 +156,11 @@ class SplineFit(Operator):
     upper_bound : ArrayLike
         The upper bounds to use for values at each not. May be either a
         scalar or an array of the same shape as ``knots``.
+    n_workers : int
+        The number of workers over which to divide the time slices, each of
+        which is fit independently.
+    use_processes : bool
+        Whether the workers should be separate processes, rather than threads.
     sess : session.Session
         An object representing the session being run. Contains information
         such as provenance data.
@@ -135,6 +179,8 @@ class SplineFit(Operator):
         knots: ArrayLike = [0.0, 0.3, 0.6, 0.85, 0.95, 1.05],
         lower_bound: ArrayLike = -np.inf,
         upper_bound: ArrayLike = np.inf,
+        n_workers: int = 1,
+        use_processes: bool = False,
         sess: session.Session = session.global_session,
     ):
         self.knots = coord_array(knots, "rho_poloidal")
@@ -148,6 +194,8 @@ class SplineFit(Operator):
             raise ValueError(
                 "lower_bound must be either a scalar or array of same size as knots"
             )
+        self.n_workers = n_workers
+        self.use_processes = use_processes
         self.spline: Spline
         self.spline_vals: DataArray
         super().__init__(
@@ -177,6 +225,14 @@ class SplineFit(Operator):
         input_type = args[-1]
         return (input_type,) * len(args)
 
+    def _restore_from_cache(self, *results: DataArray):
+        """Recreate the splines for results loaded from a cache."""
+        result, self.spline_vals = results[0], results[1]
+        self.spline = Spline(
+            self.spline_vals, "rho_poloidal", result.attrs["transform"]
+        )
+        result.attrs["splines"] = self.spline
+
     def __call__(  # type: ignore[override]
         self,
         rho: DataArray,
@@ -225,74 +281,73 @@ class SplineFit(Operator):
                 // (d.coords[d.attrs["transform"].x1_name].size * times.size)
             )
         nt = len(times)
-        rows = sum(d.attrs["nchannels"] for d in binned_data) * nt
-        cols = (n_knots - 1) * nt
-        sparsity = lil_matrix((rows, cols), dtype=int)
-        nc1, nc2 = tee(d.attrs["nchannels"] for d in binned_data)
-
-        for nc, data_row_start in zip(
-            nc1, accumulate(map(lambda x: x * nt, chain(repeat(0, 1), nc2)))
-        ):
-            for i in range(nt):
-                rstart = data_row_start + i * nc
-                rend = rstart + nc
-                cstart = i * (n_knots - 1)
-                cend = cstart + (n_knots - 1)
-                sparsity[rstart:rend, cstart:cend] = 1
+        lower_bound = np.broadcast_to(self.lower_bound, (n_knots,))[:-1]
+        upper_bound = np.broadcast_to(self.upper_bound, (n_knots,))[:-1]
 
         def knotvals_to_xarray(knotvals):
             all_knots = np.empty((nt, n_knots))
-            all_knots[:, :-1] = knotvals.reshape(nt, n_knots - 1)
+            all_knots[:, :-1] = knotvals
             all_knots[:, -1] = 0.0
             return DataArray(
-                all_knots, coords=[("t", times), ("rho_poloidal", self.knots)]
+                all_knots,
+                coords=[("t", np.asarray(times)), ("rho_poloidal", self.knots.values)],
             )
 
+        # A spline with fixed knots is linear in its knot values, so the fit
+        # is a linear least-squares problem. Its design matrix holds the
+        # spline basis functions evaluated at the location of each datum,
+        # with one block for each time. The last knot value is fixed at 0.
         # TODO: Consider how to handle locations outside of interpolation range.
         # For now just setting the interpolated values to 0.0
-        def residuals(knotvals):
-            self.spline_vals = knotvals_to_xarray(knotvals)
-            self.spline = Spline(self.spline_vals, "rho_poloidal", flux_surfaces)
-            start = 0
-            resid = np.empty(rows)
-            for d, g in zip(binned_data, good_channels):
-                end = start + d.attrs["nchannels"] * nt
-                rho, theta = d.indica.convert_coords(flux_surfaces)
-                resid[start:end] = np.ravel(
-                    (
-                        self.spline(flux_surfaces, rho, theta, times).fillna(0.0) - d
-                    ).isel({d.attrs["transform"].x1_name: g})
-                )
-                start = end
-            # assert np.all(np.isfinite(resid))
-            return resid
-
-        guess = np.concatenate(
-            tuple(
-                np.mean([d.sel(t=t).mean() for d in binned_data]) * np.ones(n_knots - 1)
-                for t in times
-            )
-        )
-
-        fit = least_squares(
-            residuals,
-            guess,
-            bounds=(self.lower_bound, self.upper_bound),
-            jac_sparsity=sparsity,
-            verbose=2,
-        )
-
-        if fit.status == -1:
-            raise RuntimeError(
-                "Improper input to `least_squares` function when trying to "
-                "fit emissivity to radiation data."
-            )
-        elif fit.status == 0:
-            warnings.warn(
-                "Attempt to fit splines reached maximum number of function "
-                "evaluations.",
-                RuntimeWarning,
+        basis = CubicSpline(self.knots, np.eye(n_knots), 0, "clamped", False)
+        design_blocks: List[List[np.ndarray]] = [[] for _ in range(nt)]
+        target_blocks: List[List[np.ndarray]] = [[] for _ in range(nt)]
+        for d, g in zip(binned_data, good_channels):
+            x1_name = d.attrs["transform"].x1_name
+            rho_d, _ = d.indica.convert_coords(flux_surfaces)
+            values, rho_d = broadcast(d.isel({x1_name: g}), rho_d.isel({x1_name: g}))
+            values = np.asarray(values.transpose("t", ...)).reshape(nt, -1)
+            rho_d = np.asarray(rho_d.transpose("t", ...)).reshape(nt, -1)
+            for i in range(nt):
+                design_blocks[i].append(np.nan_to_num(basis(rho_d[i]))[:, :-1])
+                target_blocks[i].append(values[i])
+        # The knot values at each time only affect the data at that time, so
+        # each time can be fit independently.
+        designs = [np.concatenate(block) for block in design_blocks]
+        targets = [np.concatenate(block) for block in target_blocks]
+        bounds = repeat((lower_bound, upper_bound))
+        if self.n_workers > 1:
+            executor_type = (
+                ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
             )
+            with executor_type(self.n_workers) as executor:
+                fits = list(
+                    executor.map(
+                        _fit_knot_values,
+                        designs,
+                        targets,
+                        bounds,
+                        chunksize=max(1, nt // (4 * self.n_workers)),
+                    )
+                )
+        else:
+            fits = list(map(_fit_knot_values, designs, targets, bounds))
+
+        for t, (_, status) in zip(np.asarray(times), fits):
+            profiling.record(lsq_linear_fits=1, **{f"status_{status}": 1})
+            if status == 0:
+                warnings.warn(
+                    f"Attempt to fit splines at time t={t} reached maximum "
+                    "number of iterations.",
+                    RuntimeWarning,
+                )
+            elif status is None:
+                warnings.warn(
+                    f"No data available to fit splines at time t={t}.",
+                    RuntimeWarning,
+                )
+        self.spline_vals = knotvals_to_xarray(np.stack([x for x, _ in fits]))
+        self.spline = Spline(self.spline_vals, "rho_poloidal", flux_surfaces)
         result = self.spline(flux_surfaces, rho, DataArray(0.0), times)
         result.attrs["splines"] = self.spline
         self.spline_vals.attrs["datatype"] = result.attrs["datatype"] = data[0].attrs[
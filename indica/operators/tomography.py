@@ -0,0 +1,472 @@
+"""Inverts radiation data to estimate the emissivity on a two-dimensional grid
+of pixels, without assuming it is constant on flux surfaces."""
+
+from collections import OrderedDict
+from typing import Dict
+from typing import Hashable
+from typing import List
+from typing import Literal
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import cg
+from scipy.sparse.linalg import splu
+from xarray import DataArray
+
+from .abstractoperator import EllipsisType
+from .abstractoperator import Operator
+from .. import profiling
+from .. import session
+from ..abstract_equilibrium import AbstractEquilibrium
+from ..converters import bin_to_time_labels
+from ..converters import LinesOfSightTransform
+from ..converters import TrivialTransform
+from ..datatypes import DataType
+from ..datatypes import SpecificDataType
+
+Regularisation = Literal["tikhonov", "minimum_fisher"]
+# The transform of a camera, with the contribution of each pixel to each of its
+# lines of sight
+_Geometry = Tuple[LinesOfSightTransform, sparse.csr_matrix]
+
+#: The maximum number of geometry matrices to keep for reuse.
+MAX_CACHED_GEOMETRIES = 16
+
+
+def _gradient_matrix(x: np.ndarray) -> sparse.csr_matrix:
+    """A matrix which, applied to values on the points ``x``, gives their
+    derivative with second-order central differences (first order at the
+    ends), as calculated by :py:func:`numpy.gradient`."""
+    return sparse.csr_matrix(np.gradient(np.eye(len(x)), x, axis=0))
+
+
+def _bilinear_weights(
+    grid: np.ndarray, x: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Indices of the grid points on either side of each position, the weight
+    to give the lower of the two when interpolating, and whether the position
+    lies within the grid."""
+    inside = (x >= grid[0]) & (x <= grid[-1])
+    upper = np.clip(np.searchsorted(grid, x, side="right"), 1, len(grid) - 1)
+    lower = upper - 1
+    weight = (grid[upper] - x) / (grid[upper] - grid[lower])
+    return lower, weight, inside
+
+
+class PixelTomography(Operator):
+    """Estimates the emissivity of the plasma on a grid of pixels in (R, z)
+    from the radiation measured along the lines of sight of one or more
+    cameras.
+
+    The emissivity is interpolated bilinearly between the pixels, so the
+    integral along each line of sight is a linear function of the pixel
+    values, :math:`b = Tf`. The geometry matrix :math:`T` is sparse, as each
+    line of sight crosses only a small fraction of the pixels. It is
+    calculated once for each camera and grid and reused for all times (and
+    by later calls). At each time the regularised problem
+
+    .. math::
+
+        (T^TT + \\lambda H)f = T^Tb
+
+    is solved. The smoothing matrix :math:`H` penalises gradients of the
+    emissivity, with those along flux surfaces (taken from the equilibrium
+    of the cameras) penalised more strongly than those across them. These
+    matrices are only recalculated for times at which the flux surfaces
+    change.
+
+    For Tikhonov regularisation the times are batched: all times with the
+    same valid lines of sight, uncertainties and smoothing matrix share a
+    single sparse LU factorisation, which is used to solve for all of them
+    at once. For minimum Fisher regularisation the gradients are weighted
+    by the inverse of the emissivity, and the problem is solved
+    iteratively, updating these weights each time. This suppresses spurious
+    structure where the emission is weak. As the weights depend on the
+    solution, the times are solved in turn with the conjugate gradient
+    method, each starting from the solution at the previous time. Negative
+    emissivity is set to zero.
+
+    Parameters
+    ----------
+    datatype : SpecificDataType
+        The type of radiation data to be inverted.
+    regularisation : str
+        Either "tikhonov" or "minimum_fisher".
+    strength : float
+        The strength of the regularisation, relative to the trace of
+        :math:`T^TT`.
+    isotropy : float
+        The weight of the penalty on gradients in all directions, relative to
+        that on gradients along flux surfaces. If the cameras have no
+        equilibrium then only this isotropic smoothing is applied.
+    fisher_iterations : int
+        The number of times to solve the problem at each time when using
+        minimum Fisher regularisation.
+    n_samples : int
+        The number of positions along each line of sight used to calculate
+        the geometry matrix.
+    maxiter : Optional[int]
+        The maximum number of conjugate gradient iterations for each solve,
+        when using minimum Fisher regularisation.
+    sess : session.Session
+        An object representing the session being run. Contains information
+        such as provenance data.
+
+    """
+
+    def __init__(
+        self,
+        datatype: SpecificDataType = "sxr",
+        regularisation: Regularisation = "minimum_fisher",
+        strength: float = 1e-2,
+        isotropy: float = 0.1,
+        fisher_iterations: int = 3,
+        n_samples: int = 257,
+        maxiter: Optional[int] = None,
+        sess: session.Session = session.global_session,
+    ):
+        if regularisation not in ("tikhonov", "minimum_fisher"):
+            raise ValueError(f"Unrecognised regularisation '{regularisation}'.")
+        self.datatype = datatype
+        self.regularisation = regularisation
+        self.strength = strength
+        self.isotropy = isotropy
+        self.fisher_iterations = (
+            fisher_iterations if regularisation == "minimum_fisher" else 1
+        )
+        self.n_samples = n_samples
+        self.maxiter = maxiter
+        self._geometries: "OrderedDict[Hashable, _Geometry]" = OrderedDict()
+        self.ARGUMENT_TYPES: List[Union[DataType, EllipsisType]] = [
+            ("major_rad", None),
+            ("z", None),
+            ("time", None),
+            ("luminous_flux", datatype),
+            ...,
+        ]
+        super().__init__(
+            sess,
+            datatype=datatype,
+            regularisation=regularisation,
+            strength=strength,
+            isotropy=isotropy,
+            fisher_iterations=fisher_iterations,
+            n_samples=n_samples,
+            maxiter=maxiter,
+        )
+
+    def return_types(self, *args: DataType) -> Tuple[DataType, ...]:
+        """Indicates the datatypes of the results when calling the operator
+        with arguments of the given types. It is assumed that the
+        argument types are valid.
+
+        Parameters
+        ----------
+        args
+            The datatypes of the parameters which the operator is to be called with.
+
+        Returns
+        -------
+        :
+            The datatype of each result that will be returned if the operator is
+            called with these arguments.
+
+        """
+        return (("emissivity", self.datatype),) + (
+            ("luminous_flux", self.datatype),
+        ) * (len(args) - 3)
+
+    def _geometry_matrix(
+        self,
+        transform: LinesOfSightTransform,
+        channels: DataArray,
+        R: np.ndarray,
+        z: np.ndarray,
+    ) -> sparse.csr_matrix:
+        """The contribution of each pixel to the integral along each line of
+        sight of a camera. These are cached for reuse."""
+        key = (
+            transform._cache_key(),
+            channels.values.tobytes(),
+            R.tobytes(),
+            z.tobytes(),
+            self.n_samples,
+        )
+        if key in self._geometries:
+            self._geometries.move_to_end(key)
+            return self._geometries[key][1]
+        x2 = DataArray(np.linspace(0.0, 1.0, self.n_samples), dims=transform.x2_name)
+        R_los, z_los = transform.convert_to_Rz(channels, x2, 0.0)
+        length = transform.distance(transform.x2_name, channels, x2[[0, -1]], 0.0).isel(
+            {transform.x2_name: -1}
+        )
+        quadrature = np.trapz(np.eye(self.n_samples), axis=0)
+        dl = np.asarray(length)[:, np.newaxis] / (self.n_samples - 1) * quadrature
+        R_los, z_los = (
+            np.asarray(x.transpose(transform.x1_name, transform.x2_name))
+            for x in (R_los, z_los)
+        )
+        i, wi, inside_R = _bilinear_weights(R, R_los)
+        j, wj, inside_z = _bilinear_weights(z, z_los)
+        inside = inside_R & inside_z
+        rows = np.broadcast_to(np.arange(len(channels))[:, np.newaxis], inside.shape)
+        row_index = []
+        column_index = []
+        values = []
+        for di, fi in ((0, wi), (1, 1 - wi)):
+            for dj, fj in ((0, wj), (1, 1 - wj)):
+                row_index.append(rows[inside])
+                column_index.append(((i + di) * len(z) + j + dj)[inside])
+                values.append((dl * fi * fj)[inside])
+        matrix = sparse.csr_matrix(
+            (
+                np.concatenate(values),
+                (np.concatenate(row_index), np.concatenate(column_index)),
+            ),
+            shape=(len(channels), len(R) * len(z)),
+        )
+        # Keep the transform (and so its equilibrium) alive while cached, so
+        # that the id in the key can not be reused by another object
+        self._geometries[key] = (transform, matrix)
+        if len(self._geometries) > MAX_CACHED_GEOMETRIES:
+            self._geometries.popitem(last=False)
+        return matrix
+
+    def _smoothing_matrices(
+        self,
+        R: DataArray,
+        z: DataArray,
+        times: DataArray,
+        equilibrium: Optional[AbstractEquilibrium],
+    ) -> List[Tuple[sparse.csr_matrix, ...]]:
+        """For each time, the derivatives of the emissivity in R and z and,
+        if there is an equilibrium, along flux surfaces. Times at which the
+        flux surfaces are unchanged share the same matrices."""
+        d_R = sparse.kron(_gradient_matrix(R.values), sparse.identity(len(z)), "csr")
+        d_z = sparse.kron(sparse.identity(len(R)), _gradient_matrix(z.values), "csr")
+        if equilibrium is None:
+            return [(d_R, d_z)] * len(times)
+        rho, _, _ = equilibrium.flux_coords(R, z, times)
+        rho = rho.transpose("t", R.dims[0], z.dims[0]).values
+        result: List[Tuple[sparse.csr_matrix, ...]] = []
+        for i, flux in enumerate(rho):
+            if i > 0 and np.array_equal(flux, rho[i - 1]):
+                result.append(result[-1])
+                continue
+            drho_dR, drho_dz = np.gradient(flux, R.values, z.values)
+            norm = np.hypot(drho_dR, drho_dz)
+            norm = np.where(norm > 0.0, norm, np.inf)
+            # Unit vector along flux surfaces, perpendicular to grad(rho)
+            d_parallel = (
+                sparse.diags((-drho_dz / norm).ravel()) @ d_R
+                + sparse.diags((drho_dR / norm).ravel()) @ d_z
+            )
+            result.append((d_R, d_z, d_parallel.tocsr()))
+        return result
+
+    def _normal_equations(
+        self, geometry: sparse.csr_matrix, data: np.ndarray, sigma: np.ndarray
+    ) -> Tuple[sparse.csr_matrix, np.ndarray]:
+        """The matrix :math:`T^TT` and the right hand side :math:`T^Tb` of
+        the normal equations, for the lines of sight with valid data. If
+        ``data`` is two-dimensional, its rows are different times with the
+        same uncertainties and the right hand side has a column for each."""
+        valid = np.isfinite(sigma) & (sigma > 0.0)
+        T = sparse.diags(1 / sigma[valid]) @ geometry[valid]
+        return (T.T @ T).tocsr(), T.T @ (data[..., valid] / sigma[valid]).T
+
+    def _regularised_matrix(
+        self,
+        normal: sparse.csr_matrix,
+        derivatives: Tuple[sparse.csr_matrix, ...],
+        weights: sparse.spmatrix,
+    ) -> sparse.csr_matrix:
+        """The matrix :math:`T^TT + \\lambda H`, for gradients weighted by
+        ``weights``."""
+        smoothing = self.isotropy * (
+            derivatives[0].T @ weights @ derivatives[0]
+            + derivatives[1].T @ weights @ derivatives[1]
+        )
+        if len(derivatives) > 2:
+            smoothing = smoothing + derivatives[2].T @ weights @ derivatives[2]
+        multiplier = (
+            self.strength * normal.diagonal().sum() / smoothing.diagonal().sum()
+        )
+        return (normal + multiplier * smoothing).tocsr()
+
+    def _solve_tikhonov(
+        self,
+        geometry: sparse.csr_matrix,
+        data: np.ndarray,
+        sigma: np.ndarray,
+        derivatives: List[Tuple[sparse.csr_matrix, ...]],
+    ) -> Tuple[np.ndarray, int]:
+        """Find the Tikhonov-regularised emissivity at all times, returning
+        it and the number of factorisations performed."""
+        sigma = np.where(np.isfinite(data), sigma, np.nan)
+        groups: Dict[Hashable, List[int]] = {}
+        for i in range(len(data)):
+            key = (sigma[i].tobytes(), id(derivatives[i]))
+            groups.setdefault(key, []).append(i)
+        identity = sparse.identity(geometry.shape[1])
+        emissivity = np.empty((len(data), geometry.shape[1]))
+        for indices in groups.values():
+            normal, rhs = self._normal_equations(
+                geometry, data[indices], sigma[indices[0]]
+            )
+            matrix = self._regularised_matrix(normal, derivatives[indices[0]], identity)
+            emissivity[indices] = splu(matrix.tocsc()).solve(rhs).T
+        return np.where(emissivity > 0.0, emissivity, 0.0), len(groups)
+
+    def _solve_minimum_fisher(
+        self,
+        geometry: sparse.csr_matrix,
+        data: np.ndarray,
+        sigma: np.ndarray,
+        derivatives: Tuple[sparse.csr_matrix, ...],
+        guess: np.ndarray,
+    ) -> Tuple[np.ndarray, int]:
+        """Find the minimum Fisher regularised emissivity at a single time,
+        returning it and the total number of conjugate gradient
+        iterations."""
+        sigma = np.where(np.isfinite(data), sigma, np.nan)
+        normal, rhs = self._normal_equations(geometry, data, sigma)
+        iterations = 0
+
+        def count(_):
+            nonlocal iterations
+            iterations += 1
+
+        emissivity = guess
+        for _ in range(self.fisher_iterations):
+            if np.any(emissivity > 0.0):
+                floor = 1e-3 * emissivity.max()
+                weights = sparse.diags(1 / np.maximum(emissivity, floor))
+            else:
+                weights = sparse.identity(len(emissivity))
+            emissivity, info = cg(
+                self._regularised_matrix(normal, derivatives, weights),
+                rhs,
+                emissivity,
+                maxiter=self.maxiter,
+                callback=count,
+            )
+            if info < 0:
+                raise RuntimeError(
+                    "Illegal input to conjugate gradient solver when inverting "
+                    "radiation data."
+                )
+            emissivity = np.where(emissivity > 0.0, emissivity, 0.0)
+        return emissivity, iterations
+
+    def __call__(  # type: ignore[override]
+        self,
+        R: DataArray,
+        z: DataArray,
+        times: DataArray,
+        *cameras: DataArray,
+    ) -> Tuple[DataArray, ...]:
+        """Calculate the emissivity of the plasma on a grid of pixels.
+
+        Parameters
+        ----------
+        R
+            Major radii of the pixels.
+        z
+            Vertical positions of the pixels.
+        times
+            Times at which to calculate the emissivity.
+        cameras
+            The luminosity data being fit to, with each camera passed as a
+            separate argument. Their coordinate transforms must be
+            :py:class:`indica.converters.LinesOfSightTransform` objects. If
+            they have an ``error`` attribute, this is used to weight each
+            line of sight.
+
+        Returns
+        -------
+        : DataArray
+            The emissivity on each pixel at each time.
+        : DataArray
+            For each camera passed as an argument, the integral of the
+            emissivity along its lines of sight.
+
+        """
+        self.validate_arguments(R, z, times, *cameras)
+        transforms = [c.attrs["transform"] for c in cameras]
+        if not all(isinstance(t, LinesOfSightTransform) for t in transforms):
+            raise ValueError("Cameras must have lines of sight as coordinates.")
+        geometries = [
+            self._geometry_matrix(t, c.coords[t.x1_name], R.values, z.values)
+            for c, t in zip(cameras, transforms)
+        ]
+        geometry = sparse.vstack(geometries).tocsr()
+        binned = [bin_to_time_labels(times.data, c) for c in cameras]
+        data = np.concatenate(
+            [b.transpose("t", t.x1_name).values for b, t in zip(binned, transforms)],
+            axis=1,
+        )
+        sigma = np.concatenate(
+            [
+                b.attrs["error"].transpose("t", t.x1_name).values
+                if "error" in b.attrs
+                else np.ones((len(times), b.sizes[t.x1_name]))
+                for b, t in zip(binned, transforms)
+            ],
+            axis=1,
+        )
+        derivatives = self._smoothing_matrices(
+            R, z, times, getattr(transforms[0], "equilibrium", None)
+        )
+
+        if self.regularisation == "tikhonov":
+            emissivity, factorisations = self._solve_tikhonov(
+                geometry, data, sigma, derivatives
+            )
+            profiling.record(
+                tomography_solves=len(times), lu_factorisations=factorisations
+            )
+        else:
+            emissivity = np.zeros((len(times), len(R) * len(z)))
+            guess = np.zeros(len(R) * len(z))
+            total_iterations = 0
+            for i in range(len(times)):
+                guess, iterations = self._solve_minimum_fisher(
+                    geometry, data[i], sigma[i], derivatives[i], guess
+                )
+                emissivity[i] = guess
+                total_iterations += iterations
+            profiling.record(
+                tomography_solves=len(times), cg_iterations=total_iterations
+            )
+
+        result = DataArray(
+            emissivity.reshape(len(times), len(R), len(z)),
+            coords=[("t", times.values), (R.dims[0], R.values), (z.dims[0], z.values)],
+            name=self.datatype + "_emissivity",
+            attrs={
+                "datatype": ("emissivity", self.datatype),
+                "transform": TrivialTransform(),
+            },
+        )
+        self.assign_provenance(result)
+        back_integrals = []
+        for camera, matrix, transform in zip(cameras, geometries, transforms):
+            integral = DataArray(
+                (matrix @ emissivity.T).T,
+                coords=[
+                    ("t", times.values),
+                    (transform.x1_name, camera.coords[transform.x1_name].values),
+                ],
+                name=f"{camera.name}_back_integral" if camera.name else None,
+                attrs={
+                    "datatype": ("luminous_flux", self.datatype),
+                    "transform": transform,
+                },
+            )
+            self.assign_provenance(integral)
+            back_integrals.append(integral)
+        return (result, *back_integrals)
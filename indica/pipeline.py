@@ -0,0 +1,276 @@
+"""Declares calculations as a graph of steps, so that independent steps
+can be run concurrently.
+
+"""
+
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from functools import partial
+import threading
+from types import BuiltinFunctionType
+from types import FunctionType
+from types import MethodType
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Hashable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+
+class PipelineError(Exception):
+    """An Exception class raised by :py:class:`Pipeline` when steps are
+    declared incorrectly."""
+
+
+class NodeItem:
+    """A reference to an item of the result of a step in a
+    pipeline. Created by indexing a :py:class:`Node`.
+
+    """
+
+    def __init__(self, node: "Node", keys: Tuple[Hashable, ...]):
+        self.node = node
+        self.keys = keys
+
+    def __getitem__(self, key: Hashable) -> "NodeItem":
+        return NodeItem(self.node, self.keys + (key,))
+
+    def _resolve(self, results: Dict[str, Any]) -> Any:
+        value = results[self.node.name]
+        for key in self.keys:
+            value = value[key]
+        return value
+
+    def __repr__(self) -> str:
+        return self.node.name + "".join(f"[{key!r}]" for key in self.keys)
+
+
+class Node:
+    """A step in a :py:class:`Pipeline`. Created by
+    :py:meth:`Pipeline.add`. It can be passed as an argument to later steps
+    in place of its result, or indexed to pass an item of the result
+    (e.g., one of the DataArrays in the dictionary returned by a reader,
+    or one of the results of an operator).
+
+    Attributes
+    ----------
+    name: str
+        The name identifying this step and its result.
+    func: Callable
+        The function, reader method or operator which the step calls.
+    args: Tuple
+        The positional arguments to call ``func`` with.
+    kwargs: Dict[str, Any]
+        The keyword arguments to call ``func`` with.
+    dependencies: Set[str]
+        The names of the steps whose results are needed for this one.
+
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.dependencies = {node.name for node in _find_nodes((args, kwargs))}
+
+    def __getitem__(self, key: Hashable) -> NodeItem:
+        return NodeItem(self, (key,))
+
+    def __repr__(self) -> str:
+        return f"Node({self.name!r})"
+
+
+def _find_nodes(value: Any) -> Iterator[Node]:
+    """Iterate through all of the steps referred to by an argument,
+    searching inside lists, tuples and dictionaries."""
+    if isinstance(value, Node):
+        yield value
+    elif isinstance(value, NodeItem):
+        yield value.node
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _find_nodes(item)
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _find_nodes(item)
+
+
+def _substitute(value: Any, results: Dict[str, Any]) -> Any:
+    """Replace all references to steps in an argument with their
+    results."""
+    if isinstance(value, Node):
+        return results[value.name]
+    elif isinstance(value, NodeItem):
+        return value._resolve(results)
+    elif isinstance(value, (list, tuple)):
+        return type(value)(_substitute(item, results) for item in value)
+    elif isinstance(value, dict):
+        return {key: _substitute(item, results) for key, item in value.items()}
+    return value
+
+
+def _owner(func: Callable[..., Any]) -> Any:
+    """The object whose state is used when calling ``func``: the object
+    for bound methods, or ``func`` itself for callable objects such as
+    operators. Plain functions and classes have no owner."""
+    if isinstance(func, MethodType):
+        return func.__self__
+    if isinstance(func, (FunctionType, BuiltinFunctionType, partial, type)):
+        return None
+    return func
+
+
+class Pipeline:
+    """A collection of steps, such as reading data, constructing an
+    :py:class:`indica.equilibrium.Equilibrium` and calling operators,
+    which depend on each other's results. Dependencies are inferred from
+    the arguments to each step, and steps which do not depend on each
+    other are run concurrently on a thread pool.
+
+    Each step calls the same objects with the same arguments as it would
+    if run serially, so provenance is recorded in the usual way. Steps
+    which call the same reader or operator object are never run at the
+    same time, as these keep information about the call in progress.
+
+    Example
+    -------
+    .. code-block:: python
+
+        pipeline = Pipeline()
+        efit = pipeline.add("efit", reader.get, "jetppf", "efit", 0)
+        sxr = pipeline.add("sxr", reader.get, "jetppf", "sxr", 0)
+        equilib = pipeline.add("equilibrium", Equilibrium, efit)
+        pipeline.add("set_equilibrium", set_equilibrium, sxr, equilib)
+        inversion = pipeline.add(
+            "inversion", inverter, R, z, t, sxr["v"], after=["set_equilibrium"]
+        )
+        results = pipeline.run(n_workers=4)
+        emissivity, emiss_fit, camera = results["inversion"]
+
+    """
+
+    def __init__(self):
+        self.nodes: Dict[str, Node] = {}
+        self._order: Dict[str, Set[str]] = {}
+
+    def add(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        *args: Any,
+        after: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> Node:
+        """Declare a step in the pipeline.
+
+        Parameters
+        ----------
+        name
+            A unique name for the step, used to identify its result.
+        func
+            The function, reader method, class or operator to call.
+        args
+            Positional arguments for ``func``. Any :py:class:`Node` (or item
+            of one) will be replaced by the corresponding result.
+        after
+            Names of steps which must be complete before this one starts,
+            even though their results are not used as arguments (e.g.,
+            because they modify data in place).
+        kwargs
+            Keyword arguments for ``func``, treated in the same way as
+            ``args``.
+
+        Returns
+        -------
+        :
+            The new step.
+
+        """
+        if name in self.nodes:
+            raise PipelineError(f"Pipeline already contains a step named '{name}'.")
+        node = Node(name, func, args, kwargs)
+        ordering = set(after or [])
+        for dependency in node.dependencies | ordering:
+            if dependency not in self.nodes:
+                raise PipelineError(
+                    f"Step '{name}' depends on '{dependency}', which is not part "
+                    "of this pipeline."
+                )
+        self.nodes[name] = node
+        self._order[name] = node.dependencies | ordering
+        return node
+
+    def dependencies(self, name: str) -> Set[str]:
+        """The names of the steps which must be complete before the step
+        ``name`` can start."""
+        return self._order[name]
+
+    def run(self, n_workers: Optional[int] = None) -> Dict[str, Any]:
+        """Run all steps in the pipeline, starting each as soon as the
+        steps it depends on are complete.
+
+        Parameters
+        ----------
+        n_workers
+            The maximum number of steps to run at once. Defaults to the
+            :py:class:`concurrent.futures.ThreadPoolExecutor` default.
+
+        Returns
+        -------
+        :
+            The result of each step, indexed by name.
+
+        """
+        results: Dict[str, Any] = {}
+        waiting = dict(self._order)
+        locks: Dict[int, threading.Lock] = {}
+        for node in self.nodes.values():
+            owner = _owner(node.func)
+            if owner is not None:
+                locks.setdefault(id(owner), threading.Lock())
+
+        def run_node(node: Node) -> Any:
+            args = _substitute(node.args, results)
+            kwargs = _substitute(node.kwargs, results)
+            owner = _owner(node.func)
+            if owner is None:
+                return node.func(*args, **kwargs)
+            with locks[id(owner)]:
+                return node.func(*args, **kwargs)
+
+        with ThreadPoolExecutor(n_workers) as executor:
+            running: Dict[Future, str] = {}
+
+            def submit_ready():
+                for name, dependencies in list(waiting.items()):
+                    if dependencies.issubset(results):
+                        del waiting[name]
+                        future = executor.submit(run_node, self.nodes[name])
+                        running[future] = name
+
+            submit_ready()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        for other in running:
+                            other.cancel()
+                        raise PipelineError(f"Step '{name}' failed.") from error
+                    results[name] = future.result()
+                submit_ready()
+        return results
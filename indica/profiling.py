@@ -0,0 +1,286 @@
+"""Tools for measuring where time and memory are spent when reading
+data, converting coordinates and running operators.
+
+"""
+
+from collections import defaultdict
+from contextlib import contextmanager
+import json
+import os
+import threading
+import time
+import tracemalloc
+from typing import Any
+from typing import DefaultDict
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+active_profiler: Optional["Profiler"] = None
+
+
+class Span:
+    """A timed section of code, e.g., a single call to an operator.
+
+    Attributes
+    ----------
+    name: str
+        What was being done.
+    category: str
+        The kind of activity (e.g., "operator", "reader" or "conversion").
+    thread: int
+        Identifier for the thread which executed this span.
+    start: float
+        Time at which the span started, in seconds since the profiler started.
+    end: Optional[float]
+        Time at which the span ended, in seconds since the profiler
+        started. None if it is still running.
+    counters: Dict[str, float]
+        Totals of any quantities recorded during this span, such as the
+        number of function evaluations used by a solver.
+    peak_memory: Optional[int]
+        The most memory allocated by Python during this span, in
+        bytes. Only available if the profiler is tracing memory.
+
+    """
+
+    def __init__(self, name: str, category: str, thread: int, start: float):
+        self.name = name
+        self.category = category
+        self.thread = thread
+        self.start = start
+        self.end: Optional[float] = None
+        self.counters: DefaultDict[str, float] = defaultdict(float)
+        self.peak_memory: Optional[int] = None
+
+    @property
+    def duration(self) -> float:
+        """The length of the span, in seconds."""
+        return (self.end if self.end is not None else self.start) - self.start
+
+
+class _NullContext:
+    """A context manager which does nothing, used when no profiler is
+    active so that instrumentation is cheap."""
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        return False
+
+
+_null_context = _NullContext()
+
+
+class Profiler:
+    """Collects timings for each reader call, coordinate conversion and
+    operator call made while it is active, along with counters recorded
+    by solvers and, optionally, peak memory use. Use it as a context
+    manager:
+
+    .. code-block:: python
+
+        with Profiler(memory=True) as profiler:
+            results = inverter(R, z, t, *cameras)
+        print(profiler.report())
+        profiler.to_chrome_trace("inversion.json")
+
+    Parameters
+    ----------
+    memory
+        Whether to trace memory allocations (using :py:mod:`tracemalloc`)
+        to find the peak memory use during each span. This slows
+        execution.
+    attach_provenance
+        Whether operators should add their timings, counters and peak
+        memory as attributes of the provenance activity for each call.
+
+    Attributes
+    ----------
+    spans: List[Span]
+        Every span which has been started while the profiler was active.
+
+    """
+
+    def __init__(self, memory: bool = False, attach_provenance: bool = False):
+        self.memory = memory
+        self.attach_provenance = attach_provenance
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._open: Dict[int, List[Span]] = defaultdict(list)
+        self._origin = time.perf_counter()
+        self._old_profiler: Optional[Profiler] = None
+        self._started_tracing = False
+
+    def __enter__(self) -> "Profiler":
+        global active_profiler
+        self._old_profiler = active_profiler
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        active_profiler = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        global active_profiler
+        active_profiler = self._old_profiler
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return False
+
+    def _update_peaks(self):
+        """Add the peak memory since the last update to every open span,
+        then start measuring a new peak."""
+        if not self.memory or not tracemalloc.is_tracing():
+            return
+        peak = tracemalloc.get_traced_memory()[1]
+        for spans in self._open.values():
+            for span in spans:
+                span.peak_memory = max(span.peak_memory or 0, peak)
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+
+    @contextmanager
+    def span(self, name: str, category: str) -> Iterator[Span]:
+        """Time the code executed within this context.
+
+        Parameters
+        ----------
+        name
+            What is being done.
+        category
+            The kind of activity.
+
+        """
+        thread = threading.get_ident()
+        with self._lock:
+            self._update_peaks()
+            new_span = Span(name, category, thread, time.perf_counter() - self._origin)
+            self.spans.append(new_span)
+            self._open[thread].append(new_span)
+        try:
+            yield new_span
+        finally:
+            with self._lock:
+                self._update_peaks()
+                new_span.end = time.perf_counter() - self._origin
+                self._open[thread].remove(new_span)
+
+    def current_span(self) -> Optional[Span]:
+        """The innermost span open in the current thread, if any."""
+        spans = self._open.get(threading.get_ident())
+        return spans[-1] if spans else None
+
+    def record(self, **counters: float):
+        """Add to the totals of counters for the innermost span open in
+        the current thread. Does nothing if there is no such span."""
+        span = self.current_span()
+        if span is None:
+            return
+        for key, value in counters.items():
+            span.counters[key] += value
+
+    def summary(self) -> Dict[Tuple[str, str], Dict[str, float]]:
+        """Aggregate statistics for the spans of each category and name:
+        number of calls, total, mean and maximum duration, peak memory and
+        the totals of any counters."""
+        result: Dict[Tuple[str, str], Dict[str, float]] = {}
+        for span in self.spans:
+            stats = result.setdefault(
+                (span.category, span.name),
+                {"calls": 0, "total": 0.0, "max": 0.0},
+            )
+            stats["calls"] += 1
+            stats["total"] += span.duration
+            stats["max"] = max(stats["max"], span.duration)
+            if span.peak_memory is not None:
+                stats["peak_memory"] = max(
+                    stats.get("peak_memory", 0), span.peak_memory
+                )
+            for key, value in span.counters.items():
+                stats[key] = stats.get(key, 0) + value
+        for stats in result.values():
+            stats["mean"] = stats["total"] / stats["calls"]
+        return result
+
+    def report(self) -> str:
+        """A table of the statistics from :py:meth:`summary`, sorted by
+        total time."""
+        lines = [
+            f"{'category':<12} {'name':<40} {'calls':>6} {'total/s':>10} "
+            f"{'mean/s':>10} {'max/s':>10} {'peak/MiB':>9}  counters"
+        ]
+        for (category, name), stats in sorted(
+            self.summary().items(), key=lambda item: -item[1]["total"]
+        ):
+            peak = stats.get("peak_memory")
+            counters = ", ".join(
+                f"{key}={value:g}"
+                for key, value in stats.items()
+                if key not in ("calls", "total", "mean", "max", "peak_memory")
+            )
+            lines.append(
+                f"{category:<12} {name:<40} {int(stats['calls']):>6} "
+                f"{stats['total']:>10.4f} {stats['mean']:>10.4f} "
+                f"{stats['max']:>10.4f} "
+                f"{'' if peak is None else format(peak / 2 ** 20, '.1f'):>9}  "
+                f"{counters}"
+            )
+        return "\n".join(lines)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """The spans in the Trace Event Format used by the Chrome browser's
+        ``about:tracing`` tool and by Perfetto."""
+        pid = os.getpid()
+        events = []
+        for span in self.spans:
+            args: Dict[str, Any] = dict(span.counters)
+            if span.peak_memory is not None:
+                args["peak_memory"] = span.peak_memory
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": span.start * 1e6,
+                    "dur": span.duration * 1e6,
+                    "pid": pid,
+                    "tid": span.thread,
+                    "args": args,
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def to_chrome_trace(self, filename: str):
+        """Write the spans to a JSON file in the Trace Event Format."""
+        with open(filename, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+def span(name: str, category: str):
+    """Time the code executed within this context using the active
+    profiler. If there is no active profiler then nothing is done.
+
+    Parameters
+    ----------
+    name
+        What is being done.
+    category
+        The kind of activity (e.g., "operator", "reader" or "conversion").
+
+    """
+    if active_profiler is None:
+        return _null_context
+    return active_profiler.span(name, category)
+
+
+def record(**counters: float):
+    """Add to counters (e.g., solver function evaluations) for the
+    innermost span of the active profiler in the current thread. If there
+    is no active profiler then nothing is done."""
+    if active_profiler is not None:
+        active_profiler.record(**counters)
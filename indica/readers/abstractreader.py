@@ -20,6 +20,7 @@ from xarray import DataArray
 
 from .selectors import choose_on_plot
 from .selectors import DataSelector
+from .. import profiling
 from ..abstractio import BaseIO
 from ..converters import FluxSurfaceCoordinates
 from ..converters import LinesOfSightTransform
@@ -203,7 +204,8 @@ class DataReader(BaseIO):
         method = getattr(self, self.DDA_METHODS[instrument])
         if not quantities:
             quantities = set(self.available_quantities(instrument))
-        return method(uid, instrument, revision, quantities)
+        with profiling.span(f"{self.__class__.__name__}.get({instrument})", "reader"):
+            return method(uid, instrument, revision, quantities)
 
     def get_thomson_scattering(
         self,
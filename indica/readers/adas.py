@@ -1,10 +1,22 @@
 """Base class for reading in ADAS atomic data."""
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import datetime
+import hashlib
+import json
+import os
 from pathlib import Path
 import re
+import threading
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
 from typing import Literal
+from typing import Optional
 from typing import TextIO
+from typing import Tuple
 from typing import Union
 from urllib.request import pathname2url
 from urllib.request import urlretrieve
@@ -24,6 +36,14 @@ from ..datatypes import ORDERED_ELEMENTS
 DEFAULT_PATH = Path("")
 CACHE_DIR = ".indica"
 
+#: The maximum number of parsed files to keep in memory.
+MAX_PARSED_FILES = 32
+
+ParsedFile = Tuple[np.ndarray, Dict[str, Any]]
+
+_parsed_files: "OrderedDict[Tuple[str, str, int, int], ParsedFile]" = OrderedDict()
+_parsed_files_lock = threading.Lock()
+
 
 class ADASReader(BaseIO):
     """Class for reading atomic data from ADAS files.
@@ -37,6 +57,11 @@ class ADASReader(BaseIO):
     session: session.Session
         An object representing the session being run. Contains information
         such as provenance data.
+    cache: bool
+        Whether to store the contents of each file once parsed, in binary
+        form in your home directory, so that later reads of an unchanged
+        file do not need to parse it again. Recently read files are also
+        kept in memory.
 
     """
 
@@ -44,9 +69,13 @@ class ADASReader(BaseIO):
         self,
         path: Union[str, Path] = DEFAULT_PATH,
         sess: session.Session = session.global_session,
+        cache: bool = True,
     ):
         path = Path(path)
         self.session = sess
+        self.cache_path: Optional[Path] = (
+            Path.home() / CACHE_DIR / self.__class__.__name__ if cache else None
+        )
         self.openadas = path == DEFAULT_PATH
         if path == DEFAULT_PATH:
             self.namespace = "openadas"
@@ -60,6 +89,7 @@ class ADASReader(BaseIO):
             self.session.prov.add_namespace(
                 self.namespace, "file:/" + str(self.path.resolve())
             )
+        self._prov_lock = threading.Lock()
         self.prov_id = session.hash_vals(path=self.path)
         self.agent = self.session.prov.agent(self.prov_id)
         self.session.prov.delegation(self.session.agent, self.agent)
@@ -101,61 +131,85 @@ class ADASReader(BaseIO):
         file_component = f"{quantity}{year}"
         filename = Path(file_component) / f"{file_component}_{element.lower()}.dat"
         with self._get_file("adf11", filename) as f:
-            header = f.readline().split()
-            z = int(header[0])
-            nd = int(header[1])
-            nt = int(header[2])
-            zmin = int(header[3]) - 1
-            zmax = int(header[4]) - 1
-            element_name = header[5][1:].lower()
-            assert ORDERED_ELEMENTS.index(element_name) == z
-            f.readline()
-            densities = np.fromfile(f, float, nd, " ")
-            temperatures = np.fromfile(f, float, nt, " ")
-            data = np.empty((zmax - zmin + 1, nt, nd))
-            date = datetime.date.min
-            for i in range(zmax - zmin + 1):
-                section_header = f.readline()
-                m = re.search(r"Z1=\s*(\d+)", section_header, re.I)
-                assert isinstance(m, re.Match)
-                assert int(m.group(1)) - 1 == zmin + i
-                m = re.search(
-                    r"DATE=\s*(\d?\d)[.\-/](\d\d)[.\-/](\d\d)", section_header, re.I
-                )
-                assert isinstance(m, re.Match)
-                short_year = int(m.group(3))
-                parsed_year = short_year + (
-                    1900 if short_year >= now.year % 100 else 2000
-                )
-                new_date = datetime.date(parsed_year, int(m.group(2)), int(m.group(1)))
-                if new_date > date:
-                    date = new_date
-                data[i, ...] = np.fromfile(f, float, nd * nt, " ").reshape((nt, nd))
+            data, metadata = self._parse_cached(f, "adf11", self._parse_adf11)
         gen_type = ADF11_GENERAL_DATATYPES[quantity]
-        spec_type = ORDERED_ELEMENTS[z]
+        spec_type = ORDERED_ELEMENTS[metadata["z"]]
         name = f"log10_{spec_type}_{gen_type}"
         attrs = {
             "datatype": (gen_type, spec_type),
-            "date": date,
+            "date": datetime.date.fromisoformat(metadata["date"]),
             "provenance": self.create_provenance(filename, now),
         }
         return DataArray(
-            data - 6,
+            data,
             coords=[
-                ("ion_charges", np.arange(zmin, zmax + 1, dtype=int)),
-                ("log10_electron_temperature", temperatures),
-                ("log10_electron_density", densities + 6),
+                ("ion_charges", np.asarray(metadata["ion_charges"], dtype=int)),
+                ("log10_electron_temperature", metadata["temperatures"]),
+                ("log10_electron_density", metadata["densities"]),
             ],
             name=name,
             attrs=attrs,
         )
 
+    def _parse_adf11(self, f: TextIO) -> ParsedFile:
+        """Parse the contents of an ADF11 file.
+
+        Returns
+        -------
+        data
+            Log10 of the rate coefficients in SI units, with dimensions
+            charge state, temperature and density.
+        metadata
+            The atomic number, charge states, log10 temperatures, log10
+            densities (SI units) and date of the data.
+
+        """
+        now = datetime.datetime.now()
+        header = f.readline().split()
+        z = int(header[0])
+        nd = int(header[1])
+        nt = int(header[2])
+        zmin = int(header[3]) - 1
+        zmax = int(header[4]) - 1
+        element_name = header[5][1:].lower()
+        assert ORDERED_ELEMENTS.index(element_name) == z
+        f.readline()
+        densities = np.fromfile(f, float, nd, " ")
+        temperatures = np.fromfile(f, float, nt, " ")
+        data = np.empty((zmax - zmin + 1, nt, nd))
+        date = datetime.date.min
+        for i in range(zmax - zmin + 1):
+            section_header = f.readline()
+            m = re.search(r"Z1=\s*(\d+)", section_header, re.I)
+            assert isinstance(m, re.Match)
+            assert int(m.group(1)) - 1 == zmin + i
+            m = re.search(
+                r"DATE=\s*(\d?\d)[.\-/](\d\d)[.\-/](\d\d)", section_header, re.I
+            )
+            assert isinstance(m, re.Match)
+            short_year = int(m.group(3))
+            parsed_year = short_year + (1900 if short_year >= now.year % 100 else 2000)
+            new_date = datetime.date(parsed_year, int(m.group(2)), int(m.group(1)))
+            if new_date > date:
+                date = new_date
+            data[i, ...] = np.fromfile(f, float, nd * nt, " ").reshape((nt, nd))
+        metadata = {
+            "z": z,
+            "ion_charges": list(range(zmin, zmax + 1)),
+            "temperatures": temperatures.tolist(),
+            "densities": (densities + 6).tolist(),
+            "date": date.isoformat(),
+        }
+        return data - 6, metadata
+
     def get_adf15(
         self,
         element: str,
         charge: str,
         filetype: str,
         year="",
+        transition: Optional[str] = None,
+        wavelength: Optional[float] = None,
     ) -> DataArray:
         """Read data from the specified ADAS file. Different files are available, e.g.:
 
@@ -175,7 +229,14 @@ class ADASReader(BaseIO):
         year
             The two-digit year label for the data. = "transport" if special
             transport path
-
+        transition
+            If present, only read data for transitions with this label
+            (e.g., "n=5-n=4"). Only the data for the selected transitions
+            is parsed, using an index of the file which is built the first
+            time a selection is made.
+        wavelength
+            If present, only read data for the transitions with the
+            wavelength (in Angstroms) closest to this.
 
         Returns
         -------
@@ -196,109 +257,17 @@ class ADASReader(BaseIO):
             f"[{element.lower()}{charge.lower()}.dat"
         )
         with self._get_file("adf15", filename) as f:
-            header = f.readline().strip().lower()
-            header_match = [
-                r"(\d+).+/(\S+).*\:(.*)photon",
-                r"(\d+).+/(\S+).*\+(.*)photon",
-            ]
-            for match in header_match:
-                m = re.search(match, header, re.I)
-                if isinstance(m, re.Match):
-                    break
-            assert isinstance(m, re.Match)
-            ntrans = int(m.group(1))
-            element_name = m.group(2).strip().lower()
-            charge_state = int(m.group(3))
-            assert element_name == element.lower()
-            try:
-                assert charge_state == int(charge)
-            except ValueError:
-                m = re.search(r"(\d+)(\S+)", charge, re.I)
-                charge_tmp = m.group(1)
-                assert charge_state == int(charge_tmp)
-
-            # Read first section header to build arrays outside of reading loop
-            section_header_match_tmp = [
-                r"(\d+.\d+)\s+(\d+)\s+(\d+).+type=(\S+)/.+/isel.+=\s+(\d+)",
-                r"(\d+.\d)\s?\S?\s+(\d+)\s+(\d+).+type\s?=\s?(\S+).+isel\s?=\s+(\d+)",
-            ]
-            while True:
-                section_header = f.readline().strip().lower()
-                for match in section_header_match_tmp:
-                    m = re.search(match, section_header, re.I)
-                    if isinstance(m, re.Match):
-                        section_header_match = match
-                        break
-                if isinstance(m, re.Match):
-                    break
-
-            assert isinstance(m, re.Match)
-            nd = int(m.group(2))
-            nt = int(m.group(3))
-            data = np.empty((ntrans, nt, nd))
-            ttype = [""] * ntrans
-            tindex = np.empty(ntrans)
-            wavelength = np.empty(ntrans)
-
-            # Read Photon Emissivity Coefficient rates
-            for i in range(ntrans):
-                if i > 0:
-                    section_header = f.readline().strip().lower()
-                m = re.search(section_header_match, section_header, re.I)
-                assert isinstance(m, re.Match)
-                assert int(m.group(5)) - 1 == i
-                tindex[i] = i + 1
-                ttype[i] = m.group(4)
-                wavelength[i] = float(m.group(1))  # (Angstroms)
-                densities = np.fromfile(f, float, nd, " ")
-                temperatures = np.fromfile(f, float, nt, " ")
-                data[i, ...] = np.fromfile(f, float, nd * nt, " ").reshape((nt, nd))
-
-            # Read Transition information from end of file
-            transition_header_match = r"c\s+[isel].+\s+[transition].+\s+[type]"
-            while True:
-                tmp = f.readline().strip().lower()
-                m = re.search(transition_header_match, tmp, re.I)
-                if isinstance(m, re.Match):
-                    break
-            f.readline().strip().lower()
-
-            trans_match = [
-                (
-                    r"c\s+(\d+.)"  # isel
-                    r"\s+(\d+.\d+)"  # wavelength
-                    r"\s+(\d+)(\(\d\)\d\(.+\d?.\d\))-"  # transition upper level
-                    r".+(\d+)(\(\d\)\d\(.+\d?.\d\))"  # transition lower level
-                ),
-                r"c\s+(\d+.)\s+(\d+.\d+)\s+([n]\=.\d+.-.[n]\=.\d+)",
-            ]
-            while True:
-                tmp = f.readline().strip().lower()
-
-                for match in trans_match:
-                    m = re.search(match, tmp, re.I)
-                    if isinstance(m, re.Match):
-                        trans_match = match
-                        break
-                if isinstance(m, re.Match):
-                    break
-
-            if len(tmp.split(")")) > 3:
-                orbitals = True
+            if transition is None and wavelength is None:
+                data, metadata = self._parse_cached(f, "adf15", self._parse_adf15)
             else:
-                orbitals = False
-
-            transition = []
-            for i in tindex:
-                if i > 1:
-                    tmp = f.readline().strip().lower()
-                m = re.search(trans_match, tmp, re.I)
-                assert isinstance(m, re.Match)
-                assert int(m.group(1)[:-1]) == i
-                if orbitals:
-                    transition.append(f"{m.group(4)}-{m.group(6)}".replace(" ", ""))
-                else:
-                    transition.append(m.group(3).replace(" ", ""))
+                data, metadata = self._read_adf15_transitions(f, transition, wavelength)
+        assert metadata["element"] == element.lower()
+        try:
+            assert metadata["charge"] == int(charge)
+        except ValueError:
+            m = re.search(r"(\d+)(\S+)", charge, re.I)
+            charge_tmp = m.group(1)
+            assert metadata["charge"] == int(charge_tmp)
 
         gen_type = ADF15_GENERAL_DATATYPES[filetype]
         spec_type = element
@@ -308,35 +277,301 @@ class ADASReader(BaseIO):
             "provenance": self.create_provenance(filename, now),
         }
 
-        if nd == nt:
+        if metadata["density_first"]:
             coords = [
-                ("index", tindex),
-                ("electron_density", densities * 10 ** 6),  # m**-3
-                ("electron_temperature", temperatures),  # eV
+                ("index", metadata["index"]),
+                ("electron_density", metadata["densities"]),  # m**-3
+                ("electron_temperature", metadata["temperatures"]),  # eV
             ]
         else:
             coords = [
-                ("index", tindex),
-                ("electron_temperature", temperatures),  # eV
-                ("electron_density", densities * 10 ** 6),  # m**-3
+                ("index", metadata["index"]),
+                ("electron_temperature", metadata["temperatures"]),  # eV
+                ("electron_density", metadata["densities"]),  # m**-3
             ]
 
         pecs = DataArray(
-            data * 10 ** -6,
+            data,
             coords=coords,
             name=name,
             attrs=attrs,
         )
 
         # Add extra dimensions attached to index
-        pecs = pecs.assign_coords(wavelength=("index", wavelength))  # (A)
+        pecs = pecs.assign_coords(wavelength=("index", metadata["wavelength"]))  # (A)
         pecs = pecs.assign_coords(
-            transition=("index", transition)
+            transition=("index", metadata["transition"])
         )  # (2S+1)L(w-1/2)-(2S+1)L(w-1/2) of upper-lower levels, no blank spaces
-        pecs = pecs.assign_coords(type=("index", ttype))  # (excit, recomb, cx)
+        pecs = pecs.assign_coords(
+            type=("index", metadata["type"])
+        )  # (excit, recomb, cx)
 
         return pecs
 
+    def _parse_adf15(self, f: TextIO) -> ParsedFile:
+        """Parse the contents of an ADF15 file.
+
+        Returns
+        -------
+        data
+            The photon emissivity coefficients in SI units. Dimensions are
+            transition, followed by temperature and density in the order
+            indicated by the metadata.
+        metadata
+            As returned by :py:meth:`_index_adf15`, plus the temperatures
+            and densities (SI units) of the data.
+
+        """
+        offsets, metadata = self._index_adf15(f)
+        data, temperatures, densities = self._read_adf15_blocks(
+            f, offsets, metadata["nd"], metadata["nt"]
+        )
+        metadata["temperatures"] = temperatures.tolist()
+        metadata["densities"] = densities.tolist()
+        return data, metadata
+
+    def _index_adf15(self, f: TextIO) -> ParsedFile:
+        """Find where the data for each transition is in an ADF15 file,
+        without parsing the data itself.
+
+        Returns
+        -------
+        offsets
+            The position in the file of the header of the data block for
+            each transition.
+        metadata
+            The element and charge state the file is for; the index,
+            wavelength, type and label of each transition; the number of
+            densities and temperatures in each block and whether the
+            densities come first.
+
+        """
+        header = f.readline().strip().lower()
+        header_match = [
+            r"(\d+).+/(\S+).*\:(.*)photon",
+            r"(\d+).+/(\S+).*\+(.*)photon",
+        ]
+        for match in header_match:
+            m = re.search(match, header, re.I)
+            if isinstance(m, re.Match):
+                break
+        assert isinstance(m, re.Match)
+        ntrans = int(m.group(1))
+        element_name = m.group(2).strip().lower()
+        charge_state = int(m.group(3))
+
+        # Find section headers, skipping the data between them
+        section_header_match = [
+            r"(\d+.\d+)\s+(\d+)\s+(\d+).+type=(\S+)/.+/isel.+=\s+(\d+)",
+            r"(\d+.\d)\s?\S?\s+(\d+)\s+(\d+).+type\s?=\s?(\S+).+isel\s?=\s+(\d+)",
+        ]
+        offsets = np.empty(ntrans, dtype=np.int64)
+        ttype = [""] * ntrans
+        tindex = np.empty(ntrans)
+        wavelength = np.empty(ntrans)
+        i = 0
+        while i < ntrans:
+            offset = f.tell()
+            section_header = f.readline()
+            assert section_header != ""
+            section_header = section_header.strip().lower()
+            if "isel" not in section_header:
+                continue
+            for match in section_header_match:
+                m = re.search(match, section_header, re.I)
+                if isinstance(m, re.Match):
+                    break
+            else:
+                continue
+            assert int(m.group(5)) - 1 == i
+            if i == 0:
+                nd = int(m.group(2))
+                nt = int(m.group(3))
+            assert (int(m.group(2)), int(m.group(3))) == (nd, nt)
+            offsets[i] = offset
+            tindex[i] = i + 1
+            ttype[i] = m.group(4)
+            wavelength[i] = float(m.group(1))  # (Angstroms)
+            i += 1
+
+        # Read Transition information from end of file
+        transition_header_match = r"c\s+[isel].+\s+[transition].+\s+[type]"
+        while True:
+            tmp = f.readline().strip().lower()
+            m = re.search(transition_header_match, tmp, re.I)
+            if isinstance(m, re.Match):
+                break
+        f.readline().strip().lower()
+
+        trans_match = [
+            (
+                r"c\s+(\d+.)"  # isel
+                r"\s+(\d+.\d+)"  # wavelength
+                r"\s+(\d+)(\(\d\)\d\(.+\d?.\d\))-"  # transition upper level
+                r".+(\d+)(\(\d\)\d\(.+\d?.\d\))"  # transition lower level
+            ),
+            r"c\s+(\d+.)\s+(\d+.\d+)\s+([n]\=.\d+.-.[n]\=.\d+)",
+        ]
+        while True:
+            tmp = f.readline().strip().lower()
+
+            for match in trans_match:
+                m = re.search(match, tmp, re.I)
+                if isinstance(m, re.Match):
+                    trans_match = match
+                    break
+            if isinstance(m, re.Match):
+                break
+
+        if len(tmp.split(")")) > 3:
+            orbitals = True
+        else:
+            orbitals = False
+
+        transition = []
+        for i in tindex:
+            if i > 1:
+                tmp = f.readline().strip().lower()
+            m = re.search(trans_match, tmp, re.I)
+            assert isinstance(m, re.Match)
+            assert int(m.group(1)[:-1]) == i
+            if orbitals:
+                transition.append(f"{m.group(4)}-{m.group(6)}".replace(" ", ""))
+            else:
+                transition.append(m.group(3).replace(" ", ""))
+
+        return offsets, {
+            "element": element_name,
+            "charge": charge_state,
+            "index": tindex.tolist(),
+            "wavelength": wavelength.tolist(),
+            "type": ttype,
+            "transition": transition,
+            "nd": nd,
+            "nt": nt,
+            "density_first": nd == nt,
+        }
+
+    def _read_adf15_blocks(
+        self, f: TextIO, offsets: np.ndarray, nd: int, nt: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Parse the data blocks for some transitions in an ADF15 file.
+
+        Parameters
+        ----------
+        f
+            The open ADF15 file.
+        offsets
+            The position in the file of the header of each block to read,
+            as found by :py:meth:`_index_adf15`.
+        nd
+            The number of densities in each block.
+        nt
+            The number of temperatures in each block.
+
+        Returns
+        -------
+        data
+            The photon emissivity coefficients in SI units.
+        temperatures
+            The temperatures (eV) of the data.
+        densities
+            The densities (m^-3) of the data.
+
+        """
+        data = np.empty((len(offsets), nt, nd))
+        densities = np.empty(nd)
+        temperatures = np.empty(nt)
+        for i, offset in enumerate(offsets):
+            f.seek(int(offset))
+            f.readline()
+            densities = np.fromfile(f, float, nd, " ")
+            temperatures = np.fromfile(f, float, nt, " ")
+            data[i, ...] = np.fromfile(f, float, nd * nt, " ").reshape((nt, nd))
+        return data * 10 ** -6, temperatures, densities * 10 ** 6
+
+    def _read_adf15_transitions(
+        self, f: TextIO, transition: Optional[str], wavelength: Optional[float]
+    ) -> ParsedFile:
+        """Parse the data for the selected transitions in an ADF15 file,
+        using an index of the file.
+
+        Parameters
+        ----------
+        f
+            The open ADF15 file.
+        transition
+            If present, select transitions with this label.
+        wavelength
+            If present, select the transitions with the wavelength closest
+            to this.
+
+        Returns
+        -------
+        :
+            The data and metadata for the selected transitions, in the
+            form returned by :py:meth:`_parse_adf15`.
+
+        """
+        offsets, index = self._parse_cached(f, "adf15_index", self._index_adf15)
+        selected = np.arange(len(offsets))
+        if transition is not None:
+            labels = np.asarray(index["transition"])
+            selected = selected[labels == transition.replace(" ", "").lower()]
+        if wavelength is not None and len(selected) > 0:
+            distance = np.abs(np.asarray(index["wavelength"])[selected] - wavelength)
+            selected = selected[distance == distance.min()]
+        if len(selected) == 0:
+            raise ValueError(f"No transition '{transition}' in ADF15 file {f.name}.")
+        data, temperatures, densities = self._read_adf15_blocks(
+            f, offsets[selected], index["nd"], index["nt"]
+        )
+        metadata = dict(index)
+        for key in ("index", "wavelength", "type", "transition"):
+            metadata[key] = [index[key][i] for i in selected]
+        metadata["temperatures"] = temperatures.tolist()
+        metadata["densities"] = densities.tolist()
+        return data, metadata
+
+    def get_many(
+        self,
+        adf11: Iterable[Tuple[str, str, str]] = (),
+        adf15: Iterable[Tuple[str, str, str, str]] = (),
+        n_workers: Optional[int] = None,
+    ) -> Dict[Tuple[str, ...], DataArray]:
+        """Read a set of ADAS files concurrently, downloading them from
+        OpenADAS if necessary. This is much faster than reading them one
+        at a time when many files are needed (e.g., all of the ADF11 data
+        for several impurities).
+
+        Parameters
+        ----------
+        adf11
+            The ADF11 files to read, each given as the arguments to
+            :py:meth:`get_adf11`: ``(quantity, element, year)``.
+        adf15
+            The ADF15 files to read, each given as the arguments to
+            :py:meth:`get_adf15`: ``(element, charge, filetype, year)``.
+        n_workers
+            The maximum number of files to read at once. Defaults to the
+            :py:class:`concurrent.futures.ThreadPoolExecutor` default.
+
+        Returns
+        -------
+        :
+            The data from each file, indexed by the tuple used to specify
+            it. Each has its own provenance, as if read individually.
+
+        """
+        adf11 = list(dict.fromkeys(adf11))
+        adf15 = list(dict.fromkeys(adf15))
+        with ThreadPoolExecutor(n_workers) as executor:
+            futures = {
+                **{key: executor.submit(self.get_adf11, *key) for key in adf11},
+                **{key: executor.submit(self.get_adf15, *key) for key in adf15},
+            }
+            return {key: future.result() for key, future in futures.items()}
+
     def create_provenance(
         self, filename: Path, start_time: datetime.datetime
     ) -> prov.ProvEntity:
@@ -349,22 +584,25 @@ class ADASReader(BaseIO):
 
         """
         end_time = datetime.datetime.now()
-        entity = self.session.prov.entity(
-            session.hash_vals(filename=filename, start_time=start_time)
-        )
-        activity = self.session.prov.activity(
-            session.hash_vals(agent=self.prov_id, date=start_time),
-            start_time,
-            end_time,
-            {prov.PROV_TYPE: "ReadData"},
-        )
-        self.session.prov.association(activity, self.agent)
-        self.session.prov.association(activity, self.session.agent)
-        self.session.prov.communication(activity, self.session.session)
-        self.session.prov.derivation(entity, f"{self.namespace}:{filename}", activity)
-        self.session.prov.generation(entity, activity, end_time)
-        self.session.prov.attribution(entity, self.agent)
-        self.session.prov.attribution(entity, self.session.agent)
+        with self._prov_lock:
+            entity = self.session.prov.entity(
+                session.hash_vals(filename=filename, start_time=start_time)
+            )
+            activity = self.session.prov.activity(
+                session.hash_vals(agent=self.prov_id, date=start_time),
+                start_time,
+                end_time,
+                {prov.PROV_TYPE: "ReadData"},
+            )
+            self.session.prov.association(activity, self.agent)
+            self.session.prov.association(activity, self.session.agent)
+            self.session.prov.communication(activity, self.session.session)
+            self.session.prov.derivation(
+                entity, f"{self.namespace}:{filename}", activity
+            )
+            self.session.prov.generation(entity, activity, end_time)
+            self.session.prov.attribution(entity, self.agent)
+            self.session.prov.attribution(entity, self.session.agent)
         return entity
 
     def _get_file(self, dataclass: str, filename: Union[str, Path]) -> TextIO:
@@ -392,7 +630,94 @@ class ADASReader(BaseIO):
             )
         return filepath.open("r")
 
+    def _parse_cached(
+        self, f: TextIO, kind: str, parser: Callable[[TextIO], ParsedFile]
+    ) -> ParsedFile:
+        """Parse an ADAS file, reusing the results from when it was
+        previously parsed if the file has not changed since.
+
+        Parameters
+        ----------
+        f
+            The open ADAS file.
+        kind
+            Label for what is being parsed from the file (e.g., "adf11" for
+            the full contents of an ADF11 file).
+        parser
+            Function to parse the contents of the file.
+
+        Returns
+        -------
+        :
+            The data array (which is read-only) and metadata returned by
+            ``parser``.
+
+        """
+        if self.cache_path is None or not isinstance(f.name, str):
+            return parser(f)
+        stats = os.fstat(f.fileno())
+        path = str(Path(f.name).resolve())
+        key = (path, stats.st_mtime_ns, stats.st_size)
+        with _parsed_files_lock:
+            if (kind,) + key in _parsed_files:
+                _parsed_files.move_to_end((kind,) + key)
+                return _parsed_files[(kind,) + key]
+        cache_file = (
+            self.cache_path / f"{kind}_{hashlib.sha256(path.encode()).hexdigest()}"
+        )
+        parsed = _read_parsed(cache_file, key)
+        if parsed is None:
+            parsed = parser(f)
+            parsed[0].setflags(write=False)
+            _write_parsed(cache_file, key, parsed)
+        with _parsed_files_lock:
+            _parsed_files[(kind,) + key] = parsed
+            while len(_parsed_files) > MAX_PARSED_FILES:
+                _parsed_files.popitem(last=False)
+        return parsed
+
     @property
     def requires_authentication(self) -> Literal[False]:
         """Reading ADAS data never requires authentication."""
         return False
+
+
+def _read_parsed(cache_file: Path, key: Tuple[str, int, int]) -> Optional[ParsedFile]:
+    """Load the parsed contents of an ADAS file from the binary cache,
+    memory-mapping the data. Returns None if they have not been cached or
+    were cached from a different version of the file.
+
+    """
+    try:
+        with cache_file.with_suffix(".json").open("r") as f:
+            header = json.load(f)
+        if header["file"] != list(key):
+            return None
+        data = np.load(cache_file.with_suffix(".npy"), "r", allow_pickle=False)
+    except (OSError, ValueError, KeyError):
+        return None
+    if list(data.shape) != header["shape"]:
+        return None
+    return data, header["metadata"]
+
+
+def _write_parsed(cache_file: Path, key: Tuple[str, int, int], parsed: ParsedFile):
+    """Store the parsed contents of an ADAS file in the binary cache. The
+    data is written before the header, so an incomplete write is never
+    mistaken for a valid cache. Failure to write is ignored, as the cache
+    only saves time.
+
+    """
+    data, metadata = parsed
+    header = {"file": list(key), "shape": list(data.shape), "metadata": metadata}
+    temporary = f".{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(str(cache_file) + temporary, "wb") as f:
+            np.save(f, data, allow_pickle=False)
+        os.replace(str(cache_file) + temporary, cache_file.with_suffix(".npy"))
+        with open(str(cache_file) + temporary, "w") as f:
+            json.dump(header, f)
+        os.replace(str(cache_file) + temporary, cache_file.with_suffix(".json"))
+    except OSError:
+        pass
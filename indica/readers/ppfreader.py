@@ -5,7 +5,6 @@ reading PPF data produced by JET.
 
 from numbers import Number
 from pathlib import Path
-import pickle
 import stat
 from typing import Any
 from typing import cast
@@ -17,6 +16,7 @@ from typing import Tuple
 from typing import Union
 import warnings
 
+import netCDF4
 import numpy as np
 from sal.client import SALClient
 from sal.core.exception import AuthenticationFailed
@@ -36,6 +36,9 @@ from ..utilities import to_filename
 
 SURF_PATH = Path(surf_los.__file__).parent / "surf_los.dat"
 
+#: The zlib compression level for arrays in the cache. Zero disables compression.
+CACHE_COMPRESSION_LEVEL = 4
+
 
 class PPFError(Exception):
     """An exception which occurs when trying to read PPF data which would
@@ -156,6 +159,8 @@ class PPFReader(DataReader):
         self._client = SALClient(server)
         self._client.prompt_for_password = False
         self._default_error = default_error
+        self._cache: Optional[netCDF4.Dataset] = None
+        self._cache_failed = False
 
     def get_sal_path(
         self, uid: str, instrument: str, quantity: str, revision: int
@@ -178,58 +183,98 @@ class PPFReader(DataReader):
             quantity,
             info.revision_current,
         )
-        cache_path = self._sal_path_to_file(path)
-        data = self._read_cached_ppf(cache_path)
+        data = self._read_cached_ppf(path)
         if data is None:
             data = self._client.get(path)
-            self._write_cached_ppf(cache_path, data)
+            self._write_cached_ppf(path, data)
         return data, path
 
-    def _read_cached_ppf(self, path: Path) -> Optional[Signal]:
+    def _open_cache(self) -> Optional[netCDF4.Dataset]:
+        """Open the file in which all PPF data cached for this pulse is
+        stored, creating it if necessary. It is kept open until the reader
+        is closed.
+
+        """
+        if self._cache is not None or self._cache_failed:
+            return self._cache
+        path = self._cache_file()
+        self._cache_failed = True
+        if path.exists():
+            permissions = stat.filemode(path.stat().st_mode)
+            if permissions[5] == "w" or permissions[8] == "w":
+                warnings.warn(
+                    "Can not open cache file which is writeable by anyone other "
+                    "than the user. (Security risk.)",
+                    PPFWarning,
+                )
+                return None
+        try:
+            if path.exists():
+                self._cache = netCDF4.Dataset(path, "a")
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                self._cache = netCDF4.Dataset(path, "w")
+                path.chmod(0o644)
+        except OSError:
+            warnings.warn(
+                f"Error opening cache file {path}. (Possible data corruption.)",
+                PPFWarning,
+            )
+            return None
+        self._cache_failed = False
+        return self._cache
+
+    def _read_cached_ppf(self, sal_path: str) -> Optional[Signal]:
         """Check if the PPF data specified by `sal_path` has been cached and,
         if so, load it.
 
         """
-        if not path.exists():
+        cache = self._open_cache()
+        if cache is None:
+            return None
+        try:
+            group = cache[sal_path]
+        except (IndexError, KeyError):
             return None
-        permissions = stat.filemode(path.stat().st_mode)
-        if permissions[5] == "w" or permissions[8] == "w":
+        try:
+            return Signal.from_dict(_read_group(group))
+        except (AttributeError, KeyError, TypeError, ValueError):
             warnings.warn(
-                "Can not open cache file which is writeable by anyone other than "
-                "the user. (Security risk.)",
+                f"Error reading {sal_path} from cache file. (Possible data "
+                "corruption.)",
                 PPFWarning,
             )
             return None
-        with path.open("rb") as f:
-            try:
-                return pickle.load(f)
-            except pickle.UnpicklingError:
-                warnings.warn(
-                    f"Error unpickling cache file {path}. (Possible data corruption.)",
-                    PPFWarning,
-                )
-                return None
 
-    def _write_cached_ppf(self, path: Path, data: Signal):
+    def _write_cached_ppf(self, sal_path: str, data: Signal):
         """Write the given signal, fetched from `sal_path`, to the disk for
         later reuse.
 
         """
-        path.parent.mkdir(parents=True, exist_ok=True)
-        with path.open("wb") as f:
-            pickle.dump(data, f)
-        path.chmod(0o644)
-
-    def _sal_path_to_file(self, sal_path: str) -> Path:
-        """Get the file path which would be used to cache data from the given
-        `sal_path`.
-
-        """
+        cache = self._open_cache()
+        if cache is None:
+            return
+        parent_path, name = sal_path.rsplit("/", 1)
+        try:
+            parent = cache.createGroup(parent_path) if parent_path else cache
+            # Write to a temporary group and only give it the name which is
+            # read once it is complete. Groups can not be deleted from a
+            # netCDF file, so one left by a failed write is reused by the
+            # next attempt rather than adding another.
+            partial = f"{name}.partial"
+            _write_group(parent.createGroup(partial), data.to_dict())
+            parent.renameGroup(partial, name)
+            cache.sync()
+        except (OSError, RuntimeError, TypeError, ValueError):
+            warnings.warn(f"Error writing {sal_path} to cache file.", PPFWarning)
+
+    def _cache_file(self) -> Path:
+        """Get the path of the file used to cache data for this pulse."""
         return (
             Path.home()
             / CACHE_DIR
             / self.__class__.__name__
-            / to_filename(self._reader_cache_id + sal_path + ".pkl")
+            / to_filename(self._reader_cache_id + ".nc")
         )
 
     def _get_charge_exchange(
@@ -562,6 +607,9 @@ class PPFReader(DataReader):
         """Ends connection to the SAL server from which PPF data is being
         read."""
         del self._client
+        if self._cache is not None:
+            self._cache.close()
+            self._cache = None
 
     @property
     def requires_authentication(self):
@@ -599,3 +647,81 @@ class PPFReader(DataReader):
             return True
         except AuthenticationFailed:
             return False
+
+
+def _write_group(group: netCDF4.Group, values: Dict[str, Any]):
+    """Store a dictionary, such as the serialised form of a SAL data object,
+    in a netCDF group. Nested dictionaries become subgroups, arrays become
+    (compressed) variables, with arrays of strings stored as variable-length
+    strings, and everything else becomes an attribute. Dimensions and
+    variables already in the group, left by an earlier attempt to write the
+    same data, are overwritten."""
+    null_keys = []
+    bool_keys = []
+    for key, value in values.items():
+        if isinstance(value, dict):
+            _write_group(group.createGroup(key), value)
+        elif isinstance(value, np.ndarray):
+            is_bool = value.dtype == bool
+            dims = tuple(f"{key}_{i}" for i in range(value.ndim))
+            for name, size in zip(dims, value.shape):
+                if name not in group.dimensions:
+                    group.createDimension(name, size)
+            if key in group.variables:
+                variable = group.variables[key]
+            elif value.dtype.kind in "SU":
+                # Variable-length strings can not be compressed
+                variable = group.createVariable(key, str, dims)
+                value = value.astype(str).astype(object)
+            else:
+                variable = group.createVariable(
+                    key,
+                    np.uint8 if is_bool else value.dtype,
+                    dims,
+                    zlib=CACHE_COMPRESSION_LEVEL > 0 and value.ndim > 0,
+                    complevel=max(CACHE_COMPRESSION_LEVEL, 1),
+                )
+            variable[...] = value
+            if is_bool:
+                variable.setncattr("boolean", 1)
+        elif value is None:
+            null_keys.append(key)
+        elif isinstance(value, bool):
+            bool_keys.append(key)
+            group.setncattr(key, int(value))
+        else:
+            group.setncattr(key, value)
+    group.setncattr_string("null_keys", null_keys)
+    group.setncattr_string("bool_keys", bool_keys)
+
+
+def _read_group(group: netCDF4.Group) -> Dict[str, Any]:
+    """Load a dictionary stored by :py:func:`_write_group`."""
+    values: Dict[str, Any] = {}
+    special = {}
+    for key in ("null_keys", "bool_keys"):
+        names = group.getncattr(key)
+        special[key] = [names] if isinstance(names, str) else list(names)
+    for key in group.ncattrs():
+        if key in special:
+            continue
+        value = group.getncattr(key)
+        if key in special["bool_keys"]:
+            value = bool(value)
+        elif isinstance(value, np.generic):
+            value = value.item()
+        values[key] = value
+    for key in special["null_keys"]:
+        values[key] = None
+    for key, variable in group.variables.items():
+        variable.set_auto_mask(False)
+        data = variable[...]
+        if variable.dtype is str:
+            values[key] = np.asarray(data, dtype=str)
+        elif "boolean" in variable.ncattrs():
+            values[key] = data.astype(bool)
+        else:
+            values[key] = data
+    for key, subgroup in group.groups.items():
+        values[key] = _read_group(subgroup)
+    return values
@@ -27,6 +27,7 @@ if typing.TYPE_CHECKING:
     from .readers import DataReader
     from .equilibrium import Equilibrium
     from .operators import Operator
+    from .operators import ResultCache
 
 __author__ = "Marco Sertoli"
 __credits__ = ["Chris MacMackin", "Marco Sertoli"]
@@ -161,6 +162,9 @@ class Session:
         session.
     operators: typing.Dict[str, AbstractOperator]
         All of the operators which have been instantiated during this session.
+    operator_cache: typing.Optional[ResultCache]
+        Where operators created during this session store their results for
+        reuse. If None (the default) results are not stored.
     prov: prov.model.ProvDocument
         The document containing all of the provenance information for this
         session.
@@ -202,6 +206,7 @@ class Session:
         self.equilibria: typing.Dict[str, Equilibrium] = {}
         self.operators: typing.Dict[str, Operator] = {}
         self.readers: typing.Dict[str, DataReader] = {}
+        self.operator_cache: typing.Optional[ResultCache] = None
 
     def __enter__(self):
         global global_session
@@ -12,8 +12,11 @@ from typing import Tuple
 
 import numpy as np
 from scipy.interpolate import CubicSpline
-from xarray import apply_ufunc
+from scipy.interpolate import make_interp_spline
+from scipy.interpolate import PPoly
 from xarray import DataArray
+from xarray import Dataset
+from xarray import open_dataset
 
 from .numpy_typing import ArrayLike
 
@@ -145,6 +148,12 @@ def broadcast_spline(
     """Applies to a `:class:xarray.DataArray` input, broadcasting and/or
     interpolating appropriately.
 
+    If both the spline and the input have a time coordinate, then the
+    input at each time is evaluated only with the spline for that time.
+    Where the input's times are not all among those of the spline, the
+    spline coefficients are first interpolated (cubically) onto the input's
+    times, giving NaN outside of the spline's range of times.
+
     Note
     ----
     Currently the only dimension which are checked for presence in
@@ -153,22 +162,247 @@ def broadcast_spline(
     TODO: Implement these checks for other dimensions as well.
 
     """
-    if "t" in interp_coord.coords and "t" in spline_dims:
-        time_outer_product = apply_ufunc(
-            spline,
-            interp_coord,
-            input_core_dims=[[]],
-            output_core_dims=[tuple(d if d != "t" else "__new_t" for d in spline_dims)],
-        ).assign_coords(__new_t=spline_coords["t"])
-        result = time_outer_product.indica.interp2d(
-            __new_t=interp_coord.coords["t"], method="cubic"
-        ).assign_coords({k: v for k, v in spline_coords.items() if k != "t"})
-        del result.coords["__new_t"]
+    return PiecewisePolynomial.from_spline(
+        spline, "x", tuple(spline_dims), spline_coords
+    )(interp_coord)
+
+
+def _coefficients_at_times(
+    coeffs: np.ndarray, t_axis: int, spline_times: np.ndarray, times: np.ndarray
+) -> np.ndarray:
+    """Get the coefficients of a time-dependent piecewise polynomial at the
+    given times. These are taken directly where all of the times are among
+    those of the spline and are otherwise interpolated (cubically), giving
+    NaN outside of the spline's range of times.
+
+    """
+    indices = np.minimum(np.searchsorted(spline_times, times), len(spline_times) - 1)
+    if np.all(spline_times[indices] == times):
+        return np.take(coeffs, indices, t_axis)
+    result = make_interp_spline(
+        spline_times, coeffs, min(3, len(spline_times) - 1), axis=t_axis
+    )(times)
+    outside = np.logical_or(times < spline_times[0], times > spline_times[-1])
+    result[(slice(None),) * t_axis + (outside,)] = np.nan
+    return result
+
+
+class PiecewisePolynomial:
+    """A piecewise polynomial in one dimension, held as contiguous arrays of
+    breakpoints and coefficients so that it is cheap to copy, pickle and
+    store. The polynomials may vary with time and other dimensions, all of
+    which are evaluated at once.
+
+    Parameters
+    ----------
+    breakpoints
+        Boundaries of the intervals on which each polynomial is defined, in
+        increasing order.
+    coefficients
+        Coefficients of the polynomial on each interval, in order of
+        decreasing power. The first axis is the power, the second is the
+        interval and any remaining axes correspond to ``dims``.
+    dim
+        Name of the dimension along which the polynomial is defined.
+    dims
+        Names of the remaining axes of ``coefficients``.
+    coords
+        Coordinates for ``dims``, which will be given to the results.
+    extrapolate
+        Whether to extrapolate beyond the breakpoints. If not, values outside
+        of them are NaN.
+
+    """
+
+    def __init__(
+        self,
+        breakpoints: ArrayLike,
+        coefficients: ArrayLike,
+        dim: Hashable,
+        dims: Tuple[Hashable, ...] = (),
+        coords: Dict[Hashable, Any] = {},
+        extrapolate: bool = True,
+    ):
+        self.breakpoints = np.ascontiguousarray(breakpoints, dtype=float)
+        self.coefficients = np.ascontiguousarray(coefficients, dtype=float)
+        if self.coefficients.ndim != 2 + len(dims):
+            raise ValueError(
+                f"Coefficients have {self.coefficients.ndim} dimensions but "
+                f"{2 + len(dims)} were expected."
+            )
+        if self.coefficients.shape[1] != len(self.breakpoints) - 1:
+            raise ValueError(
+                "There must be one fewer interval in `coefficients` than there "
+                "are `breakpoints`."
+            )
+        self.dim = dim
+        self.dims = tuple(dims)
+        self.coords = {k: np.asarray(v) for k, v in coords.items()}
+        self.extrapolate = extrapolate
+
+    @classmethod
+    def from_spline(
+        cls,
+        spline: PPoly,
+        dim: Hashable,
+        dims: Tuple[Hashable, ...] = (),
+        coords: Dict[Hashable, Any] = {},
+    ) -> "PiecewisePolynomial":
+        """Create an instance from a :py:class:`scipy.interpolate.PPoly`
+        object, such as a :py:class:`scipy.interpolate.CubicSpline`.
+
+        Parameters
+        ----------
+        spline
+            The piecewise polynomial to copy. It must have been constructed
+            along its first axis.
+        dim
+            Name of the dimension along which the polynomial is defined.
+        dims
+            Names of the remaining axes of the data used to construct
+            ``spline``.
+        coords
+            Coordinates for ``dims``.
+
+        """
+        return cls(spline.x, spline.c, dim, dims, coords, bool(spline.extrapolate))
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        """The sizes of the dimensions other than the one along which the
+        polynomial is defined."""
+        return self.coefficients.shape[2:]
+
+    def __call__(self, coord: DataArray) -> DataArray:
+        """Evaluate the polynomials at the given locations.
+
+        If both the polynomials and the locations have a time coordinate then
+        each time of the locations is evaluated only with the polynomials for
+        that time, as in :py:func:`broadcast_spline`. Otherwise the result is
+        evaluated for every combination of location and the other dimensions
+        of the polynomials.
+
+        Parameters
+        ----------
+        coord
+            Locations, along :py:attr:`dim`, at which to evaluate the
+            polynomials.
+
+        Returns
+        -------
+        :
+            The values of the polynomials, with the dimensions of ``coord``
+            followed by the remaining dimensions of the polynomials.
+
+        """
+        order, nintervals = self.coefficients.shape[:2]
+        if "t" in coord.coords and "t" in self.dims:
+            scalar_time = "t" not in coord.dims
+            if scalar_time:
+                coord = coord.expand_dims("t")
+            dims = coord.dims
+            coord = coord.transpose("t", ...)
+            other_dims = tuple(d for d in self.dims if d != "t")
+            t_axis = 2 + self.dims.index("t")
+            coeffs = np.moveaxis(
+                _coefficients_at_times(
+                    self.coefficients,
+                    t_axis,
+                    self.coords["t"],
+                    np.asarray(coord.coords["t"]),
+                ),
+                t_axis,
+                2,
+            )
+            x = np.asarray(coord, dtype=float).reshape(coord.shape[0], -1)
+            values = self._evaluate(
+                coeffs.reshape(order, nintervals, coord.shape[0], -1), x
+            )
+            result = DataArray(
+                values.reshape(coord.shape + coeffs.shape[3:]),
+                coords=coord.coords,
+                dims=coord.dims + other_dims,
+            ).assign_coords({k: v for k, v in self.coords.items() if k != "t"})
+            if scalar_time:
+                return result.squeeze("t")
+            return result.transpose(*dims, *other_dims)
+        x = np.asarray(coord, dtype=float).reshape(1, -1)
+        values = self._evaluate(self.coefficients.reshape(order, nintervals, 1, -1), x)
+        return DataArray(
+            values.reshape(coord.shape + self.shape),
+            coords=coord.coords,
+            dims=coord.dims + self.dims,
+        ).assign_coords(self.coords)
+
+    def _evaluate(self, coeffs: np.ndarray, x: np.ndarray) -> np.ndarray:
+        """Evaluate the polynomials using Horner's method.
+
+        Parameters
+        ----------
+        coeffs
+            Coefficients with axes for power, interval, time and (flattened)
+            remaining dimensions.
+        x
+            Locations, with axes for time and (flattened) position.
+
+        Returns
+        -------
+        :
+            Values with axes for time, position and remaining dimensions.
+
+        """
+        interval = np.clip(
+            np.searchsorted(self.breakpoints, x, "right") - 1,
+            0,
+            len(self.breakpoints) - 2,
+        )
+        dx = (x - self.breakpoints[interval])[..., np.newaxis]
+        # Index into the flattened interval and time axes of the coefficients
+        index = interval * x.shape[0] + np.arange(x.shape[0])[:, np.newaxis]
+        coeffs = coeffs.reshape(coeffs.shape[0], -1, coeffs.shape[-1])
+        result = np.take(coeffs[0], index, 0)
+        for power in range(1, coeffs.shape[0]):
+            result *= dx
+            result += np.take(coeffs[power], index, 0)
+        if not self.extrapolate:
+            outside = (x < self.breakpoints[0]) | (x > self.breakpoints[-1])
+            result[outside] = np.nan
         return result
-    else:
-        return apply_ufunc(
-            spline,
-            interp_coord,
-            input_core_dims=[[]],
-            output_core_dims=[spline_dims],
-        ).assign_coords({k: v for k, v in spline_coords.items()})
+
+    def to_dataset(self) -> Dataset:
+        """Represent the polynomials as a :py:class:`xarray.Dataset`, with
+        the breakpoints as the coordinate of :py:attr:`dim`."""
+        return Dataset(
+            {
+                "coefficients": (
+                    ("power", f"{self.dim}_interval") + self.dims,
+                    self.coefficients,
+                )
+            },
+            coords={self.dim: self.breakpoints, **self.coords},
+            attrs={"dim": str(self.dim), "extrapolate": int(self.extrapolate)},
+        )
+
+    @classmethod
+    def from_dataset(cls, dataset: Dataset) -> "PiecewisePolynomial":
+        """Create an instance from the output of :py:meth:`to_dataset`."""
+        dim = dataset.attrs["dim"]
+        coefficients = dataset["coefficients"]
+        return cls(
+            dataset.coords[dim],
+            coefficients,
+            dim,
+            coefficients.dims[2:],
+            {k: v for k, v in dataset.coords.items() if k != dim},
+            bool(dataset.attrs["extrapolate"]),
+        )
+
+    def to_netcdf(self, path: str):
+        """Write the polynomials to a netCDF file."""
+        self.to_dataset().to_netcdf(path)
+
+    @classmethod
+    def from_netcdf(cls, path: str) -> "PiecewisePolynomial":
+        """Read polynomials written to a netCDF file by :py:meth:`to_netcdf`."""
+        with open_dataset(path) as dataset:
+            return cls.from_dataset(dataset.load())
@@ -1,6 +1,7 @@
 """Test enclosed volume coordinate systems."""
 
 from unittest.mock import Mock
+from unittest.mock import patch
 
 from hypothesis import given
 from hypothesis.strategies import composite
@@ -8,6 +9,8 @@ import numpy as np
 from xarray.testing import assert_allclose
 
 from indica.converters import EnclosedVolumeCoordinates
+from indica.converters import FluxMajorRadCoordinates
+from indica.utilities import coord_array
 from .test_flux_surfaces import flux_coordinates
 from ..strategies import arbitrary_coordinates
 
@@ -66,3 +69,30 @@ def test_convert_from_Rz(flux_transform, coords, flux_coords, expected_coords):
     )
     assert vol is expected_coords[0]
     assert theta is flux_coords[1]
+
+
+@given(flux_coordinates())
+def test_convert_to_flux_major_radius(flux_transform):
+    """Test conversion to flux-major-radius coordinates goes via flux surface
+    coordinates rather than R,z coordinates."""
+    rho = coord_array(np.linspace(0.1, 0.9, 5), flux_transform.x1_name)
+    theta = coord_array(np.linspace(0.0, np.pi, 4), "theta")
+    t = coord_array(np.linspace(0.0, 1e3, 3), "t")
+    vol, t = flux_transform.equilibrium.enclosed_volume(
+        rho, t, flux_transform.flux_kind
+    )
+    transform = EnclosedVolumeCoordinates(flux_transform)
+    other = FluxMajorRadCoordinates(flux_transform)
+    path = transform.get_conversion_path(other)
+    assert not path.via_Rz
+    assert len(path.steps) == 2
+    assert transform.get_conversion_path(other) is path
+    with patch.object(transform, "convert_to_Rz") as to_Rz, patch.object(
+        other, "convert_from_Rz"
+    ) as from_Rz:
+        rho_actual, R = transform.convert_to(other, vol, theta, t)
+    to_Rz.assert_not_called()
+    from_Rz.assert_not_called()
+    R_expected, _ = flux_transform.convert_to_Rz(rho, theta, t)
+    assert_allclose(rho_actual, rho.broadcast_like(rho_actual))
+    assert_allclose(R, R_expected.transpose(*R.dims))
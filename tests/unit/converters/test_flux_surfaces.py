@@ -7,6 +7,7 @@ from hypothesis.strategies import composite
 from hypothesis.strategies import floats
 import numpy as np
 
+from indica.converters import CoordinateTransform
 from indica.converters import FluxSurfaceCoordinates
 from indica.equilibrium import Equilibrium
 from indica.utilities import coord_array
@@ -95,3 +96,17 @@ def test_flux_to_Rz_mock(kind, coords, expected_result):
     equilib.spatial_coords.assert_called_with(*coords, kind)
     assert result[0] is expected_result[0]
     assert result[1] is expected_result[1]
+
+
+@given(flux_types(), flux_types())
+def test_flux_encode_decode(kind, other_kind):
+    """Test decoded transforms equal the originals, including equilibrium."""
+    equilib = Mock(spec=Equilibrium)
+    transform = FluxSurfaceCoordinates(kind)
+    transform.set_equilibrium(equilib)
+    assert CoordinateTransform.decode(transform.encode()) != transform
+    transform2 = CoordinateTransform.decode(transform.encode(), equilib)
+    assert transform2 == transform
+    other = FluxSurfaceCoordinates(other_kind)
+    other.set_equilibrium(equilib)
+    assert (other == transform) == (kind == other_kind)
@@ -18,6 +18,7 @@ from pytest import mark
 from xarray import DataArray
 from xarray.testing import assert_allclose
 
+from indica.converters import CoordinateTransform
 from indica.converters import LinesOfSightTransform
 from indica.utilities import coord_array
 from ..strategies import machine_dimensions
@@ -530,3 +531,17 @@ def test_los_end_points(parameters, time):
     dims = parameters[7]
     R, z = transform.convert_to_Rz(lines, 1.0, time)
     assert np.all(np.logical_not(inside_machine((R, z), dims, False)))
+
+
+@given(los_coordinates_parameters())
+def test_los_encode_decode(parameters):
+    """Test encoding and then decoding lines of sight recreates them."""
+    transform = LinesOfSightTransform(*parameters)
+    encoding = transform.encode()
+    transform2 = CoordinateTransform.decode(encoding)
+    assert isinstance(transform2, LinesOfSightTransform)
+    assert transform2.encode() == encoding
+    assert transform2.fingerprint == transform.fingerprint
+    assert transform2 == transform
+    assert_allclose(transform2.R_end, transform.R_end)
+    assert_allclose(transform2.z_end, transform.z_end)
@@ -10,14 +10,18 @@ from hypothesis.strategies import composite
 from hypothesis.strategies import floats
 from hypothesis.strategies import integers
 from hypothesis.strategies import just
+from hypothesis.strategies import lists
 from hypothesis.strategies import sampled_from
 import numpy as np
 from pytest import approx
 from pytest import mark
 from pytest import raises
+from xarray import concat
 from xarray import DataArray
 
+from indica.converters.time import bin_to_time_labels
 from indica.converters.time import convert_in_time
+from indica.converters.time import convert_in_time_chunks
 from indica.utilities import coord_array
 from .test_abstract_transform import coordinate_transforms_and_axes
 from ..data_strategies import data_arrays_from_coords
@@ -55,6 +59,28 @@ useful_smooth_data = useful_data_arrays(
 pytestmark = mark.filterwarnings("ignore:Mean of empty slice")
 
 
+def split_in_time(data, cuts):
+    """Split a DataArray (and its error/dropped attributes) into consecutive
+    chunks along the time axis at the given fractions of its length."""
+    indices = sorted({int(f * (data.sizes["t"] - 2)) + 2 for f in cuts})
+    bounds = [0] + indices + [data.sizes["t"]]
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        if start == end:
+            continue
+        chunk = data.isel(t=slice(start, end))
+        chunk.attrs = dict(data.attrs)
+        if "error" in data.attrs:
+            chunk.attrs["error"] = data.attrs["error"].isel(t=slice(start, end))
+        if "dropped" in data.attrs:
+            dropped = data.attrs["dropped"].isel(t=slice(start, end))
+            if "error" in data.attrs:
+                dropped.attrs["error"] = (
+                    data.attrs["dropped"].attrs["error"].isel(t=slice(start, end))
+                )
+            chunk.attrs["dropped"] = dropped
+        yield chunk
+
+
 def linear_data_array(a, b, times, abs_err):
     """Create a DataArray where values are ``a*times + b``."""
     result = DataArray(a * times + b, coords=[("t", times)])
@@ -315,3 +341,62 @@ def test_call_bin(tstart, tend, frequency_factor, data, method):
         from indica.converters.time import bin_in_time
 
         bin_in_time.assert_called_with(tstart, tend, frequency, data)
+
+
+@given(t_axes, sane_floats(), sane_floats(), floats(0.0, 0.2))
+def test_bin_non_uniform_labels(times, a, b, abs_err):
+    """Check binning onto unevenly spaced labels averages the samples lying
+    between the mid-points of neighbouring labels."""
+    data = linear_data_array(a, b, times, abs_err)
+    data.values[1] = np.nan
+    tlabels = np.array([60.0, 65.0, 80.0, 110.0])
+    edges = np.array([57.5, 62.5, 72.5, 95.0, 125.0])
+    result = bin_to_time_labels(tlabels, data)
+    assert np.all(result.coords["t"] == tlabels)
+    for i in range(len(tlabels)):
+        in_bin = (times.values > edges[i]) & (times.values <= edges[i + 1])
+        count = np.count_nonzero(in_bin)
+        if count == 0:
+            assert np.isnan(result.values[i])
+            continue
+        expected = np.nanmean(data.values[in_bin])
+        assert result.values[i] == approx(expected, nan_ok=True)
+        assert result.attrs["error"].values[i] == approx(abs_err / np.sqrt(count))
+
+
+@given(
+    start_times,
+    end_times,
+    sampled_from([3, 10, 500, 1000]),
+    useful_data_arrays(),
+    lists(floats(0.0, 1.0, exclude_max=True), max_size=5),
+    sampled_from(["nearest", "zero", "linear", "slinear"]),
+)
+def test_chunked_matches_whole(tstart, tend, n, data, cuts, method):
+    """Check converting a stream of chunks gives the same result as converting
+    all of the data at once, including for bins straddling chunks."""
+    if tstart > tend:
+        tstart, tend = tend, tstart
+    frequency = (n - 1) / 70.0
+    assume((tend - tstart) * frequency >= 2.0)
+    expected = convert_in_time(tstart, tend, frequency, data, method)
+    chunks = list(
+        convert_in_time_chunks(
+            tstart, tend, frequency, split_in_time(data, cuts), method
+        )
+    )
+    result = concat(chunks, "t")
+    assert result.dims == expected.dims
+    assert np.all(result.coords["t"] == approx(expected.coords["t"].values))
+    assert np.all(result.values == approx(expected.values, nan_ok=True))
+    if "error" in data.attrs:
+        errors = concat([c.attrs["error"] for c in chunks], "t")
+        assert np.all(
+            errors.values == approx(expected.attrs["error"].values, nan_ok=True)
+        )
+    if "dropped" in data.attrs:
+        dropped = concat([c.attrs["dropped"] for c in chunks], "t")
+        assert np.all(
+            dropped.values == approx(expected.attrs["dropped"].values, nan_ok=True)
+        )
+    assert set(chunks[0].attrs) == set(expected.attrs)
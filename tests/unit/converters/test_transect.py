@@ -9,6 +9,7 @@ import numpy as np
 from pytest import approx
 from xarray import DataArray
 
+from indica.converters import CoordinateTransform
 from indica.converters import TransectCoordinates
 from indica.utilities import coord_array
 from ..strategies import monotonic_series
@@ -177,3 +178,18 @@ def test_transect_returns_Rz(params, position, z_offset, time):
     else:
         assert z >= zvals[index + 1] + z_offset
         assert zvals[index] + z_offset >= z
+
+
+@given(transect_coordinates_parameters(), transect_coordinates_parameters())
+def test_transect_encode_decode(params, other_params):
+    """Test encoding and decoding transects recreates them and that the
+    fingerprint distinguishes between different transects."""
+    transform = TransectCoordinates(*params)
+    transform2 = CoordinateTransform.decode(transform.encode())
+    assert isinstance(transform2, TransectCoordinates)
+    assert transform2.encode() == transform.encode()
+    assert transform2 == transform
+    other = TransectCoordinates(*other_params)
+    same = params[0].identical(other_params[0]) and params[1].identical(other_params[1])
+    assert (other.fingerprint == transform.fingerprint) == same
+    assert (other == transform) == same
@@ -138,6 +138,32 @@ class FakeEquilibrium(Equilibrium):
         )
         return rho, t
 
+    def R_hfs(self, rho, t=None, kind="poloidal"):
+        if t is None:
+            t = self.default_t
+            rmag = self.rmag
+        else:
+            rmag = self.rmag.interp(
+                t=t, method="nearest", kwargs={"fill_value": "extrapolate"}
+            )
+        r = rho ** self.parameters[kind + "_n"] * (
+            1 + self.parameters[kind + "_alpha"] * t
+        )
+        return rmag - self.parameters[kind + "_a"] * r, t
+
+    def R_lfs(self, rho, t=None, kind="poloidal"):
+        if t is None:
+            t = self.default_t
+            rmag = self.rmag
+        else:
+            rmag = self.rmag.interp(
+                t=t, method="nearest", kwargs={"fill_value": "extrapolate"}
+            )
+        r = rho ** self.parameters[kind + "_n"] * (
+            1 + self.parameters[kind + "_alpha"] * t
+        )
+        return rmag + self.parameters[kind + "_a"] * r, t
+
     def minor_radius(self, rho, theta, t=None, kind="poloidal"):
         if t is None:
             t = self.default_t
@@ -0,0 +1,90 @@
+"""Tests for interpolating atomic data."""
+
+import numpy as np
+from pytest import approx
+from pytest import raises
+from scipy.interpolate import CubicSpline
+from xarray import DataArray
+
+from indica.operators import RateInterpolator
+from indica.operators.atomic_rates import rate_interpolator
+
+LOG_TE = np.linspace(0.0, 4.0, 12)
+LOG_NE = np.linspace(16.0, 21.0, 9)
+
+
+def adf11_table(seed=1):
+    values = np.random.default_rng(seed).uniform(-20.0, -14.0, (3, 12, 9))
+    return DataArray(
+        values,
+        coords=[
+            ("ion_charges", [0, 1, 2]),
+            ("log10_electron_temperature", LOG_TE),
+            ("log10_electron_density", LOG_NE),
+        ],
+    )
+
+
+def test_matches_tensor_product_spline():
+    table = adf11_table()
+    rng = np.random.default_rng(2)
+    log_te = rng.uniform(0.0, 4.0, 20)
+    log_ne = rng.uniform(16.0, 21.0, 20)
+    expected = [
+        [
+            CubicSpline(LOG_NE, CubicSpline(LOG_TE, table[z].values)(te))(ne)
+            for te, ne in zip(log_te, log_ne)
+        ]
+        for z in range(3)
+    ]
+    result = RateInterpolator(table).interpolate(log_te, log_ne)
+    assert result == approx(np.array(expected))
+
+
+def test_reproduces_table():
+    table = adf11_table()
+    Te = DataArray(10 ** LOG_TE, dims="rho")
+    ne = DataArray(10 ** LOG_NE, dims="t")
+    result = RateInterpolator(table)(Te, ne)
+    assert result.dims == ("ion_charges", "rho", "t")
+    assert result.values == approx(table.values)
+
+
+def test_adf15_interpolated_in_log_space():
+    pec = DataArray(
+        10 ** adf11_table().values,
+        coords=[
+            ("index", [1, 2, 3]),
+            ("electron_temperature", 10 ** LOG_TE),
+            ("electron_density", 10 ** LOG_NE),
+        ],
+    )
+    te = DataArray([3.0, 300.0], dims="rho")
+    ne = DataArray([2e17, 3e20], dims="rho")
+    expected = 10 ** RateInterpolator(adf11_table()).interpolate(
+        np.log10(te.values), np.log10(ne.values)
+    )
+    assert RateInterpolator(pec)(te, ne).values == approx(expected)
+
+
+def test_extrapolation_policies():
+    table = adf11_table()
+    outside_te = np.array([5.0, 2.0])
+    ne = np.array([18.0, 18.0])
+    nan_result = RateInterpolator(table).interpolate(outside_te, ne)
+    assert np.all(np.isnan(nan_result[:, 0]))
+    assert np.all(np.isfinite(nan_result[:, 1]))
+    clipped = RateInterpolator(table, "clip").interpolate(outside_te, ne)
+    assert clipped[:, 0] == approx(
+        RateInterpolator(table).interpolate(np.array([4.0]), np.array([18.0]))[:, 0]
+    )
+    assert np.all(
+        np.isfinite(RateInterpolator(table, "extrapolate").interpolate(outside_te, ne))
+    )
+    with raises(ValueError):
+        RateInterpolator(table, "raise").interpolate(outside_te, ne)
+
+
+def test_interpolators_cached():
+    assert rate_interpolator(adf11_table()) is rate_interpolator(adf11_table())
+    assert rate_interpolator(adf11_table()) is not rate_interpolator(adf11_table(3))
@@ -0,0 +1,63 @@
+"""Tests for calculating equilibrium fractional abundances."""
+
+import numpy as np
+from pytest import approx
+from xarray import DataArray
+
+from indica.operators import FractionalAbundance
+
+
+def adf11_table(values, quantity):
+    """Create ADF11 data (log10 of rates) which is independent of
+    temperature and density."""
+    log_te = np.linspace(0.0, 4.0, 9)
+    log_ne = np.linspace(16.0, 21.0, 6)
+    data = np.broadcast_to(
+        np.asarray(values, dtype=float)[:, np.newaxis, np.newaxis],
+        (len(values), len(log_te), len(log_ne)),
+    )
+    return DataArray(
+        data,
+        coords=[
+            ("ion_charges", np.arange(len(values))),
+            ("log10_electron_temperature", log_te),
+            ("log10_electron_density", log_ne),
+        ],
+        attrs={"datatype": (quantity, "carbon")},
+    )
+
+
+def plasma_profiles():
+    rho = DataArray(np.linspace(0.0, 1.0, 5), dims="rho_poloidal")
+    t = DataArray([50.0, 51.0], dims="t")
+    Te = (1e3 * (1.1 - rho ** 2) + 0.0 * t).assign_coords(rho_poloidal=rho, t=t)
+    Te.attrs["datatype"] = ("temperature", "electrons")
+    ne = (1e19 * (1.1 - rho) + 0.0 * t).assign_coords(rho_poloidal=rho, t=t)
+    ne.attrs["datatype"] = ("number_density", "electrons")
+    return Te, ne
+
+
+def test_matches_rate_ratios():
+    """Check ratios of neighbouring charge states equal the ratio of
+    ionisation to recombination rates."""
+    log_scd = [-14.0, -15.0, -16.5, -17.0, -19.0, -20.0]
+    log_acd = [-17.0, -16.0, -17.5, -16.0, -17.5, -18.0]
+    scd = adf11_table(log_scd, "ion_coeffs")
+    acd = adf11_table(log_acd, "recomb_coeffs")
+    Te, ne = plasma_profiles()
+    fz = FractionalAbundance()(scd, acd, Te, ne)
+    assert fz.dims == ("ion_charges", "rho_poloidal", "t")
+    assert list(fz.coords["ion_charges"]) == list(range(7))
+    assert fz.sum("ion_charges").values == approx(1.0)
+    expected = 10 ** np.cumsum([0.0] + list(np.subtract(log_scd, log_acd)))
+    expected /= expected.sum()
+    assert fz.isel(rho_poloidal=2, t=1).values == approx(expected)
+    assert fz.attrs["datatype"] == ("fractional_abundance", "carbon")
+
+
+def test_outside_table_is_nan():
+    scd = adf11_table([-14.0, -15.0], "ion_coeffs")
+    acd = adf11_table([-17.0, -16.0], "recomb_coeffs")
+    Te, ne = plasma_profiles()
+    fz = FractionalAbundance()(scd, acd, Te.copy(data=Te.values * 100), ne)
+    assert np.all(np.isnan(fz.isel(rho_poloidal=0)))
@@ -0,0 +1,334 @@
+"""Tests for the fitting problem solved by the radiation inversion operator."""
+
+from unittest.mock import MagicMock
+
+from hypothesis import given
+from hypothesis.strategies import booleans
+from hypothesis.strategies import composite
+from hypothesis.strategies import integers
+import numpy as np
+from pytest import approx
+from scipy.integrate import romb
+from xarray import DataArray
+
+from indica.converters import FluxSurfaceCoordinates
+from indica.converters import LinesOfSightTransform
+from indica.converters import TrivialTransform
+from indica.operators import InvertRadiation
+from indica.operators import LineIntegral
+from indica.operators.invert_radiation import _ChordGeometry
+from indica.operators.invert_radiation import _EmissivityFit
+from indica.operators.invert_radiation import EmissivityProfile
+from ..fake_equilibrium import FakeEquilibrium
+
+TIMES = np.array([50.0, 50.1, 50.2, 50.3])
+
+
+@composite
+def emissivity_fits(draw):
+    """Generate a fitting problem along with the geometry of a camera and
+    some knot values within the bounds of the problem."""
+    n = draw(integers(4, 8))
+    last_knot_zero = draw(booleans())
+    rng = np.random.default_rng(draw(integers(0, 2 ** 32 - 1)))
+    knots = np.linspace(0.0, 1.0, n) ** 1.2
+    m = n - 1 if last_knot_zero else n
+    bounds = (
+        np.concatenate((np.zeros(m), np.where(knots[1:-1] > 0.5, 0.0, -0.5))),
+        np.concatenate((1e12 * np.ones(m), np.ones(n - 2))),
+    )
+    fit = _EmissivityFit(knots, "rho_poloidal", last_knot_zero, bounds)
+    nlos = draw(integers(1, 10))
+    nsamples = 17
+    rho = rng.uniform(0.0, 1.2, (nlos, nsamples))
+    R_0 = 3.0 - 0.5 * rho
+    R = R_0 + rng.uniform(0.0, 1.0, (nlos, nsamples)) * rho
+    camera = rng.uniform(1e3, 1e4, nlos)
+    geometry = _ChordGeometry(
+        rho,
+        R,
+        R_0,
+        romb(np.eye(nsamples), 0.05, 0),
+        camera,
+        0.1 * camera,
+        rng.random(nlos) > 0.2,
+    )
+    knotvals = np.concatenate(
+        (rng.uniform(0.0, 5e3, m), rng.uniform(bounds[0][m:], bounds[1][m:]))
+    )
+    return fit, geometry, knotvals
+
+
+@given(emissivity_fits())
+def test_jacobian_matches_finite_differences(problem):
+    """Check the analytic Jacobian agrees with central finite differences of
+    the residuals."""
+    fit, geometry, knotvals = problem
+    bases = [fit.sample_bases(geometry)]
+    jac = fit.jacobian(knotvals, bases, [geometry])
+    expected = np.empty_like(jac)
+    for i in range(len(knotvals)):
+        step = np.zeros_like(knotvals)
+        step[i] = 1e-6 * max(1.0, abs(knotvals[i]))
+        expected[:, i] = (
+            fit.residuals(knotvals + step, bases, [geometry])
+            - fit.residuals(knotvals - step, bases, [geometry])
+        ) / (2 * step[i])
+    assert jac.shape == (np.count_nonzero(geometry.has_data), len(knotvals))
+    assert np.all(jac == approx(expected, rel=1e-4, abs=1e-6))
+
+
+@given(emissivity_fits())
+def test_back_integrals_match_spline_profile(problem):
+    """Check the integrals calculated from the basis matrices agree with
+    integrating splines fit through the knot values."""
+    fit, geometry, knotvals = problem
+    sym, asym = fit.knotvals_to_xarray(knotvals)
+    sym_vals = np.nan_to_num(fit.sym_spline(geometry.rho) @ sym.values)
+    asym_vals = fit.asym_spline(geometry.rho) @ asym.values
+    emissivity = sym_vals * np.exp(asym_vals * (geometry.R ** 2 - geometry.R_0 ** 2))
+    emissivity[(geometry.rho > fit.knots[-1]) | (emissivity < 0.0)] = 0.0
+    expected = romb(emissivity, 0.05, 1)
+    integral = fit.back_integrals(knotvals, [fit.sample_bases(geometry)], [geometry])
+    assert np.all(integral[0] == approx(expected, rel=1e-8, abs=1e-8))
+
+
+def symmetric_problem(n_times, last_knot_zero=True):
+    """A fitting problem with several cameras and times, along with
+    symmetric knot values and the data they would produce."""
+    rng = np.random.default_rng(1)
+    n = 6
+    knots = np.linspace(0.0, 1.0, n) ** 1.2
+    m = n - 1 if last_knot_zero else n
+    bounds = (
+        np.concatenate((np.zeros(m), np.where(knots[1:-1] > 0.5, 0.0, -0.5))),
+        np.concatenate((1e12 * np.ones(m), np.ones(n - 2))),
+    )
+    fit = _EmissivityFit(knots, "rho_poloidal", last_knot_zero, bounds)
+    knotvals = np.zeros((n_times, m + n - 2))
+    knotvals[:, :m] = np.linspace(5e3, 1e3, m) * rng.uniform(0.5, 1.5, (n_times, 1))
+    geometries = []
+    for i in range(n_times):
+        cameras = []
+        for nlos in (8, 5):
+            rho = np.linspace(0.0, 1.1, nlos)[:, np.newaxis] + np.abs(
+                np.linspace(-1.0, 1.0, 17)
+            )
+            R = 3.0 + rho
+            geometry = _ChordGeometry(
+                rho,
+                R,
+                R,
+                romb(np.eye(17), 0.05, 0),
+                np.zeros(nlos),
+                np.ones(nlos),
+                np.ones(nlos, dtype=bool),
+            )
+            cameras.append(geometry)
+        bases = [fit.sample_bases(g) for g in cameras]
+        for g, integral in zip(
+            cameras, fit.back_integrals(knotvals[i], bases, cameras)
+        ):
+            g.camera = integral
+            g.sigma = 0.01 * integral.max() * np.ones_like(integral)
+        geometries.append(cameras)
+    return fit, geometries, knotvals
+
+
+def test_linear_fit_recovers_symmetric_emissivity():
+    """Check weak Tikhonov regularisation recovers the knot values which
+    produced symmetric data, fitting all times at once."""
+    fit, geometries, knotvals = symmetric_problem(4)
+    results = fit.solve_linear(geometries, 1e-12, "tikhonov")
+    assert len(results) == 4
+    for (x, status, integrals, nfev, njev), expected, cameras in zip(
+        results, knotvals, geometries
+    ):
+        assert status is None
+        assert x == approx(expected, rel=1e-5, abs=1e-3)
+        for integral, g in zip(integrals, cameras):
+            assert integral == approx(g.camera, rel=1e-6)
+
+
+def test_phillips_regularisation_smooths():
+    """Check strong Phillips regularisation gives knot values which are
+    linear in the knot index."""
+    fit, geometries, _ = symmetric_problem(2, False)
+    results = fit.solve_linear(geometries, 1e6, "phillips")
+    for x, *_ in results:
+        assert np.diff(x[: fit.m], 2) == approx(0.0, abs=1e-3 * x[0])
+
+
+def test_linear_fit_respects_bounds():
+    """Check that where the unconstrained linear fit would give negative
+    emissivity, the bounded fit matches the data better than clipping the
+    unconstrained knot values."""
+    fit, geometries, knotvals = symmetric_problem(2)
+    for cameras in geometries:
+        for g in cameras:
+            outer = np.arange(len(g.camera)) >= len(g.camera) // 2
+            g.camera = g.camera - 0.3 * g.camera.max() * outer
+    unbounded = (
+        np.full(knotvals.shape[1], -np.inf),
+        np.full(knotvals.shape[1], np.inf),
+    )
+    free_fit = _EmissivityFit(fit.knots, fit.dim_name, True, unbounded)
+    free_results = free_fit.solve_linear(geometries, 1e-12, "tikhonov")
+    results = fit.solve_linear(geometries, 1e-12, "tikhonov")
+    for (x, _, integrals, *_), (free_x, *_), cameras in zip(
+        results, free_results, geometries
+    ):
+        assert np.any(free_x < fit.bounds[0])
+        assert np.all(x >= fit.bounds[0])
+        clipped = np.clip(free_x, *fit.bounds)
+        clipped_integrals = fit.back_integrals(
+            clipped, [fit.sample_bases(g) for g in cameras], cameras
+        )
+
+        def chi2(values):
+            return sum(
+                np.sum(((v - g.camera) / g.sigma) ** 2) for v, g in zip(values, cameras)
+            )
+
+        assert chi2(integrals) < chi2(clipped_integrals)
+
+
+def test_refinement_starts_from_each_guess():
+    """Check the nonlinear fit at each time starts from the initial guess
+    for that time, so it stops immediately when given the exact solution."""
+    fit, geometries, knotvals = symmetric_problem(3)
+    results = fit.solve(np.arange(3.0), geometries, knotvals)
+    for (x, status, _, nfev, _), expected in zip(results, knotvals):
+        assert status > 0
+        assert nfev == 1
+        assert x == approx(expected, abs=1e-6)
+
+
+def mock_session():
+    """A session which records no provenance (the fake equilibrium has
+    none) and caches no results."""
+    sess = MagicMock()
+    sess.operator_cache = None
+    return sess
+
+
+def synthetic_camera(asymmetry=0.0):
+    """Data for a camera with horizontal lines of sight, calculated from a
+    known emissivity profile, along with the grid and times on which to
+    invert it."""
+    equilibrium = FakeEquilibrium(2.9, 0.0, TIMES)
+    flux_coords = FluxSurfaceCoordinates("poloidal")
+    flux_coords.set_equilibrium(equilibrium)
+    n = 12
+    z = np.linspace(-0.6, 0.6, n)
+    transform = LinesOfSightTransform(
+        3.85 * np.ones(n), z, np.zeros(n), 2.0 * np.ones(n), z, np.zeros(n), "sxr"
+    )
+    transform.set_equilibrium(equilibrium)
+    rho = DataArray(np.linspace(0.0, 1.0, 11), dims="rho_poloidal")
+    t = DataArray(TIMES, dims="t")
+    symmetric = (3e3 * (1 - rho ** 2) * (1 + 0.1 * (t - TIMES[0]))).assign_coords(
+        rho_poloidal=rho, t=t
+    )
+    asymmetric = (asymmetry * rho * (1 - rho) + 0.0 * t).assign_coords(
+        rho_poloidal=rho, t=t
+    )
+    profile = EmissivityProfile(symmetric, asymmetric, flux_coords)
+    emissivity = profile(TrivialTransform(), DataArray(2.9), DataArray(0.0), t)
+    emissivity.attrs["datatype"] = ("emissivity", "sxr")
+    emissivity.attrs["emissivity_model"] = profile
+    camera = DataArray(
+        np.zeros((n, len(TIMES))),
+        coords=[(transform.x1_name, np.arange(n)), ("t", TIMES)],
+        attrs={"datatype": ("luminous_flux", "sxr"), "transform": transform},
+    )
+    (integral,) = LineIntegral(65)(emissivity, camera)
+    camera = camera.copy(data=integral.transpose(*camera.dims).values)
+    R = DataArray(np.linspace(2.0, 3.8, 10), dims="R")
+    R.attrs["datatype"] = ("major_rad", "plasma")
+    z = DataArray(np.linspace(-1.0, 1.0, 10), dims="z")
+    z.attrs["datatype"] = ("z", "plasma")
+    t.attrs["datatype"] = ("time", "plasma")
+    return R, z, t, camera
+
+
+def test_parallel_inversion_matches_serial():
+    """Check fitting blocks of times on threads or processes gives the same
+    result as fitting them all in turn."""
+    R, z, t, camera = synthetic_camera(0.2)
+    results = [
+        InvertRadiation(
+            1,
+            "sxr",
+            5,
+            33,
+            n_workers=workers,
+            use_processes=processes,
+            sess=mock_session(),
+        )(R, z, t, camera)
+        for workers, processes in [(1, False), (2, False), (2, True)]
+    ]
+    serial, threads, processes = (r[2].back_integral for r in results)
+    assert threads.values == approx(processes.values)
+    assert threads.values == approx(serial.values, rel=1e-3)
+    assert serial.values == approx(
+        camera.transpose(*serial.dims).values, rel=0.05, abs=0.01 * camera.max()
+    )
+
+
+def test_parallel_settings_not_in_provenance():
+    """Check the number and type of workers and the level of output do not
+    change the identity of the operator, so results are shared between
+    serial and parallel runs."""
+    serial = InvertRadiation(n_workers=1, verbose=2, sess=mock_session())
+    parallel = InvertRadiation(n_workers=4, use_processes=True, sess=mock_session())
+    assert serial.prov_id == parallel.prov_id
+
+
+def test_precomputed_geometry_matches_conversion():
+    """Check the residuals calculated from the precomputed chord geometry
+    agree with those from converting the lines of sight to flux
+    coordinates and evaluating the fit emissivity on every call."""
+    R, z, t, camera = synthetic_camera(0.2)
+    emissivity, _, fit_camera = InvertRadiation(1, "sxr", 5, 33, sess=mock_session())(
+        R, z, t, camera
+    )
+    transform = fit_camera.attrs["transform"]
+    values = emissivity.attrs["emissivity_model"](
+        transform,
+        fit_camera.coords[transform.x1_name],
+        fit_camera.coords[transform.x2_name],
+        fit_camera.coords["t"],
+    )
+    integral = values.reduce(
+        romb, transform.x2_name, dx=float(fit_camera.attrs["dl"])
+    ).transpose(*fit_camera.back_integral.dims)
+    expected = (fit_camera.camera - integral) / fit_camera.weights
+    residuals = (fit_camera.camera - fit_camera.back_integral) / fit_camera.weights
+    assert residuals.values == approx(expected.values, rel=1e-6, abs=1e-9)
+
+
+def test_linear_methods_fit_camera():
+    """Check the linear fitting methods reproduce data from a symmetric
+    emissivity, with no asymmetry unless followed by a nonlinear
+    refinement."""
+    R, z, t, camera = synthetic_camera(0.0)
+    for method, refine in [("tikhonov", False), ("phillips", True)]:
+        _, fit, fit_camera = InvertRadiation(
+            1,
+            "sxr",
+            5,
+            33,
+            method=method,
+            regularisation=1e-6,
+            refine=refine,
+            sess=mock_session(),
+        )(R, z, t, camera)
+        back_integral = fit_camera.back_integral
+        assert back_integral.values == approx(
+            camera.transpose(*back_integral.dims).values,
+            rel=0.05,
+            abs=0.01 * camera.max(),
+        )
+        if not refine:
+            assert np.all(fit.asymmetry_parameter.values == 0.0)
@@ -0,0 +1,64 @@
+"""Tests for evolving the charge state distribution of impurities in
+time."""
+
+import numpy as np
+from pytest import approx
+from pytest import raises
+from xarray import DataArray
+
+from indica.operators import FractionalAbundance
+from indica.operators import IonisationBalance
+from .test_fractional_abundance import adf11_table
+
+
+def time_profiles(times):
+    rho = DataArray(np.linspace(0.0, 1.0, 4), dims="rho_poloidal")
+    t = DataArray(times, dims="t")
+    Te = (1e3 * (1.1 - rho ** 2) + 0.0 * t).assign_coords(rho_poloidal=rho, t=t)
+    Te.attrs["datatype"] = ("temperature", "electrons")
+    ne = (1e19 * (1.1 - rho) + 0.0 * t).assign_coords(rho_poloidal=rho, t=t)
+    ne.attrs["datatype"] = ("number_density", "electrons")
+    return Te, ne
+
+
+def test_equilibrium_is_steady():
+    scd = adf11_table([-14.0, -15.0, -16.5], "ion_coeffs")
+    acd = adf11_table([-17.0, -16.0, -17.5], "recomb_coeffs")
+    Te, ne = time_profiles(np.linspace(50.0, 50.1, 6))
+    equilibrium = FractionalAbundance()(scd, acd, Te, ne)
+    fz = IonisationBalance()(scd, acd, Te, ne, equilibrium)
+    assert fz.dims == ("ion_charges", "t", "rho_poloidal")
+    assert fz.attrs["datatype"] == ("fractional_abundance", "carbon")
+    assert fz.values == approx(
+        equilibrium.transpose(*fz.dims).values, rel=1e-6, abs=1e-12
+    )
+
+
+def test_relaxation():
+    """Check a two-state system relaxes exponentially towards
+    equilibrium, and that abundances are conserved."""
+    S = 1e-13
+    alpha = 3e-14
+    scd = adf11_table([np.log10(S)], "ion_coeffs")
+    acd = adf11_table([np.log10(alpha)], "recomb_coeffs")
+    times = np.linspace(50.0, 50.001, 11)
+    Te, ne = time_profiles(times)
+    initial = DataArray([1.0, 0.0], dims="ion_charges")
+    initial.attrs["datatype"] = ("fractional_abundance", "carbon")
+    fz = IonisationBalance(max_step=1e-7)(scd, acd, Te, ne, initial)
+    assert fz.sum("ion_charges").values == approx(1.0)
+    rate = ne * (S + alpha)
+    expected = S / (S + alpha) * (1 - np.exp(-rate * (ne.coords["t"] - times[0])))
+    assert fz.sel(ion_charges=1).values == approx(
+        expected.transpose(*fz.dims[1:]).values, rel=1e-3, abs=1e-6
+    )
+
+
+def test_needs_time():
+    scd = adf11_table([-14.0], "ion_coeffs")
+    acd = adf11_table([-17.0], "recomb_coeffs")
+    Te, ne = time_profiles([50.0])
+    initial = DataArray([1.0, 0.0], dims="ion_charges")
+    initial.attrs["datatype"] = ("fractional_abundance", "carbon")
+    with raises(ValueError):
+        IonisationBalance()(scd, acd, Te.isel(t=0), ne.isel(t=0), initial)
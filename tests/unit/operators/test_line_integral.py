@@ -0,0 +1,89 @@
+"""Tests for integrating emissivity along lines of sight."""
+
+import numpy as np
+from pytest import approx
+from pytest import raises
+from xarray import DataArray
+
+from indica.converters import LinesOfSightTransform
+from indica.converters import TrivialTransform
+from indica.operators import InvertRadiation
+from indica.operators import LineIntegral
+from .test_invert_radiation import mock_session
+from .test_invert_radiation import synthetic_camera
+
+
+def camera():
+    transform = LinesOfSightTransform(
+        np.array([3.8, 3.8]),
+        np.array([0.0, 0.5]),
+        np.zeros(2),
+        np.array([2.0, 2.0]),
+        np.array([0.0, 0.5]),
+        np.zeros(2),
+        "sxr",
+    )
+    data = DataArray(
+        np.zeros((2, 3)),
+        coords=[("sxr_coords", [0, 1]), ("t", [50.0, 50.1, 50.2])],
+        attrs={"datatype": ("luminous_flux", "sxr"), "transform": transform},
+    )
+    return data
+
+
+def emissivity(func):
+    R = DataArray(np.linspace(1.8, 4.0, 23), dims="R")
+    z = DataArray(np.linspace(-1.0, 1.0, 21), dims="z")
+    t = DataArray([50.0, 50.1, 50.2], dims="t")
+    result = (func(R) + 0.0 * z + 0.0 * t).assign_coords(R=R, z=z, t=t)
+    result.attrs["datatype"] = ("emissivity", "sxr")
+    result.attrs["transform"] = TrivialTransform()
+    return result
+
+
+def test_uniform_emissivity():
+    (flux,) = LineIntegral()(emissivity(lambda R: 1.0 + 0.0 * R), camera())
+    assert flux.dims == ("sxr_coords", "t")
+    assert flux.attrs["datatype"] == ("luminous_flux", "sxr")
+    assert flux.values == approx(3.8 - 1.83)
+
+
+def test_linear_emissivity():
+    for quadrature, n in [("romberg", 33), ("simpson", 20), ("trapezoid", 10)]:
+        (flux,) = LineIntegral(n, quadrature)(emissivity(lambda R: R), camera())
+        assert flux.values == approx((3.8 ** 2 - 1.83 ** 2) / 2)
+
+
+def test_geometry_reused():
+    operator = LineIntegral()
+    emiss = emissivity(lambda R: R)
+    cam = camera()
+    (first,) = operator(emiss, cam)
+    (second,) = operator(emiss.copy(data=2 * emiss.values), cam)
+    assert len(operator._geometries) == 1
+    assert second.values == approx(2 * first.values)
+
+
+def test_emissivity_model():
+    """Check an emissivity described by a fitted profile is integrated by
+    evaluating that profile, reproducing the camera data it was fit to."""
+    R, z, t, cam = synthetic_camera(0.2)
+    emiss, _, fit_camera = InvertRadiation(1, "sxr", 5, 33, sess=mock_session())(
+        R, z, t, cam
+    )
+    operator = LineIntegral(33, sess=mock_session())
+    (flux,) = operator(emiss, cam)
+    expected = fit_camera.back_integral.transpose(*flux.dims)
+    assert flux.values == approx(expected.values, rel=1e-6)
+    assert flux.values == approx(
+        cam.transpose(*flux.dims).values, rel=0.05, abs=0.01 * cam.max()
+    )
+    transform = emiss.attrs["emissivity_model"].transform
+    ((camera_transform, target, *_),) = operator._geometries.values()
+    assert camera_transform is cam.attrs["transform"]
+    assert target is transform
+
+
+def test_invalid_romberg_samples():
+    with raises(ValueError):
+        LineIntegral(64)
@@ -0,0 +1,124 @@
+"""Tests for calculating the power radiated by impurities."""
+
+import numpy as np
+from pytest import approx
+from pytest import raises
+from xarray import DataArray
+
+from indica.converters import FluxSurfaceCoordinates
+from indica.operators import RadiatedPower
+from .test_fractional_abundance import adf11_table
+from .test_fractional_abundance import plasma_profiles
+from ..fake_equilibrium import FakeEquilibrium
+
+
+def abundances():
+    fz = DataArray(
+        [[0.1], [0.2], [0.7]],
+        coords=[("ion_charges", [0, 1, 2]), ("dummy", [0])],
+    ).squeeze("dummy", drop=True)
+    return fz
+
+
+def plasma(equilibrium=True):
+    Te, ne = plasma_profiles()
+    if equilibrium:
+        transform = FluxSurfaceCoordinates("poloidal")
+        transform.set_equilibrium(FakeEquilibrium(3.0, 0.0, Te.coords["t"].values))
+        Te.attrs["transform"] = transform
+        ne.attrs["transform"] = transform
+    fz = (abundances() + 0.0 * Te).transpose("ion_charges", *Te.dims)
+    fz.attrs["datatype"] = ("fractional_abundance", "carbon")
+    n_carbon = 1e-3 * ne
+    n_carbon.attrs["datatype"] = ("number_density", "carbon")
+    return fz, Te, ne, n_carbon
+
+
+def test_power():
+    plt = adf11_table([-31.0, -32.0], "line_emissions")
+    prb = adf11_table([-33.0, -32.5], "recomb_emissions")
+    fz, Te, ne, n_carbon = plasma()
+    coeff, density, total = RadiatedPower(integrate=True)(
+        plt, prb, fz, Te, ne, n_carbon
+    )
+    expected = 0.1 * 1e-31 + 0.2 * 1e-32 + 0.2 * 1e-33 + 0.7 * 10 ** -32.5
+    assert coeff.values == approx(expected)
+    assert coeff.attrs["datatype"] == ("total_radiation_coeffs", "carbon")
+    assert density.values == approx((ne * n_carbon).values * expected)
+    assert density.attrs["datatype"] == ("emissivity", "carbon")
+    assert total.dims == density.dims
+    assert total.attrs["datatype"] == ("radiated_power", "carbon")
+    assert total.isel(rho_poloidal=0).values == approx(0.0)
+    assert np.all(total.diff("rho_poloidal") > 0)
+
+
+def test_power_constant_density():
+    """Check the total power equals the enclosed volume times the power
+    density when the latter is uniform."""
+    plt = adf11_table([-31.0, -32.0], "line_emissions")
+    prb = adf11_table([-33.0, -32.5], "recomb_emissions")
+    fz, Te, ne, n_carbon = plasma()
+    ne = ne.copy(data=np.full_like(ne.values, 1e19))
+    n_carbon = n_carbon.copy(data=np.full_like(n_carbon.values, 1e16))
+    _, density, total = RadiatedPower(integrate=True)(plt, prb, fz, Te, ne, n_carbon)
+    transform = Te.attrs["transform"]
+    volume, _ = transform.equilibrium.enclosed_volume(
+        ne.coords["rho_poloidal"], ne.coords["t"]
+    )
+    assert total.values == approx((density * volume).transpose(*total.dims).values)
+
+
+def test_charge_exchange():
+    plt = adf11_table([-31.0, -32.0], "line_emissions")
+    prb = adf11_table([-33.0, -32.5], "recomb_emissions")
+    prc = adf11_table([-30.0, -31.0], "cx_emissions")
+    fz, Te, ne, n_carbon = plasma(False)
+    n_neutral = 1e-4 * ne
+    n_neutral.attrs["datatype"] = ("number_density", "hydrogen")
+    coeff, _ = RadiatedPower(True, False)(
+        plt, prb, fz, Te, ne, n_carbon, prc, n_neutral
+    )
+    expected = (
+        0.1 * 1e-31
+        + 0.2 * 1e-32
+        + 0.2 * 1e-33
+        + 0.7 * 10 ** -32.5
+        + 1e-4 * (0.2 * 1e-30 + 0.7 * 1e-31)
+    )
+    assert coeff.values == approx(expected)
+
+
+def test_integrate_needs_equilibrium():
+    plt = adf11_table([-31.0, -32.0], "line_emissions")
+    prb = adf11_table([-33.0, -32.5], "recomb_emissions")
+    fz, Te, ne, n_carbon = plasma(False)
+    with raises(ValueError):
+        RadiatedPower(integrate=True)(plt, prb, fz, Te, ne, n_carbon)
+
+
+def test_no_integration_by_default():
+    """Check only the coefficient and power density are calculated by
+    default, so no equilibrium is needed."""
+    plt = adf11_table([-31.0, -32.0], "line_emissions")
+    prb = adf11_table([-33.0, -32.5], "recomb_emissions")
+    fz, Te, ne, n_carbon = plasma(False)
+    results = RadiatedPower()(plt, prb, fz, Te, ne, n_carbon)
+    assert len(results) == 2
+
+
+def test_mismatched_charge_states():
+    """Check atomic data labelled with charge states other than those of
+    the fractional abundance are rejected, even when the sizes agree."""
+    plt = adf11_table([-31.0, -32.0], "line_emissions")
+    prb = adf11_table([-33.0, -32.5], "recomb_emissions")
+    fz, Te, ne, n_carbon = plasma(False)
+    for plt_charges, prb_charges in [([1, 2], [0, 1]), ([0, 1], [1, 2])]:
+        with raises(ValueError):
+            RadiatedPower()(
+                plt.assign_coords(ion_charges=plt_charges),
+                prb.assign_coords(ion_charges=prb_charges),
+                fz,
+                Te,
+                ne,
+                n_carbon,
+            )
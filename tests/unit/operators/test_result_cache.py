@@ -0,0 +1,97 @@
+"""Tests for storing and reusing the results of operators."""
+
+from typing import Tuple
+
+import numpy as np
+from xarray import DataArray
+from xarray.testing import assert_equal
+
+from indica.converters import TrivialTransform
+from indica.datatypes import DataType
+from indica.operators import Operator
+from indica.operators import ResultCache
+from indica.operators.result_cache import data_fingerprint
+
+
+class DoubleOperator(Operator):
+    """Doubles its argument, counting how many times it has done so."""
+
+    ARGUMENT_TYPES = [("temperature", "electrons")]
+
+    def __init__(self, offset: float = 0.0):
+        super().__init__(offset=offset)
+        self.offset = offset
+        self.ncalls = 0
+
+    def return_types(self, *args: DataType) -> Tuple[DataType, ...]:
+        return args
+
+    def __call__(self, data: DataArray) -> DataArray:  # type: ignore[override]
+        self.validate_arguments(data)
+        self.ncalls += 1
+        result = 2 * data + self.offset
+        result.attrs["datatype"] = data.attrs["datatype"]
+        result.attrs["transform"] = data.attrs["transform"]
+        result.attrs["error"] = 0.1 * result
+        result.name = "doubled"
+        self.assign_provenance(result)
+        return result
+
+
+def example_data(n: int = 10) -> DataArray:
+    data = DataArray(
+        np.linspace(0.0, 1.0, n), coords=[("t", np.linspace(40.0, 50.0, n))]
+    )
+    data.attrs["datatype"] = ("temperature", "electrons")
+    data.attrs["transform"] = TrivialTransform()
+    return data
+
+
+def test_cached_result_reused(tmp_path):
+    """Check a second call with the same arguments is served from the
+    cache, with its attributes restored."""
+    data = example_data()
+    operator = DoubleOperator()
+    operator.cache = ResultCache(tmp_path)
+    first = operator(data)
+    copied = data.copy()
+    second = operator(copied)
+    assert operator.ncalls == 1
+    assert_equal(first, second)
+    assert second.name == first.name
+    assert second.attrs["datatype"] == first.attrs["datatype"]
+    assert second.attrs["transform"] is copied.attrs["transform"]
+    assert_equal(second.attrs["error"], first.attrs["error"])
+    assert "provenance" in second.attrs
+
+
+def test_cache_distinguishes_inputs(tmp_path):
+    """Check different arguments or operator parameters are recalculated."""
+    cache = ResultCache(tmp_path)
+    data = example_data()
+    operator = DoubleOperator()
+    operator.cache = cache
+    operator(data)
+    operator(data.copy(data=data.values + 1.0))
+    assert operator.ncalls == 2
+    other = DoubleOperator(1.0)
+    other.cache = cache
+    other(data)
+    assert other.ncalls == 1
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """Check the cache is kept within its size limit."""
+    cache = ResultCache(tmp_path, 0)
+    operator = DoubleOperator()
+    operator.cache = cache
+    operator(example_data())
+    assert cache.size == 0
+
+
+def test_fingerprint_ignores_provenance():
+    data = example_data()
+    other = data.copy()
+    other.attrs["provenance"] = object()
+    assert data_fingerprint(data) == data_fingerprint(other)
+    assert data_fingerprint(data) != data_fingerprint(example_data(11))
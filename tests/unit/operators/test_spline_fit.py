@@ -0,0 +1,122 @@
+"""Tests for fitting splines to data."""
+
+from unittest.mock import patch
+
+from hypothesis import given
+from hypothesis import settings
+from hypothesis.strategies import floats
+from hypothesis.strategies import integers
+from hypothesis.strategies import lists
+import numpy as np
+from pytest import approx
+from scipy.interpolate import CubicSpline
+from xarray import DataArray
+
+from indica.converters import TransectCoordinates
+from indica.operators import SplineFit
+from indica.utilities import coord_array
+from ..fake_equilibrium import FakeEquilibrium
+
+
+KNOTS = [0.0, 0.3, 0.6, 0.85, 0.95, 1.05]
+
+
+def spline_data(knot_values, times, nchannels=40):
+    """Create data lying exactly on a spline through the given knot values
+    (one row per time), measured along a horizontal transect."""
+    equilib = FakeEquilibrium(3.0, 0.0, np.asarray(times))
+    R = DataArray(np.linspace(3.0, 3.6, nchannels), dims="index")
+    z = DataArray(np.zeros(nchannels), dims="index")
+    t = DataArray(times, dims="t")
+    rho, _, _ = equilib.flux_coords(R, z, t)
+    values = np.stack(
+        [
+            np.nan_to_num(
+                CubicSpline(KNOTS, k, 0, "clamped", False)(rho.sel(t=time).values)
+            )
+            for k, time in zip(knot_values, times)
+        ]
+    )
+    data = DataArray(
+        values, coords=[("t", times), ("index", np.arange(nchannels))]
+    ).assign_coords(index_z_offset=0.0)
+    data.attrs["transform"] = TransectCoordinates(R, z)
+    data.attrs["datatype"] = ("temperature", "electrons")
+    data.indica.equilibrium = equilib
+    return data
+
+
+knot_value_lists = lists(floats(0.0, 1e4), min_size=5, max_size=5).map(
+    lambda k: k + [0.0]
+)
+
+
+@settings(deadline=None)
+@given(lists(knot_value_lists, min_size=1, max_size=4), integers(0, 1))
+def test_fit_recovers_spline(knot_values, add_nan):
+    """Check the knot values of data lying exactly on a spline are found."""
+    times = np.linspace(50.0, 60.0, len(knot_values))
+    data = spline_data(knot_values, times)
+    if add_nan:
+        data[:, 5] = np.nan
+    fitter = SplineFit(knots=KNOTS, lower_bound=0.0)
+    with patch.object(fitter, "assign_provenance"):
+        result, knot_vals, binned = fitter(
+            coord_array(np.linspace(0.0, 1.0, 11), "rho_poloidal"),
+            coord_array(times, "t"),
+            data,
+        )
+    assert knot_vals.dims == ("t", "rho_poloidal")
+    assert np.all(knot_vals.values == approx(np.array(knot_values), rel=1e-6, abs=1e-6))
+    assert np.all(result.coords["t"] == times)
+
+
+@settings(deadline=None)
+@given(knot_value_lists)
+def test_fit_respects_lower_bound(knot_values):
+    """Check knot values are never below the lower bound, even when the
+    data would be better fit by negative values."""
+    times = np.array([50.0])
+    data = spline_data([knot_values], times)
+    data.values -= 1e3
+    fitter = SplineFit(knots=KNOTS, lower_bound=0.0)
+    with patch.object(fitter, "assign_provenance"):
+        _, knot_vals, _ = fitter(
+            coord_array(np.linspace(0.0, 1.0, 11), "rho_poloidal"),
+            coord_array(times, "t"),
+            data,
+        )
+    assert np.all(knot_vals.values >= 0.0)
+
+
+@settings(deadline=None)
+@given(lists(knot_value_lists, min_size=2, max_size=6), integers(2, 4))
+def test_parallel_fit_matches_serial(knot_values, n_workers):
+    """Check fitting times on a pool of workers gives the same result as
+    fitting them serially."""
+    times = np.linspace(50.0, 60.0, len(knot_values))
+    data = spline_data(knot_values, times)
+    data.values += np.cos(np.arange(data.size)).reshape(data.shape)
+    results = []
+    for fitter in [
+        SplineFit(knots=KNOTS, lower_bound=0.0),
+        SplineFit(knots=KNOTS, lower_bound=0.0, n_workers=n_workers),
+    ]:
+        with patch.object(fitter, "assign_provenance"):
+            results.append(
+                fitter(
+                    coord_array(np.linspace(0.0, 1.0, 11), "rho_poloidal"),
+                    coord_array(times, "t"),
+                    data,
+                )[1]
+            )
+    assert np.all(results[0].values == results[1].values)
+
+
+def test_parallel_settings_not_in_provenance():
+    """Check the number and type of workers do not change the identity of
+    the operator, so results are shared between serial and parallel runs."""
+    assert (
+        SplineFit(KNOTS, n_workers=1).prov_id
+        == SplineFit(KNOTS, n_workers=3, use_processes=True).prov_id
+    )
@@ -0,0 +1,156 @@
+"""Tests for two-dimensional tomographic inversion of radiation data."""
+
+import numpy as np
+from pytest import approx
+from pytest import raises
+from xarray import DataArray
+
+from indica.converters import LinesOfSightTransform
+from indica.converters import TrivialTransform
+from indica.operators import LineIntegral
+from indica.operators import PixelTomography
+from indica.profiling import Profiler
+from ..fake_equilibrium import FakeEquilibrium
+
+TIMES = np.array([50.0, 50.1])
+
+
+def cameras(equilibrium=None):
+    """A camera with horizontal lines of sight and one with vertical lines of
+    sight."""
+    n = 15
+    z = np.linspace(-0.7, 0.7, n)
+    R = np.linspace(2.1, 3.5, n)
+    horizontal = LinesOfSightTransform(
+        3.85 * np.ones(n), z, np.zeros(n), 2.0 * np.ones(n), z, np.zeros(n), "horiz"
+    )
+    vertical = LinesOfSightTransform(
+        R, 1.9 * np.ones(n), np.zeros(n), R, -1.0 * np.ones(n), np.zeros(n), "vert"
+    )
+    result = []
+    for transform in (horizontal, vertical):
+        if equilibrium is not None:
+            transform.set_equilibrium(equilibrium)
+        result.append(
+            DataArray(
+                np.zeros((n, len(TIMES))),
+                coords=[(transform.x1_name, np.arange(n)), ("t", TIMES)],
+                attrs={"datatype": ("luminous_flux", "sxr"), "transform": transform},
+            )
+        )
+    return result
+
+
+def blob(R0, z0):
+    R = DataArray(np.linspace(1.83, 3.9, 208), dims="R")
+    z = DataArray(np.linspace(-1.75, 2.0, 376), dims="z")
+    t = DataArray(TIMES, dims="t")
+    emissivity = 1e4 * np.exp(-((R - R0) ** 2 + (z - z0) ** 2) / 0.1 ** 2) + 0.0 * t
+    emissivity = emissivity.assign_coords(R=R, z=z, t=t)
+    emissivity.attrs["datatype"] = ("emissivity", "sxr")
+    emissivity.attrs["transform"] = TrivialTransform()
+    return emissivity
+
+
+def measurements(emissivity, cams):
+    integrals = LineIntegral(257)(emissivity, *cams)
+    return [c.copy(data=i.transpose(*c.dims).values) for c, i in zip(cams, integrals)]
+
+
+def grid():
+    R = DataArray(np.linspace(2.0, 3.6, 33), dims="R")
+    R.attrs["datatype"] = ("major_rad", "plasma")
+    z = DataArray(np.linspace(-0.8, 0.8, 33), dims="z")
+    z.attrs["datatype"] = ("z", "plasma")
+    t = DataArray(TIMES, dims="t")
+    t.attrs["datatype"] = ("time", "plasma")
+    return R, z, t
+
+
+def test_geometry_matrix_gives_chord_length():
+    R, z, _ = grid()
+    operator = PixelTomography()
+    camera = cameras()[0]
+    transform = camera.attrs["transform"]
+    matrix = operator._geometry_matrix(
+        transform, camera.coords[transform.x1_name], R.values, z.values
+    )
+    assert matrix.shape == (15, 33 * 33)
+    assert matrix @ np.ones(33 * 33) == approx(1.6, rel=1e-2)
+    operator._geometry_matrix(
+        transform, camera.coords[transform.x1_name], R.values, z.values
+    )
+    ((cached_transform, cached_matrix),) = operator._geometries.values()
+    assert cached_transform is transform
+    assert cached_matrix is matrix
+
+
+def test_tikhonov_locates_blob():
+    R, z, t = grid()
+    data = measurements(blob(3.0, 0.2), cameras())
+    emissivity, *integrals = PixelTomography(regularisation="tikhonov", strength=1e-4)(
+        R, z, t, *data
+    )
+    assert emissivity.dims == ("t", "R", "z")
+    assert emissivity.attrs["datatype"] == ("emissivity", "sxr")
+    peak = emissivity.isel(t=0).argmax(...)
+    assert float(R[peak["R"]]) == approx(3.0, abs=0.1)
+    assert float(z[peak["z"]]) == approx(0.2, abs=0.1)
+    for integral, camera in zip(integrals, data):
+        assert integral.attrs["datatype"] == ("luminous_flux", "sxr")
+        assert integral.transpose(*camera.dims).values == approx(
+            camera.values, rel=0.1, abs=0.05 * float(camera.max())
+        )
+
+
+def test_tikhonov_batches_times():
+    """Check all times are solved with a single factorisation when their
+    uncertainties agree, giving the solution for each time's data."""
+    R, z, t = grid()
+    data = measurements(blob(3.0, 0.2), cameras())
+    data = [d.copy(data=d.values * [1.0, 2.0]) for d in data]
+    with Profiler() as profiler:
+        emissivity, *_ = PixelTomography(regularisation="tikhonov", strength=1e-4)(
+            R, z, t, *data
+        )
+    counters = profiler.summary()[("operator", "PixelTomography")]
+    assert counters["tomography_solves"] == 2
+    assert counters["lu_factorisations"] == 1
+    assert emissivity.isel(t=1).values == approx(
+        2 * emissivity.isel(t=0).values, rel=1e-6, abs=1e-6
+    )
+
+
+def test_smoothing_reused_for_static_equilibrium():
+    """Check the smoothing matrices are only recalculated for times when
+    the flux surfaces change."""
+    R, z, t = grid()
+    operator = PixelTomography()
+    static = operator._smoothing_matrices(
+        R, z, t, FakeEquilibrium(2.9, 0.0, TIMES, poloidal_alpha=0.0)
+    )
+    assert static[1] is static[0]
+    changing = operator._smoothing_matrices(
+        R, z, t, FakeEquilibrium(2.9, 0.0, TIMES, poloidal_alpha=1.0)
+    )
+    assert changing[1] is not changing[0]
+
+
+def test_minimum_fisher_with_equilibrium():
+    R, z, t = grid()
+    equilibrium = FakeEquilibrium(2.9, 0.0, TIMES)
+    data = measurements(blob(2.9, 0.0), cameras(equilibrium))
+    emissivity, *integrals = PixelTomography(strength=1e-3)(R, z, t, *data)
+    assert np.all(emissivity >= 0.0)
+    peak = emissivity.isel(t=1).argmax(...)
+    assert float(R[peak["R"]]) == approx(2.9, abs=0.1)
+    assert float(z[peak["z"]]) == approx(0.0, abs=0.1)
+    for integral, camera in zip(integrals, data):
+        assert integral.transpose(*camera.dims).values == approx(
+            camera.values, rel=0.1, abs=0.05 * float(camera.max())
+        )
+
+
+def test_unknown_regularisation():
+    with raises(ValueError):
+        PixelTomography(regularisation="maximum_entropy")
@@ -21,7 +21,11 @@ from hypothesis.strategies import one_of
 from hypothesis.strategies import sampled_from
 from hypothesis.strategies import text
 from hypothesis.strategies import times
+import numpy as np
 import prov.model as prov
+from pytest import approx
+from pytest import raises
+from xarray import DataArray
 from xarray.testing import assert_allclose
 
 from indica.datatypes import ADF11_GENERAL_DATATYPES
@@ -293,3 +297,137 @@ def test_read_adf11(reader, data_file, element, year):
     assert_allclose(data, result, atol=1e-5)
     assert data.attrs["datatype"] == result.attrs["datatype"]
     assert result.attrs["provenance"] == reader.create_provenance.return_value
+
+
+def lithium_adf11(datatype="ion_coeffs"):
+    """Create simple ADF11 data for lithium."""
+    ion_charges = np.arange(0, 3)
+    temperatures = np.linspace(0.0, 3.0, 7)
+    densities = np.linspace(13.0, 21.0, 5)
+    return DataArray(
+        -10.0
+        - ion_charges[:, np.newaxis, np.newaxis]
+        + 0.01 * temperatures[:, np.newaxis]
+        + 0.0 * densities,
+        coords=[
+            ("ion_charges", ion_charges),
+            ("log10_electron_temperature", temperatures),
+            ("log10_electron_density", densities + 6),
+        ],
+        attrs={
+            "datatype": (datatype, "lithium"),
+            "date": datetime.date(2012, 3, 4),
+        },
+    )
+
+
+def test_parsed_files_cached():
+    data = lithium_adf11()
+    with TemporaryDirectory() as path, cachedir():
+        filepath = Path(path) / "adf11" / "scd12" / "scd12_li.dat"
+        filepath.parent.mkdir(parents=True)
+        filepath.write_text(adf11_array_to_str(data).format(""))
+        reader = ADASReader(path, MagicMock())
+        with patch.object(reader, "_parse_adf11", wraps=reader._parse_adf11) as parse:
+            first = reader.get_adf11("scd", "li", "12")
+            parse.assert_called_once()
+            second = reader.get_adf11("scd", "li", "12")
+            parse.assert_called_once()
+            adas._parsed_files.clear()
+            third = reader.get_adf11("scd", "li", "12")
+            parse.assert_called_once()
+            assert not third.data.flags.writeable
+            filepath.write_text(
+                adf11_array_to_str(data.copy(data=data.values - 1)).format("")
+            )
+            os.utime(filepath, ns=(0, 0))
+            fourth = reader.get_adf11("scd", "li", "12")
+            assert parse.call_count == 2
+        uncached = ADASReader(path, MagicMock(), cache=False)
+        fifth = uncached.get_adf11("scd", "li", "12")
+    assert_allclose(data, first, atol=1e-5)
+    assert_allclose(first, second)
+    assert_allclose(first, third)
+    assert third.attrs["date"] == data.attrs["date"]
+    assert_allclose(data - 1, fourth, atol=1e-5)
+    assert_allclose(fourth, fifth)
+
+
+def test_get_many():
+    scd = lithium_adf11()
+    acd = lithium_adf11("recomb_coeffs")
+    acd = acd.copy(data=acd.values - 2)
+    with TemporaryDirectory() as path:
+        for quantity, data in [("scd", scd), ("acd", acd)]:
+            filepath = Path(path) / "adf11" / f"{quantity}12" / f"{quantity}12_li.dat"
+            filepath.parent.mkdir(parents=True)
+            filepath.write_text(adf11_array_to_str(data).format(""))
+        reader = ADASReader(path, MagicMock(), cache=False)
+        with patch.object(reader, "get_adf11", wraps=reader.get_adf11) as get_adf11:
+            result = reader.get_many(
+                [("scd", "li", "12"), ("acd", "li", "12"), ("scd", "li", "12")],
+                n_workers=2,
+            )
+        assert get_adf11.call_count == 2
+    assert set(result) == {("scd", "li", "12"), ("acd", "li", "12")}
+    assert_allclose(scd, result["scd", "li", "12"], atol=1e-5)
+    assert_allclose(acd, result["acd", "li", "12"], atol=1e-5)
+    assert result["acd", "li", "12"].attrs["datatype"] == ("recomb_coeffs", "lithium")
+    assert reader.session.prov.entity.call_count == 3
+
+
+ADF15_FILE = """   3    /C +2 PHOTON EMISSIVITY COEFFTS/
+  977.02    3    2 /FILMEM = test     /TYPE=EXCIT/INDM = T/ISEL =     1
+ 1.00E+08 1.00E+10 1.00E+12
+ 1.00E+00 1.00E+01
+ 1.00E-10 2.00E-10 3.00E-10
+ 4.00E-10 5.00E-10 6.00E-10
+  977.02    3    2 /FILMEM = test     /TYPE=RECOM/INDM = T/ISEL =     2
+ 1.00E+08 1.00E+10 1.00E+12
+ 1.00E+00 1.00E+01
+ 1.00E-12 2.00E-12 3.00E-12
+ 4.00E-12 5.00E-12 6.00E-12
+ 1175.70    3    2 /FILMEM = test     /TYPE=EXCIT/INDM = T/ISEL =     3
+ 1.00E+08 1.00E+10 1.00E+12
+ 1.00E+00 1.00E+01
+ 7.00E-10 8.00E-10 9.00E-10
+ 1.00E-09 1.10E-09 1.20E-09
+C-----------------------------------------------------------------------
+C
+C  ISEL  WAVELENGTH      TRANSITION            TYPE
+C  ----  ----------  ---------------------   -----
+C     1.   977.02     n= 3 - n= 2              EXCIT
+C     2.   977.02     n= 3 - n= 2              RECOM
+C     3.  1175.70     n= 4 - n= 3              EXCIT
+C-----------------------------------------------------------------------
+"""
+
+
+def test_adf15_transition_lookup():
+    with TemporaryDirectory() as path, cachedir():
+        filepath = (
+            Path(path) / "adf15" / "pec96%5D%5Bc" / "pec96%5D%5Bc_pju%5D%5Bc2.dat"
+        )
+        filepath.parent.mkdir(parents=True)
+        filepath.write_text(ADF15_FILE)
+        reader = ADASReader(path, MagicMock())
+        full = reader.get_adf15("c", "2", "pju", "96")
+        with patch.object(
+            reader, "_read_adf15_blocks", wraps=reader._read_adf15_blocks
+        ) as read_blocks:
+            line = reader.get_adf15("c", "2", "pju", "96", transition="n=4-n=3")
+            assert list(read_blocks.call_args[0][1]) == [ADF15_FILE.index(" 1175.70")]
+        nearest = reader.get_adf15("c", "2", "pju", "96", wavelength=977.0)
+        both = reader.get_adf15(
+            "c", "2", "pju", "96", transition="n= 3 - n= 2", wavelength=977.0
+        )
+        with raises(ValueError):
+            reader.get_adf15("c", "2", "pju", "96", transition="n=5-n=4")
+    assert full.dims == ("index", "electron_temperature", "electron_density")
+    assert list(full.coords["transition"]) == ["n=3-n=2", "n=3-n=2", "n=4-n=3"]
+    assert list(full.coords["type"]) == ["excit", "recom", "excit"]
+    assert full.sel(index=1).values == approx(1e-16 * np.arange(1, 7).reshape(2, 3))
+    assert full.coords["electron_density"].values == approx([1e14, 1e16, 1e18])
+    assert_allclose(line, full.sel(index=[3]))
+    assert_allclose(nearest, full.sel(index=[1, 2]))
+    assert_allclose(both, nearest)
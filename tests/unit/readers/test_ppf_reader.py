@@ -27,9 +27,11 @@ import numpy as np
 import pytest
 import sal.client
 import sal.core.exception
+import sal.dataclass
 import scipy.constants as sc
 
 from indica.readers import PPFReader
+from indica.readers.ppfreader import _write_group
 from indica.readers.ppfreader import PPFWarning
 from indica.readers.selectors import choose_on_plot
 from indica.readers.selectors import DataSelector
@@ -736,10 +738,12 @@ def test_cache_read_write(
     quantity = sorted(reader.available_quantities(instrument).keys())[0]
     with tempfile.TemporaryDirectory() as tmpdir:
         salpath = reader.get_sal_path(uid, instrument, quantity, revision)
-        path = pathlib.Path(tmpdir) / reader._sal_path_to_file(salpath).name
+        path = pathlib.Path(tmpdir) / reader._cache_file().name
         data = reader._client.get(salpath)
-        reader._write_cached_ppf(path, data)
-        data2 = reader._read_cached_ppf(path)
+        with patch.object(reader, "_cache_file", return_value=path):
+            reader._write_cached_ppf(salpath, data)
+            data2 = reader._read_cached_ppf(salpath)
+        reader.close()
         np.testing.assert_equal(data.data, data2.data)
 
 
@@ -794,24 +798,163 @@ def test_get_signal_from_cache(
     quantity = sorted(reader.available_quantities(instrument).keys())[0]
     with cachedir() as cdir:
         data, salpath = reader._get_signal(uid, instrument, quantity, revision)
-        path = reader._sal_path_to_file(salpath)
+        path = reader._cache_file()
         assert pathlib.Path.home() / cdir in path.parents
-        data2 = reader._read_cached_ppf(path)
+        data2 = reader._read_cached_ppf(salpath)
         np.testing.assert_equal(data.data, data2.data)
         with patch.object(reader._client, "get") as mock_get:
             data3, _ = reader._get_signal(uid, instrument, quantity, revision)
             mock_get.assert_not_called()
         np.testing.assert_equal(data.data, data3.data)
+        reader.close()
 
 
 def test_cache_read_bad_permissions():
     """Check that reading cached data fails if other users are allowed to
     write to the file. This is done for security reasons."""
-    reader = PPFReader(0, 0.0, 0.0)
+    with patch("indica.readers.ppfreader.SALClient"):
+        reader = PPFReader(0, 0.0, 0.0)
     with tempfile.NamedTemporaryFile("w") as cachefile:
         path = pathlib.Path(cachefile.name)
         cachefile.write("Just some text so the file is not empty.")
         path.chmod(0o777)
-        with pytest.warns(PPFWarning, match="writeable"):
-            result = reader._read_cached_ppf(path)
+        with patch.object(reader, "_cache_file", return_value=path):
+            with pytest.warns(PPFWarning, match="writeable"):
+                result = reader._read_cached_ppf(
+                    "/pulse/0/ppf/signal/jetppf/bolo/kb5h:1"
+                )
         assert result is None
+
+
+def test_cache_holds_all_signals():
+    """Check that signals are all stored in one file per pulse, and are
+    recovered exactly."""
+    with patch("indica.readers.ppfreader.SALClient"):
+        reader = PPFReader(90279, 45.0, 50.0)
+    times = sal.dataclass.ArrayDimension(
+        np.linspace(45.0, 50.0, 11), units="s", temporal=True
+    )
+    channels = sal.dataclass.ArrayDimension(np.arange(3), units="")
+    first = sal.dataclass.Signal(
+        [times, channels],
+        np.arange(33.0).reshape(11, 3),
+        error=sal.dataclass.SymmetricArrayError(np.full((11, 3), 0.5)),
+        units="W/m^2",
+        description="Bolometer",
+    )
+    second = sal.dataclass.Signal([times], np.linspace(0.0, 1.0, 11))
+    paths = [
+        reader.get_sal_path("jetppf", "bolo", "kb5h", 2),
+        reader.get_sal_path("jetppf", "bolo", "kb5v", 2),
+    ]
+    with cachedir():
+        assert reader._read_cached_ppf(paths[0]) is None
+        reader._write_cached_ppf(paths[0], first)
+        reader._write_cached_ppf(paths[1], second)
+        reader.close()
+        assert len(list(reader._cache_file().parent.iterdir())) == 1
+        for path, expected in zip(paths, [first, second]):
+            result = reader._read_cached_ppf(path)
+            assert result.to_dict().keys() == expected.to_dict().keys()
+            np.testing.assert_equal(result.data, expected.data)
+            for dim, expected_dim in zip(result.dimensions, expected.dimensions):
+                np.testing.assert_equal(dim.data, expected_dim.data)
+                assert dim.temporal == expected_dim.temporal
+            assert result.units == expected.units
+            assert result.description == expected.description
+        np.testing.assert_equal(reader._read_cached_ppf(paths[0]).error.data, 0.5)
+        reader._cache.close()
+
+
+def test_cache_holds_masked_signal():
+    """Check that a signal with a status mask, whose key is an array of
+    strings, is recovered exactly from the cache."""
+    with patch("indica.readers.ppfreader.SALClient"):
+        reader = PPFReader(90279, 45.0, 50.0)
+    times = sal.dataclass.ArrayDimension(
+        np.linspace(45.0, 50.0, 5), units="s", temporal=True
+    )
+    signal = sal.dataclass.Signal(
+        [times],
+        np.linspace(0.0, 1.0, 5),
+        mask=sal.dataclass.ArrayStatus(
+            np.array([0, 1, 0, 2, 0], dtype=np.uint8), ["good", "bad", "ugly"]
+        ),
+    )
+    path = reader.get_sal_path("jetppf", "bolo", "kb5h", 2)
+    with cachedir():
+        reader._write_cached_ppf(path, signal)
+        reader.close()
+        result = reader._read_cached_ppf(path)
+        np.testing.assert_equal(result.mask.status, signal.mask.status)
+        assert list(result.mask.key) == ["good", "bad", "ugly"]
+        reader._cache.close()
+
+
+def test_cache_recovers_from_failed_write():
+    """Check that a signal which was only partly written to the cache is
+    never read back, and that it can be written again afterwards."""
+    with patch("indica.readers.ppfreader.SALClient"):
+        reader = PPFReader(90279, 45.0, 50.0)
+    times = sal.dataclass.ArrayDimension(
+        np.linspace(45.0, 50.0, 5), units="s", temporal=True
+    )
+    signal = sal.dataclass.Signal([times], np.linspace(0.0, 1.0, 5))
+    path = reader.get_sal_path("jetppf", "bolo", "kb5h", 2)
+
+    def fail_partway(group, values):
+        group.createDimension("data_0", 5)
+        raise RuntimeError("Disk full")
+
+    with cachedir():
+        with patch("indica.readers.ppfreader._write_group", fail_partway):
+            with pytest.warns(PPFWarning, match="Error writing"):
+                reader._write_cached_ppf(path, signal)
+        assert reader._read_cached_ppf(path) is None
+        reader._write_cached_ppf(path, signal)
+        reader.close()
+        np.testing.assert_equal(reader._read_cached_ppf(path).data, signal.data)
+        reader._cache.close()
+
+
+def test_cache_failed_writes_do_not_grow():
+    """Check that repeatedly failing to write a signal to the cache does not
+    keep adding groups to the file, as they can never be removed."""
+    with patch("indica.readers.ppfreader.SALClient"):
+        reader = PPFReader(90279, 45.0, 50.0)
+    times = sal.dataclass.ArrayDimension(
+        np.linspace(45.0, 50.0, 5), units="s", temporal=True
+    )
+    signal = sal.dataclass.Signal([times], np.linspace(0.0, 1.0, 5))
+    bad_signal = MagicMock()
+    bad_signal.to_dict.return_value = {"data": np.arange(5.0), "bad": object()}
+    path = reader.get_sal_path("jetppf", "bolo", "kb5h", 2)
+    parent_path, name = path.rsplit("/", 1)
+    with cachedir():
+        for _ in range(2):
+            with pytest.warns(PPFWarning, match="Error writing"):
+                reader._write_cached_ppf(path, bad_signal)
+            assert len(reader._cache[parent_path].groups) == 1
+            assert reader._read_cached_ppf(path) is None
+        reader._write_cached_ppf(path, signal)
+        assert set(reader._cache[parent_path].groups) == {name}
+        np.testing.assert_equal(reader._read_cached_ppf(path).data, signal.data)
+        reader.close()
+
+
+def test_cache_read_corrupt_group():
+    """Check that a signal which can not be reconstructed from the cache is
+    reported and treated as not being cached."""
+    with patch("indica.readers.ppfreader.SALClient"):
+        reader = PPFReader(90279, 45.0, 50.0)
+    times = sal.dataclass.ArrayDimension(
+        np.linspace(45.0, 50.0, 5), units="s", temporal=True
+    )
+    path = reader.get_sal_path("jetppf", "bolo", "kb5h", 2)
+    with cachedir():
+        values = sal.dataclass.Signal([times], np.zeros(5)).to_dict()
+        values["dimensions"]["count"] = "one"
+        _write_group(reader._open_cache().createGroup(path), values)
+        with pytest.warns(PPFWarning, match="Error reading"):
+            assert reader._read_cached_ppf(path) is None
+        reader.close()
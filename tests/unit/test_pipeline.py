@@ -0,0 +1,92 @@
+"""Tests for running steps of a calculation concurrently."""
+
+import threading
+
+from pytest import raises
+
+from indica.pipeline import Pipeline
+from indica.pipeline import PipelineError
+
+
+def test_results_passed_to_dependents():
+    pipeline = Pipeline()
+    a = pipeline.add("a", lambda: {"x": 2, "y": [3, 4]})
+    b = pipeline.add("b", lambda x, y: x * y, a["x"], y=a["y"][1])
+    pipeline.add("c", lambda values: sum(values), [b, a["x"]])
+    assert pipeline.dependencies("c") == {"a", "b"}
+    results = pipeline.run(2)
+    assert results["b"] == 8
+    assert results["c"] == 10
+
+
+def test_independent_steps_concurrent():
+    """Check independent steps run at the same time, as otherwise each
+    would time out waiting for the other."""
+    barrier = threading.Barrier(2, timeout=10)
+
+    def wait():
+        return barrier.wait()
+
+    pipeline = Pipeline()
+    pipeline.add("a", wait)
+    pipeline.add("b", wait)
+    results = pipeline.run(2)
+    assert set(results.values()) == {0, 1}
+
+
+def test_same_operator_serialised():
+    """Check steps calling the same object do not overlap."""
+
+    class Counter:
+        def __init__(self):
+            self.running = 0
+            self.max_running = 0
+            self.lock = threading.Lock()
+
+        def __call__(self, x):
+            with self.lock:
+                self.running += 1
+                self.max_running = max(self.running, self.max_running)
+            threading.Event().wait(0.01)
+            with self.lock:
+                self.running -= 1
+            return x
+
+    counter = Counter()
+    pipeline = Pipeline()
+    for i in range(4):
+        pipeline.add(str(i), counter, i)
+    assert pipeline.run(4) == {str(i): i for i in range(4)}
+    assert counter.max_running == 1
+
+
+def test_after_orders_steps():
+    calls = []
+    pipeline = Pipeline()
+    pipeline.add("a", calls.append, "a")
+    pipeline.add("b", calls.append, "b", after=["a"])
+    pipeline.run(2)
+    assert calls == ["a", "b"]
+
+
+def test_unknown_dependency():
+    pipeline = Pipeline()
+    other = Pipeline().add("a", int)
+    with raises(PipelineError):
+        pipeline.add("b", int, other)
+    with raises(PipelineError):
+        pipeline.add("c", int, after=["d"])
+
+
+def test_duplicate_name():
+    pipeline = Pipeline()
+    pipeline.add("a", int)
+    with raises(PipelineError):
+        pipeline.add("a", int)
+
+
+def test_failure_raised():
+    pipeline = Pipeline()
+    pipeline.add("a", int, "not a number")
+    with raises(PipelineError):
+        pipeline.run()
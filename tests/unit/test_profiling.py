@@ -0,0 +1,43 @@
+"""Tests for collecting timings and counters."""
+
+import json
+
+from indica import profiling
+from indica.profiling import Profiler
+
+
+def test_spans_and_counters(tmp_path):
+    with Profiler(memory=True) as profiler:
+        with profiling.span("outer", "operator"):
+            profiling.record(nfev=3)
+            with profiling.span("inner", "conversion"):
+                data = [0] * 100000
+                profiling.record(nfev=1)
+            profiling.record(nfev=2, status_1=1)
+        del data
+    assert profiling.active_profiler is None
+    outer, inner = profiler.spans
+    assert outer.counters == {"nfev": 5, "status_1": 1}
+    assert inner.counters == {"nfev": 1}
+    assert outer.start <= inner.start <= inner.end <= outer.end
+    assert outer.peak_memory >= inner.peak_memory > 0
+    summary = profiler.summary()
+    assert summary[("operator", "outer")]["calls"] == 1
+    assert summary[("operator", "outer")]["nfev"] == 5
+    assert "inner" in profiler.report()
+    filename = tmp_path / "trace.json"
+    profiler.to_chrome_trace(str(filename))
+    with filename.open() as f:
+        events = json.load(f)["traceEvents"]
+    assert [e["name"] for e in events] == ["outer", "inner"]
+    assert all(e["ph"] == "X" for e in events)
+    assert events[0]["args"]["nfev"] == 5
+
+
+def test_inactive_profiler():
+    """Check instrumentation does nothing without an active profiler."""
+    with profiling.span("unprofiled", "operator"):
+        profiling.record(nfev=1)
+    with Profiler() as profiler:
+        profiling.record(nfev=1)
+    assert profiler.spans == []
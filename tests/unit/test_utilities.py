@@ -1,17 +1,24 @@
 """Test the contents of the utilities module."""
 
+import os
 import re
+from tempfile import TemporaryDirectory
 
 from hypothesis import assume
 from hypothesis import example
 from hypothesis import given
 from hypothesis.extra.numpy import array_shapes
 from hypothesis.extra.numpy import arrays
+from hypothesis.strategies import booleans
 from hypothesis.strategies import dictionaries
 from hypothesis.strategies import from_regex
+from hypothesis.strategies import integers
 from hypothesis.strategies import none
 from hypothesis.strategies import sampled_from
 import numpy as np
+from pytest import approx
+from scipy.interpolate import CubicSpline
+from xarray import DataArray
 
 from indica import utilities
 
@@ -83,3 +90,72 @@ def test_to_filename(name_in):
 
 def test_to_filename_known_result():
     assert utilities.to_filename("a/b/C\\d-e(f, g)") == "a-b-C-d-e(f_g)"
+
+
+@given(integers(1, 6), integers(0, 2 ** 32 - 1))
+def test_broadcast_spline_in_time(nt, seed):
+    """Check a time-dependent spline is evaluated at each time using the
+    spline for that time, whether or not the times match exactly."""
+    rng = np.random.default_rng(seed)
+    knots = np.linspace(0.0, 1.0, 5)
+    times = np.linspace(50.0, 60.0, nt)
+    knot_vals = rng.uniform(0.0, 1.0, (5, nt, 2))
+    spline = CubicSpline(knots, knot_vals, 0, "natural")
+    x = DataArray(
+        rng.uniform(0.0, 1.0, (7, nt)), coords=[("x", np.arange(7)), ("t", times)]
+    )
+    result = utilities.broadcast_spline(
+        spline, ("t", "e"), {"t": times, "e": ["a", "b"]}, x
+    )
+    assert result.dims == ("x", "t", "e")
+    for i in range(nt):
+        expected = CubicSpline(knots, knot_vals[:, i], 0, "natural")(x.values[:, i])
+        assert np.all(result.isel(t=i).values == approx(expected))
+    if nt == 2:
+        midpoint = x.isel(t=[0]).assign_coords(t=[0.5 * (times[0] + times[1])])
+        result = utilities.broadcast_spline(
+            spline, ("t", "e"), {"t": times, "e": ["a", "b"]}, midpoint
+        )
+        expected = CubicSpline(knots, knot_vals.mean(1), 0, "natural")(x.values[:, 0])
+        assert np.all(result.isel(t=0).values == approx(expected))
+
+
+@given(integers(1, 6), booleans(), integers(0, 2 ** 32 - 1))
+def test_piecewise_polynomial_matches_spline(nt, extrapolate, seed):
+    """Check the compact representation of a spline gives the same values as
+    the spline it was made from, including when saved to and read from a
+    netCDF file."""
+    rng = np.random.default_rng(seed)
+    knots = np.linspace(0.0, 1.0, 5)
+    times = np.linspace(50.0, 60.0, nt)
+    knot_vals = rng.uniform(0.0, 1.0, (5, nt, 2))
+    spline = CubicSpline(knots, knot_vals, 0, "natural", extrapolate)
+    coords = {"t": times, "e": ["a", "b"]}
+    x = DataArray(
+        rng.uniform(-0.2, 1.2, (7, nt)), coords=[("x", np.arange(7)), ("t", times)]
+    )
+    poly = utilities.PiecewisePolynomial.from_spline(
+        spline, "rho_poloidal", ("t", "e"), coords
+    )
+    with TemporaryDirectory() as path:
+        filename = os.path.join(path, "spline.nc")
+        poly.to_netcdf(filename)
+        loaded = utilities.PiecewisePolynomial.from_netcdf(filename)
+    assert loaded.dim == "rho_poloidal"
+    assert loaded.dims == ("t", "e")
+    assert loaded.extrapolate == extrapolate
+    expected = np.stack([spline(x.values[:, i])[:, i] for i in range(nt)], 1)
+    for p in [poly, loaded]:
+        result = p(x)
+        assert result.dims == ("x", "t", "e")
+        assert np.all(result.coords["e"] == ["a", "b"])
+        assert np.all(
+            np.isnan(result.values) == np.isnan(expected)
+        ), "Values not NaN in same places"
+        assert np.all(np.nan_to_num(result.values) == approx(np.nan_to_num(expected)))
+    untimed = poly(x.isel(t=0, drop=True))
+    assert untimed.dims == ("x", "t", "e")
+    assert np.all(
+        np.nan_to_num(untimed.isel(t=0).values)
+        == approx(np.nan_to_num(result.isel(t=0).values))
+    )